@@ -1,211 +1,3684 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, make_response
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import uuid
 import threading
 import time
 import json
 import logging
 import requests
+import requests.adapters
 import os
+import re
+import fcntl
+import gzip
+import mimetypes
+import queue
+import sqlite3
+import heapq
+import bisect
+import random
+import itertools
+import functools
+import hashlib
+import hmac
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from typing import Dict, List, Optional
 from flask import send_from_directory
+from flask.json.provider import JSONProvider
+from urllib.parse import urlparse, urlsplit, urlunsplit
+
+try:
+    import orjson
+except ImportError:  # optional; responses are encoded with the stdlib json module instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; responses are only offered gzip-compressed
+    brotli = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app)
+# The React build's own static/ directory is served by serve_react
+app = Flask(__name__, static_folder=None)
+CORS(app)
+
+# Configuration for OmniDimension webhooks
+OMNIDIMENSION_WEBHOOK_URL = os.getenv('OMNIDIMENSION_WEBHOOK_URL', '')
+OMNIDIMENSION_API_KEY = os.environ.get('OMNIDIMENSION_API_KEY')
+if not OMNIDIMENSION_API_KEY:
+    raise ValueError("OMNIDIMENSION_API_KEY environment variable is required")
+
+# In-memory auction data with more realistic data
+auction_data = {
+    "products": {
+        "prod_1": {
+            "id": "prod_1",
+            "name": "Vintage Rolex Submariner",
+            "description": "Rare 1965 Rolex Submariner in excellent condition with original box and papers",
+            "starting_price": 50000.00,
+            "current_highest_bid": 55000.00,
+            "highest_bidder": "user_001",
+            "auction_end_time": datetime.now() + timedelta(minutes=30),
+            "bidding_history": [
+                {
+                    "bid_id": "bid_001",
+                    "bidder_id": "user_001",
+                    "amount": 55000.00,
+                    "timestamp": datetime.now() - timedelta(minutes=5)
+                }
+            ],
+            "total_bids": 1,
+            "status": "active",
+            "category": "watches",
+            "image_url": "https://awadwatches.com/wp-content/uploads/2019/03/1965_vintage_rolex_datejust_1601_rare_14k_gold_roman_dial_swiss_only_1.jpeg"
+        },
+        "prod_2": {
+            "id": "prod_2",
+            "name": "1967 Ford Mustang Fastback",
+            "description": "Fully restored classic Mustang with 390 V8 engine, stunning condition",
+            "starting_price": 25000.00,
+            "current_highest_bid": 28500.00,
+            "highest_bidder": "user_002",
+            "auction_end_time": datetime.now() + timedelta(minutes=45),
+            "bidding_history": [
+                {
+                    "bid_id": "bid_002",
+                    "bidder_id": "user_002",
+                    "amount": 26000.00,
+                    "timestamp": datetime.now() - timedelta(minutes=10)
+                },
+                {
+                    "bid_id": "bid_003",
+                    "bidder_id": "user_003",
+                    "amount": 28500.00,
+                    "timestamp": datetime.now() - timedelta(minutes=3)
+                }
+            ],
+            "total_bids": 2,
+            "status": "active",
+            "category": "vehicles",
+            "image_url": "https://bringatrailer.com/wp-content/uploads/2019/05/1967_ford_mustang_fastback_1561126084a7ce40810bf523f006_exterior.jpg"
+        },
+        "prod_3": {
+            "id": "prod_3",
+            "name": "Original Van Gogh Sketch",
+            "description": "Authenticated Van Gogh preparatory sketch with provenance documentation",
+            "starting_price": 1500000.00,
+            "current_highest_bid": 2200000.00,
+            "highest_bidder": "user_004",
+            "auction_end_time": datetime.now() + timedelta(minutes=20),
+            "bidding_history": [
+                {
+                    "bid_id": "bid_004",
+                    "bidder_id": "user_003",
+                    "amount": 1600000.00,
+                    "timestamp": datetime.now() - timedelta(minutes=15)
+                },
+                {
+                    "bid_id": "bid_005", 
+                    "bidder_id": "user_004",
+                    "amount": 1850000.00,
+                    "timestamp": datetime.now() - timedelta(minutes=12)
+                },
+                {
+                    "bid_id": "bid_006",
+                    "bidder_id": "user_005",
+                    "amount": 2200000.00,
+                    "timestamp": datetime.now() - timedelta(minutes=8)
+                }
+            ],
+            "total_bids": 3,
+            "status": "active",
+            "category": "art",
+            "image_url": "https://image.invaluable.com/housePhotos/Gallery320/16/665116/H19737-L198711707.jpg"
+        }
+    },
+    "users": {
+        "voice_user_001": {
+            "id": "voice_user_001",
+            "name": "Voice User",
+            "phone": "+918439473928",
+            "bidding_history": [],
+            "total_spent": 0.0,
+            "active_bids": []
+        }
+    }
+}
+
+# Global state for tracking active voice sessions
+active_voice_sessions = {}
+sessions_lock = threading.Lock()
+
+# ===== JSON ENCODING =====
+
+# "auto" uses orjson when it is installed, "stdlib" always uses the json module
+JSON_ENCODER = os.getenv('JSON_ENCODER', 'auto')
+
+class EncodedJSON:
+    """A value already encoded as JSON, written into responses as it is"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider that encodes with orjson when available and the stdlib otherwise.
+
+    Both write datetimes as ISO 8601 strings, so handlers can return records
+    without converting them first. EncodedJSON values are spliced in
+    unchanged: through orjson.Fragment where the installed orjson has it,
+    otherwise as numbered placeholder strings that one pass over the output
+    replaces. Keys are sorted, as with Flask's default provider, but
+    non-ASCII text is written as UTF-8 rather than as \\uXXXX escapes, which
+    is what orjson does. Both encoders then agree on strings, integers and
+    plain decimal floats. They still differ on exponent notation (1e16
+    against 1e+16), NaN and infinities, so ETags of such values change with
+    the encoder.
+    """
+
+    def __init__(self, app, use_orjson: Optional[bool] = None):
+        super().__init__(app)
+        self.use_orjson = (orjson is not None and JSON_ENCODER != "stdlib") if use_orjson is None else use_orjson
+        self._placeholder = f"\x00{uuid.uuid4().hex}:"
+        self._placeholder_re = re.compile(
+            rb'"\\u0000' + self._placeholder[1:].encode() + rb'(\d+)\\u0000"')
+
+    def encode(self, obj, indent: bool = False, splice: bool = True) -> bytes:
+        fragments: List[bytes] = []
+        fragment_type = getattr(orjson, "Fragment", None) if self.use_orjson else None
+
+        def default(value):
+            if isinstance(value, EncodedJSON):
+                if not splice:
+                    return json.loads(value.data)
+                if fragment_type is not None:
+                    return fragment_type(value.data)
+                fragments.append(value.data)
+                return f"{self._placeholder}{len(fragments) - 1}\x00"
+            if isinstance(value, (datetime, date)):
+                return value.isoformat()
+            raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+        if self.use_orjson:
+            options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            data = orjson.dumps(obj, default=default, option=options)
+        else:
+            data = json.dumps(obj, default=default, sort_keys=True, ensure_ascii=False, indent=2 if indent else None,
+                              separators=None if indent else (",", ":")).encode()
+        if fragments:
+            data, count = self._placeholder_re.subn(
+                lambda match: fragments[int(match.group(1))] if int(match.group(1)) < len(fragments) else b"", data)
+            if count != len(fragments):
+                # Some string in the data looks like a placeholder; encode the fragments' values instead
+                return self.encode(obj, indent, splice=False)
+        return data
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj, indent=self._app.debug) + b"\n", mimetype="application/json")
+
+app.json = FastJSONProvider(app)
+
+# ===== WEBHOOK DISPATCH =====
+
+WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', '10000'))
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', '4'))
+WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', '50'))
+# Post messages queued together for one endpoint as {"messages": [...]}; only for receivers that accept it
+WEBHOOK_BATCH_ENVELOPE = os.getenv('WEBHOOK_BATCH_ENVELOPE', '0') == '1'
+WEBHOOK_TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', '5'))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '5'))
+WEBHOOK_BACKOFF_BASE = float(os.getenv('WEBHOOK_BACKOFF_BASE', '0.5'))
+WEBHOOK_BACKOFF_MAX = float(os.getenv('WEBHOOK_BACKOFF_MAX', '30'))
+WEBHOOK_BREAKER_THRESHOLD = int(os.getenv('WEBHOOK_BREAKER_THRESHOLD', '5'))
+WEBHOOK_BREAKER_COOLDOWN = float(os.getenv('WEBHOOK_BREAKER_COOLDOWN', '30'))
+WEBHOOK_DEAD_LETTER_PATH = os.getenv('WEBHOOK_DEAD_LETTER_PATH', 'webhook_dead_letters.jsonl')
+
+def redact_url(url: str) -> str:
+    """The URL without its query string, fragment or credentials, which can carry secrets"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.rpartition("@")[2], parts.path, "", ""))
+
+class WebhookDeliveryError(Exception):
+    """A delivery attempt failed; ``retriable`` is False when resending cannot help"""
+
+    def __init__(self, message: str, retriable: bool = True):
+        super().__init__(message)
+        self.retriable = retriable
+
+class CircuitBreaker:
+    """Per-endpoint breaker: opens after ``threshold`` consecutive failures.
+
+    While open, deliveries are refused without touching the network. After
+    ``cooldown`` seconds one probe is let through (half-open); its success
+    closes the breaker and its failure opens it for another cooldown.
+    """
+
+    def __init__(self, threshold: int = WEBHOOK_BREAKER_THRESHOLD, cooldown: float = WEBHOOK_BREAKER_COOLDOWN):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self, now: float) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and now - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_at(self) -> float:
+        """Monotonic time at which an open breaker will next let a probe through"""
+        return self.opened_at + self.cooldown
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self, now: float):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = now
+                self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips}
+
+class DeadLetterSpool:
+    """Append-only JSON-lines file of messages that exhausted their delivery attempts.
+
+    Records name their endpoint by its redacted URL; the dispatcher maps it
+    back to the full URL when they are replayed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.spooled = 0
+
+    def append(self, endpoint: str, payload: dict, attempts: int, error: str):
+        record = {"endpoint": endpoint, "payload": payload, "attempts": attempts, "error": error,
+                  "failed_at": datetime.now().isoformat()}
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.spooled += 1
+
+    def count(self) -> int:
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    return sum(1 for _ in f)
+            except FileNotFoundError:
+                return 0
+
+    def drain(self) -> List[dict]:
+        """Atomically take every spooled record, leaving an empty spool behind"""
+        with self._lock:
+            replaying = self.path + ".replaying"
+            try:
+                os.replace(self.path, replaying)
+            except FileNotFoundError:
+                return []
+            with open(replaying, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            os.remove(replaying)
+            return records
+
+class WebhookDispatcher:
+    """Delivers webhook messages from a bounded queue on a pool of worker threads.
+
+    Producers only enqueue, so request handlers never wait on the network. Each
+    worker drains up to ``batch_size`` queued messages at a time and posts them
+    one by one, in the payload shape the receiver has always had, over a
+    shared, pooled HTTP session whose connections stay open between requests.
+    With ``envelope`` set, the ones addressed to the same endpoint go out in a
+    single ``{"messages": [...]}`` POST instead. When the queue is full new
+    messages are dropped and counted.
+
+    Failed messages are retried up to ``max_attempts`` times with full-jitter
+    exponential backoff, and each endpoint has a circuit breaker so an
+    unhealthy upstream is not hammered while it is down. Every message keeps
+    its own attempt count, and only requests that were actually sent count:
+    messages the breaker refuses are parked until it lets a probe through,
+    or until the probe in flight has its answer. Messages that run out of attempts, or that the
+    endpoint rejects outright, go to the dead-letter spool, from where
+    ``replay_dead_letters`` re-queues them; an envelope the endpoint rejects
+    is resent message by message first, so only the messages it refuses on
+    their own are dead-lettered.
+
+    Breakers, stats, logs and spooled records identify an endpoint by its
+    redacted URL, since webhook URLs carry secrets in their query string.
+    """
+
+    def __init__(self, api_key: Optional[str], queue_size: int = WEBHOOK_QUEUE_SIZE,
+                 workers: int = WEBHOOK_WORKERS, batch_size: int = WEBHOOK_BATCH_SIZE,
+                 envelope: bool = WEBHOOK_BATCH_ENVELOPE,
+                 timeout: float = WEBHOOK_TIMEOUT, max_attempts: int = WEBHOOK_MAX_ATTEMPTS,
+                 backoff_base: float = WEBHOOK_BACKOFF_BASE, backoff_max: float = WEBHOOK_BACKOFF_MAX,
+                 breaker_threshold: int = WEBHOOK_BREAKER_THRESHOLD,
+                 breaker_cooldown: float = WEBHOOK_BREAKER_COOLDOWN,
+                 dead_letter_path: str = WEBHOOK_DEAD_LETTER_PATH):
+        self.api_key = api_key
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.envelope = envelope
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.dead_letters = DeadLetterSpool(dead_letter_path)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._endpoints: Dict[str, str] = {}
+        self._retries: list = []
+        self._parked: Dict[str, list] = {}
+        self._retry_seq = itertools.count()
+        self._retry_wakeup = threading.Condition()
+        self.http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(1, workers))
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=2048)
+        self._threads: List[threading.Thread] = []
+        self.enqueued = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.failed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.short_circuited = 0
+        self.requests_sent = 0
+
+    def start(self):
+        if self._threads:
+            return
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"webhook-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._run_retries, name="webhook-retry", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def register(self, url: str) -> str:
+        """Remember ``url`` under its redacted form, so spooled messages can be replayed to it"""
+        endpoint = redact_url(url)
+        if self._endpoints.get(endpoint) != url:
+            self._endpoints[endpoint] = url
+        return endpoint
+
+    def submit(self, url: str, payload: dict, attempts: int = 0) -> bool:
+        """Queue a payload for delivery; returns False if it was dropped"""
+        self.register(url)
+        try:
+            self.queue.put_nowait((url, payload, time.monotonic(), attempts))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            logger.warning(f"Webhook queue full, dropping message for session {payload.get('session_id')}")
+            return False
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued or retrying message was delivered or dead-lettered"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks or self._retries or self._parked:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        endpoint = redact_url(url)
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers.setdefault(endpoint, CircuitBreaker(self.breaker_threshold, self.breaker_cooldown))
+        return breaker
+
+    def backoff(self, attempts: int) -> float:
+        """Full-jitter exponential backoff before the next attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1))))
+
+    def replay_dead_letters(self) -> dict:
+        """Re-queue every spooled message with a fresh attempt budget.
+
+        Messages for an endpoint this process has no full URL for stay spooled.
+        """
+        records = self.dead_letters.drain()
+        queued = 0
+        for record in records:
+            # Records spooled before endpoints were redacted still carry their full URL
+            endpoint = record.get("endpoint") or redact_url(record["url"])
+            url = record.get("url") or self._endpoints.get(endpoint)
+            if url is None:
+                error = "unknown endpoint on replay"
+            elif self.submit(url, record["payload"]):
+                queued += 1
+                continue
+            else:
+                error = "queue full on replay"
+            self.dead_letters.append(endpoint, record["payload"], record["attempts"], error)
+        return {"replayed": queued, "respooled": len(records) - queued}
+
+    def _fail(self, url: str, items: list, error: str, retriable: bool):
+        """Schedule another attempt for each item, or dead-letter the ones that are out of attempts"""
+        now = time.monotonic()
+        retries, dead = [], []
+        for _, payload, enqueued_at, attempts in items:
+            attempts += 1
+            if retriable and attempts < self.max_attempts:
+                due = now + self.backoff(attempts)
+                retries.append((due, next(self._retry_seq), url, payload, enqueued_at, attempts))
+            else:
+                dead.append((payload, attempts))
+        with self._stats_lock:
+            self.failed += len(items)
+            self.retried += len(retries)
+            self.dead_lettered += len(dead)
+        if retries:
+            with self._retry_wakeup:
+                for entry in retries:
+                    heapq.heappush(self._retries, entry)
+                self._retry_wakeup.notify()
+        for payload, attempts in dead:
+            try:
+                self.dead_letters.append(redact_url(url), payload, attempts, error)
+            except OSError as e:
+                logger.error(f"Could not spool dead webhook for session {payload.get('session_id')}: {e}")
+        if dead:
+            logger.error(f"Webhook to {redact_url(url)} failed ({error}); {len(dead)} message(s) dead-lettered")
+        else:
+            logger.warning(f"Webhook to {redact_url(url)} failed ({error}); {len(retries)} message(s) will be retried")
+
+    def _park(self, url: str, items: list, breaker: CircuitBreaker):
+        """Hold items the breaker refused, without using up an attempt, until it can let them through"""
+        with self._retry_wakeup:
+            # Read under the same lock _unpark takes, so a probe answered meanwhile cannot strand them
+            if breaker.state == "half_open":
+                self._parked.setdefault(redact_url(url), []).extend(items)
+                return
+            due = breaker.retry_at() if breaker.state == "open" else time.monotonic()
+            for _, payload, enqueued_at, attempts in items:
+                heapq.heappush(self._retries, (due, next(self._retry_seq), url, payload, enqueued_at, attempts))
+            self._retry_wakeup.notify()
+
+    def _unpark(self, url: str, breaker: CircuitBreaker):
+        """Release items parked behind a probe once it has its answer"""
+        with self._retry_wakeup:
+            # Parked by breaker, so they may include other URLs of the same endpoint
+            items = self._parked.pop(redact_url(url), None)
+            if not items:
+                return
+            due = breaker.retry_at() if breaker.state == "open" else time.monotonic()
+            for item_url, payload, enqueued_at, attempts in items:
+                heapq.heappush(self._retries, (due, next(self._retry_seq), item_url, payload, enqueued_at, attempts))
+            self._retry_wakeup.notify()
+
+    def _run_retries(self):
+        """Move retries whose backoff has elapsed back onto the delivery queue"""
+        while True:
+            with self._retry_wakeup:
+                while not self._retries or self._retries[0][0] > time.monotonic():
+                    self._retry_wakeup.wait(self._retries[0][0] - time.monotonic() if self._retries else None)
+                _, _, url, payload, enqueued_at, attempts = self._retries[0]
+                try:
+                    self.queue.put_nowait((url, payload, enqueued_at, attempts))
+                except queue.Full:
+                    self._retry_wakeup.wait(0.05)
+                    continue
+                heapq.heappop(self._retries)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_endpoint: Dict[str, list] = {}
+            for item in batch:
+                by_endpoint.setdefault(item[0], []).append(item)
+
+            for url, items in by_endpoint.items():
+                if self.envelope and len(items) > 1:
+                    self._send(url, items)
+                else:
+                    for item in items:
+                        self._send(url, [item])
+            for _ in batch:
+                self.queue.task_done()
+
+    def _send(self, url: str, items: list):
+        """Make one delivery attempt for ``items`` through the endpoint's circuit breaker"""
+        breaker = self.breaker(url)
+        if not breaker.allow(time.monotonic()):
+            with self._stats_lock:
+                self.short_circuited += len(items)
+            self._park(url, items, breaker)
+            return
+        try:
+            self._deliver(url, items)
+        except WebhookDeliveryError as e:
+            if e.retriable:
+                breaker.record_failure(time.monotonic())
+            else:
+                # The endpoint is up and answering; it refused this request, not every request
+                breaker.record_success()
+            if not e.retriable and len(items) > 1:
+                logger.warning(f"Webhook envelope to {redact_url(url)} rejected ({e}); resending its {len(items)} messages one by one")
+                for item in items:
+                    self._send(url, [item])
+            else:
+                self._fail(url, items, str(e), e.retriable)
+        except Exception as e:
+            breaker.record_failure(time.monotonic())
+            self._fail(url, items, f"{type(e).__name__}: {e}", True)
+        else:
+            breaker.record_success()
+        finally:
+            self._unpark(url, breaker)
+
+    def _deliver(self, url: str, items: list):
+        body = items[0][1] if len(items) == 1 else {"messages": [item[1] for item in items]}
+        with self._stats_lock:
+            self.requests_sent += 1
+        response = self.http.post(url, json=body, headers=self.headers, timeout=self.timeout)
+        if response.status_code != 200:
+            # Throttling and server errors are transient; other client errors will not improve
+            retriable = response.status_code == 429 or response.status_code >= 500
+            raise WebhookDeliveryError(f"status {response.status_code}", retriable)
+        now = time.monotonic()
+        with self._stats_lock:
+            self.delivered += len(items)
+            self._latencies.extend(now - item[2] for item in items)
+        if len(items) == 1:
+            logger.info(f"Webhook sent successfully to session {body.get('session_id')}")
+        else:
+            logger.info(f"Webhook batch of {len(items)} delivered")
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "delivered": self.delivered,
+                "failed": self.failed,
+                "retried": self.retried,
+                "dead_lettered": self.dead_lettered,
+                "short_circuited": self.short_circuited,
+                "requests_sent": self.requests_sent,
+                "pending_retries": len(self._retries),
+                "parked": sum(len(items) for items in list(self._parked.values())),
+                "workers": self.workers,
+                "batch_size": self.batch_size,
+                "envelope": self.envelope
+            }
+        stats["breakers"] = {url: breaker.stats() for url, breaker in list(self._breakers.items())}
+        stats["dead_letter_spool"] = {"path": self.dead_letters.path, "spooled": self.dead_letters.count()}
+        if latencies:
+            stats["latency_ms"] = {
+                "p50": round(latencies[len(latencies) // 2] * 1000, 2),
+                "p99": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2)
+            }
+        return stats
+
+webhook_dispatcher = WebhookDispatcher(OMNIDIMENSION_API_KEY)
+if OMNIDIMENSION_WEBHOOK_URL:
+    webhook_dispatcher.register(OMNIDIMENSION_WEBHOOK_URL)
+
+NOTIFY_COALESCE_MS = float(os.getenv('NOTIFY_COALESCE_MS', '250'))
+NOTIFY_SESSION_RATE = float(os.getenv('NOTIFY_SESSION_RATE', '1'))
+NOTIFY_SESSION_BURST = float(os.getenv('NOTIFY_SESSION_BURST', '3'))
+NOTIFY_HOST_RATE = float(os.getenv('NOTIFY_HOST_RATE', '200'))
+NOTIFY_HOST_BURST = float(os.getenv('NOTIFY_HOST_BURST', '400'))
+
+# Events that only matter in their latest form for a given product
+COALESCED_EVENT_TYPES = {"new_bid", "outbid", "auction_extended"}
+
+class TokenBucket:
+    """Allows ``rate`` messages per second on average with bursts of up to ``burst``"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def delay(self) -> float:
+        """Seconds until one whole token is available, as of the last refill"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+class NotificationOutbox:
+    """Per-session buffers that coalesce and rate-limit notifications ahead of the dispatcher.
+
+    A session's events are held for ``window`` seconds, during which a newer
+    event with the same key (event type and product) replaces the buffered
+    one, so a bidding war collapses into its latest bid. When the window
+    closes, messages are released only as far as the session's and the
+    webhook host's token buckets allow; the remainder stays buffered, where it
+    keeps coalescing, and is retried once tokens are back. Only superseded
+    events are ever dropped, never the latest state.
+    """
+
+    def __init__(self, dispatcher: WebhookDispatcher, window: float = NOTIFY_COALESCE_MS / 1000,
+                 session_rate: float = NOTIFY_SESSION_RATE, session_burst: float = NOTIFY_SESSION_BURST,
+                 host_rate: float = NOTIFY_HOST_RATE, host_burst: float = NOTIFY_HOST_BURST):
+        self.dispatcher = dispatcher
+        self.window = window
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._buffers: Dict[str, OrderedDict] = {}
+        self._due: list = []
+        self._session_buckets: Dict[str, TokenBucket] = {}
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._unique = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self.offered = 0
+        self.coalesced = 0
+        self.released = 0
+        self.deferred = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+            self._thread.start()
+
+    def offer(self, session_id: str, url: str, payload: dict, key: Optional[tuple] = None):
+        """Buffer a message; a later one with the same non-None ``key`` supersedes it"""
+        if key is None:
+            key = ("unique", next(self._unique))
+        with self._lock:
+            self.offered += 1
+            buffer = self._buffers.get(session_id)
+            if buffer is None:
+                buffer = self._buffers[session_id] = OrderedDict()
+                heapq.heappush(self._due, (time.monotonic() + self.window, session_id))
+                self._wakeup.notify()
+            elif key in buffer:
+                self.coalesced += 1
+                del buffer[key]
+            buffer[key] = (url, payload)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every buffered message has been handed to the dispatcher and attempted"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._buffers:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return self.dispatcher.flush(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def _bucket(self, buckets: Dict[str, TokenBucket], key: str, rate: float, burst: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    def _release(self, session_id: str, now: float) -> list:
+        """Take what the buckets allow from a session's buffer, rescheduling any remainder"""
+        buffer = self._buffers[session_id]
+        session_bucket = self._bucket(self._session_buckets, session_id, self.session_rate, self.session_burst)
+        session_bucket.refill(now)
+        released = []
+        host_bucket = None
+        while buffer and session_bucket.tokens >= 1:
+            key, (url, payload) = next(iter(buffer.items()))
+            host_bucket = self._bucket(self._host_buckets, urlparse(url).netloc, self.host_rate, self.host_burst)
+            if host_bucket.refill(now) < 1:
+                break
+            session_bucket.tokens -= 1
+            host_bucket.tokens -= 1
+            del buffer[key]
+            released.append((url, payload))
+        self.released += len(released)
+
+        if buffer:
+            self.deferred += 1
+            delay = max(session_bucket.delay(), host_bucket.delay() if host_bucket is not None else 0.0)
+            heapq.heappush(self._due, (now + max(delay, 0.001), session_id))
+        else:
+            del self._buffers[session_id]
+            if len(self._session_buckets) > 2 * len(self._buffers) + 1024:
+                self._prune_buckets(now)
+        return released
+
+    def _prune_buckets(self, now: float):
+        """Forget idle sessions whose buckets have refilled; a fresh bucket is identical"""
+        for session_id, bucket in list(self._session_buckets.items()):
+            if session_id not in self._buffers and bucket.refill(now) >= bucket.burst:
+                del self._session_buckets[session_id]
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._due or self._due[0][0] > time.monotonic():
+                    self._wakeup.wait(self._due[0][0] - time.monotonic() if self._due else None)
+                _, session_id = heapq.heappop(self._due)
+                released = self._release(session_id, time.monotonic())
+            for url, payload in released:
+                self.dispatcher.submit(url, payload)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buffered_sessions": len(self._buffers),
+                "buffered_messages": sum(len(buffer) for buffer in self._buffers.values()),
+                "offered": self.offered,
+                "coalesced": self.coalesced,
+                "released": self.released,
+                "deferred": self.deferred
+            }
+
+notification_outbox = NotificationOutbox(webhook_dispatcher)
+
+def send_omnidimension_webhook(session_id: str, message: str, data: Optional[dict] = None):
+    """Queue a webhook notification to OmniDimension for a specific session"""
+    if not OMNIDIMENSION_WEBHOOK_URL:
+        logger.warning("OmniDimension webhook URL not configured")
+        return
+    
+    data = data or {}
+    payload = {
+        "session_id": session_id,
+        "message": message,
+        "timestamp": datetime.now().isoformat(),
+        "data": data
+    }
+    key = (data["type"], data.get("product_id")) if data.get("type") in COALESCED_EVENT_TYPES else None
+    notification_outbox.offer(session_id, OMNIDIMENSION_WEBHOOK_URL, payload, key)
+
+# ===== AUCTION EXPIRY =====
+
+class ExpiryScheduler:
+    """Fires a callback for each product when its auction deadline passes.
+
+    Deadlines live in a min-heap keyed by epoch seconds, and the scheduler thread
+    sleeps exactly until the earliest one. Rescheduling pushes a new heap entry
+    in O(log N) and leaves the old one behind; stale entries are recognised on
+    pop by comparing against the product's current deadline.
+    """
+
+    def __init__(self, on_expire):
+        self.on_expire = on_expire
+        self._cond = threading.Condition()
+        self._heap: list = []
+        self._deadlines: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="auction-expiry", daemon=True)
+            self._thread.start()
+
+    def schedule(self, product_id: str, end_time: datetime):
+        """Insert or move a product's deadline"""
+        deadline = end_time.timestamp()
+        with self._cond:
+            self._deadlines[product_id] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._seq), product_id))
+            if len(self._heap) > 2 * len(self._deadlines) + 64:
+                self._compact()
+            if self._heap[0][2] == product_id:
+                self._cond.notify()
+
+    def cancel(self, product_id: str):
+        with self._cond:
+            self._deadlines.pop(product_id, None)
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._deadlines.get(entry[2]) == entry[0]]
+        heapq.heapify(self._heap)
+
+    def _next_due(self) -> str:
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, _, product_id = self._heap[0]
+                if self._deadlines.get(product_id) != deadline:
+                    heapq.heappop(self._heap)
+                    continue
+                delay = deadline - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                del self._deadlines[product_id]
+                return product_id
+
+    def _run(self):
+        while True:
+            product_id = self._next_due()
+            try:
+                self.on_expire(product_id)
+            except Exception as e:
+                logger.error(f"Error in auction expiry for {product_id}: {e}")
+
+def expire_auction(product_id: str):
+    """Close an auction whose deadline has been reached and notify sessions"""
+    if not repository.has_product(product_id):
+        return
+    
+    if not bid_engine.end_auction(product_id, datetime.now()):
+        # Woken marginally early or the deadline moved; try again at the real deadline
+        product = repository.get_product(product_id, with_history=False)
+        if product["status"] == "active":
+            expiry_scheduler.schedule(product_id, product["auction_end_time"])
+        return
+    
+    product = repository.get_product(product_id, with_history=False)
+    logger.info(f"Auction for {product['name']} has ended! Winner: {product['highest_bidder']} with ${product['current_highest_bid']:.2f}")
+    
+    # Notify stream subscribers and active voice sessions about auction end
+    publish_auction_event({
+        "type": "auction_ended",
+        "product_id": product_id,
+        "product_name": product["name"],
+        "final_amount": product["current_highest_bid"],
+        "winner": product["highest_bidder"]
+    })
+
+expiry_scheduler = ExpiryScheduler(expire_auction)
+
+def notification_targets(update_data) -> List[str]:
+    """Sessions that should hear about an event: the displaced bidder's for outbid, the product's subscribers otherwise"""
+    if update_data["type"] == "outbid":
+        return repository.sessions_for_user(update_data["previous_bidder"])
+    return repository.sessions_for_product(update_data["product_id"])
+
+def notify_voice_sessions(update_data):
+    """Notify the voice sessions interested in an update"""
+    for session_id in notification_targets(update_data):
+        try:
+            message = ""
+            if update_data["type"] == "auction_ended":
+                message = f"ATTENTION: The auction for {update_data['product_name']} has ended! Final winning bid: ${update_data['final_amount']:.2f}"
+            elif update_data["type"] == "new_bid":
+                message = f"NEW BID ALERT: ${update_data['amount']:.2f} placed on {update_data['product_name']}"
+            elif update_data["type"] == "outbid":
+                message = f"You have been outbid on {update_data['product_name']}! New highest bid: ${update_data['new_amount']:.2f}"
+            elif update_data["type"] == "auction_extended":
+                message = f"The auction for {update_data['product_name']} has been extended after a last-minute bid."
+            
+            send_omnidimension_webhook(session_id, message, update_data)
+            
+        except Exception as e:
+            logger.error(f"Error notifying session {session_id}: {e}")
+
+# ===== EVENT STREAM =====
+
+SSE_REPLAY_BUFFER_SIZE = int(os.getenv('SSE_REPLAY_BUFFER_SIZE', '1000'))
+SSE_SUBSCRIBER_QUEUE_SIZE = int(os.getenv('SSE_SUBSCRIBER_QUEUE_SIZE', '256'))
+SSE_KEEPALIVE_SECONDS = float(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+# Each open stream holds one worker thread; keep this below gunicorn's --threads so requests still get one
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', '48'))
+
+class StreamLimitReached(Exception):
+    """The worker already serves as many event streams as it allows"""
+
+class EventSubscription:
+    """One stream consumer: a bounded queue of pre-encoded SSE frames"""
+
+    def __init__(self, product_ids: Optional[set], maxsize: int):
+        self.product_ids = product_ids
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+        self.closed = False
+
+    def offer(self, frame: str):
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            # A consumer this far behind is disconnected and resumes via Last-Event-ID
+            self.overflowed = True
+
+class EventBus:
+    """Fans auction events out to stream subscribers.
+
+    Each event is encoded to an SSE frame once and shared by every subscriber.
+    Subscribers filtered to specific products are indexed by product id, so a
+    publish touches only the unfiltered subscribers plus those watching that
+    product. The last ``buffer_size`` frames are kept for Last-Event-ID replay.
+
+    Streams are served on worker threads, one each, so at most
+    ``max_subscribers`` are open at a time; ``subscribe`` refuses the rest
+    with StreamLimitReached instead of letting them take every thread.
+    """
+
+    def __init__(self, buffer_size: int = SSE_REPLAY_BUFFER_SIZE,
+                 subscriber_queue_size: int = SSE_SUBSCRIBER_QUEUE_SIZE,
+                 max_subscribers: int = SSE_MAX_STREAMS):
+        self.subscriber_queue_size = subscriber_queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers = 0
+        self.refused = 0
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._buffer = deque(maxlen=buffer_size)
+        self._all_subscribers = set()
+        self._product_subscribers: Dict[str, set] = {}
+
+    def publish(self, event: dict, event_id: Optional[int] = None) -> int:
+        """Deliver an event; ``event_id`` overrides the local sequence when ids are assigned elsewhere"""
+        with self._lock:
+            event_id = self._last_id + 1 if event_id is None else event_id
+            self._last_id = event_id
+            product_id = event.get("product_id")
+            frame = f"id: {event_id}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            self._buffer.append((event_id, product_id, frame))
+            subscribers = list(self._all_subscribers)
+            subscribers.extend(self._product_subscribers.get(product_id, ()))
+        for subscription in subscribers:
+            subscription.offer(frame)
+        return event_id
+
+    def subscribe(self, product_ids: Optional[set] = None, last_event_id: Optional[int] = None):
+        """Register a subscriber; returns it and whether the requested replay was complete"""
+        subscription = EventSubscription(product_ids, self.subscriber_queue_size)
+        with self._lock:
+            if self.subscribers >= self.max_subscribers:
+                self.refused += 1
+                raise StreamLimitReached(f"{self.subscribers} event streams already open")
+            self.subscribers += 1
+            complete = True
+            if last_event_id is not None:
+                oldest = self._buffer[0][0] if self._buffer else self._last_id + 1
+                complete = oldest - 1 <= last_event_id <= self._last_id
+                for event_id, product_id, frame in self._buffer:
+                    if event_id > last_event_id and (product_ids is None or product_id in product_ids):
+                        subscription.offer(frame)
+            if product_ids is None:
+                self._all_subscribers.add(subscription)
+            else:
+                for product_id in product_ids:
+                    self._product_subscribers.setdefault(product_id, set()).add(subscription)
+        return subscription, complete
+
+    def unsubscribe(self, subscription: EventSubscription):
+        """Drop a subscriber; safe to call more than once"""
+        with self._lock:
+            if subscription.closed:
+                return
+            subscription.closed = True
+            self.subscribers -= 1
+            if subscription.product_ids is None:
+                self._all_subscribers.discard(subscription)
+                return
+            for product_id in subscription.product_ids:
+                subscribers = self._product_subscribers.get(product_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._product_subscribers[product_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "last_event_id": self._last_id,
+                "buffered_events": len(self._buffer),
+                "subscribers": self.subscribers,
+                "max_subscribers": self.max_subscribers,
+                "refused": self.refused
+            }
+
+event_bus = EventBus()
+
+def publish_auction_event(update_data):
+    """Send an auction event to stream subscribers and active voice sessions"""
+    if shared_events is not None:
+        # Every worker's relay, including this one, feeds it to its own subscribers
+        shared_events.publish(update_data)
+    else:
+        event_bus.publish(update_data)
+    notify_voice_sessions(update_data)
+
+# ===== STORAGE =====
+
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'memory')
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'auction.db')
+SESSION_IDLE_TTL_SECONDS = float(os.getenv('SESSION_IDLE_TTL_SECONDS', '1800'))
+SESSION_CAPACITY = int(os.getenv('SESSION_CAPACITY', '10000'))
+SESSION_REAP_INTERVAL_SECONDS = float(os.getenv('SESSION_REAP_INTERVAL_SECONDS', '30'))
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv('IDEMPOTENCY_TTL_SECONDS', '600'))
+IDEMPOTENCY_CAPACITY = int(os.getenv('IDEMPOTENCY_CAPACITY', '100000'))
+
+class SessionStore:
+    """Voice sessions bounded by an idle TTL on ``last_activity`` and a capacity.
+
+    A min-heap of (last_activity, session_id) with lazy deletion orders the
+    sessions by idleness: touching a session pushes a fresh entry, and stale
+    ones are skipped when they surface. The top of the heap is both the next
+    session to time out and the least recently used one to evict when full.
+
+    It also indexes sessions by user and by the products they are subscribed
+    to, so notifications reach only the sessions that care; the indexes are
+    cleaned up whenever a session leaves, however it leaves.
+    """
+
+    def __init__(self, sessions: dict, idle_ttl: float = SESSION_IDLE_TTL_SECONDS,
+                 capacity: int = SESSION_CAPACITY):
+        self._sessions = sessions
+        self._heap = [(session["last_activity"], session_id) for session_id, session in sessions.items()]
+        heapq.heapify(self._heap)
+        self._by_user: Dict[str, set] = {}
+        self._by_product: Dict[str, set] = {}
+        self._products_of: Dict[str, set] = {}
+        for session_id, session in sessions.items():
+            self._by_user.setdefault(session["user_id"], set()).add(session_id)
+        self._lock = threading.Lock()
+        self.idle_ttl = timedelta(seconds=idle_ttl)
+        self.capacity = capacity
+        self.reaped = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[dict]:
+        return self._sessions.get(session_id)
+
+    def items(self) -> list:
+        return list(self._sessions.items())
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._heap.clear()
+            self._by_user.clear()
+            self._by_product.clear()
+            self._products_of.clear()
+
+    def _discard(self, session_id: str) -> Optional[dict]:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return None
+        user_sessions = self._by_user.get(session["user_id"])
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._by_user[session["user_id"]]
+        for product_id in self._products_of.pop(session_id, ()):
+            product_sessions = self._by_product[product_id]
+            product_sessions.discard(session_id)
+            if not product_sessions:
+                del self._by_product[product_id]
+        return session
+
+    def subscribe(self, session_id: str, product_id: str):
+        with self._lock:
+            if session_id in self._sessions:
+                self._products_of.setdefault(session_id, set()).add(product_id)
+                self._by_product.setdefault(product_id, set()).add(session_id)
+
+    def unsubscribe(self, session_id: str, product_id: str):
+        with self._lock:
+            products = self._products_of.get(session_id)
+            if products is not None and product_id in products:
+                products.discard(product_id)
+                product_sessions = self._by_product[product_id]
+                product_sessions.discard(session_id)
+                if not product_sessions:
+                    del self._by_product[product_id]
+
+    def for_product(self, product_id: str) -> List[str]:
+        with self._lock:
+            return list(self._by_product.get(product_id, ()))
+
+    def for_user(self, user_id: str) -> List[str]:
+        with self._lock:
+            return list(self._by_user.get(user_id, ()))
+
+    def _push(self, session_id: str, last_activity: datetime):
+        heapq.heappush(self._heap, (last_activity, session_id))
+        if len(self._heap) > 2 * len(self._sessions) + 64:
+            self._heap = [(session["last_activity"], sid) for sid, session in self._sessions.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_oldest(self) -> Optional[str]:
+        """Remove and return the least recently active session id, skipping stale heap entries"""
+        while self._heap:
+            last_activity, session_id = heapq.heappop(self._heap)
+            session = self._sessions.get(session_id)
+            if session is not None and session["last_activity"] == last_activity:
+                self._discard(session_id)
+                return session_id
+        return None
+
+    def _oldest_activity(self) -> Optional[datetime]:
+        while self._heap:
+            last_activity, session_id = self._heap[0]
+            session = self._sessions.get(session_id)
+            if session is not None and session["last_activity"] == last_activity:
+                return last_activity
+            heapq.heappop(self._heap)
+        return None
+
+    def put(self, session_id: str, session: dict) -> List[str]:
+        """Add or replace a session; returns the ids evicted to stay within capacity"""
+        evicted = []
+        with self._lock:
+            self._discard(session_id)
+            self._sessions[session_id] = session
+            self._by_user.setdefault(session["user_id"], set()).add(session_id)
+            self._push(session_id, session["last_activity"])
+            while len(self._sessions) > self.capacity:
+                evicted.append(self._pop_oldest())
+            self.evicted += len(evicted)
+        return evicted
+
+    def pop(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._discard(session_id)
+
+    def touch(self, session_id: str, last_activity: datetime):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session["last_activity"] = last_activity
+                self._push(session_id, last_activity)
+
+    def reap(self, now: datetime) -> List[str]:
+        """Remove sessions idle for longer than the TTL; returns their ids"""
+        reaped = []
+        cutoff = now - self.idle_ttl
+        with self._lock:
+            while True:
+                oldest = self._oldest_activity()
+                if oldest is None or oldest >= cutoff:
+                    break
+                reaped.append(self._pop_oldest())
+            self.reaped += len(reaped)
+        return reaped
+
+    def stats(self) -> dict:
+        return {
+            "live": len(self._sessions),
+            "capacity": self.capacity,
+            "idle_ttl_seconds": self.idle_ttl.total_seconds(),
+            "reaped": self.reaped,
+            "evicted": self.evicted
+        }
+
+class IdempotencyCache:
+    """Recent request outcomes by idempotency key, bounded by a TTL and a capacity.
+
+    ``claim`` atomically reserves a key for the caller (a pending entry with
+    no status yet) or hands back the existing entry. Every entry lives for the
+    same TTL, so insertion order is expiry order and the oldest entries are
+    the ones pruned or evicted.
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, capacity: int = IDEMPOTENCY_CAPACITY):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, fingerprint: str, now: float) -> Optional[dict]:
+        with self._lock:
+            while self._entries and next(iter(self._entries.values()))["expires_at"] <= now:
+                self._entries.popitem(last=False)
+            entry = self._entries.get(key)
+            if entry is not None:
+                return dict(entry)
+            if len(self._entries) >= self.capacity:
+                self._entries.popitem(last=False)
+            self._entries[key] = {"fingerprint": fingerprint, "status": None, "body": None,
+                                  "expires_at": now + self.ttl}
+            return None
+
+    def complete(self, key: str, status: int, body: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["status"] = status
+                entry["body"] = body
+
+    def release(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+BID_EPOCH = datetime(1970, 1, 1)
+
+class BidHistory:
+    """Read-only list-like view over the bids whose row numbers are in ``rows``"""
+
+    __slots__ = ("_rows", "_materialize")
+
+    def __init__(self, rows: array, materialize):
+        self._rows = rows
+        self._materialize = materialize
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(row) for row in self._rows[index]]
+        return self._materialize(self._rows[index])
+
+    def __iter__(self):
+        return (self._materialize(row) for row in self._rows)
+
+    def to_list(self) -> List[dict]:
+        return [self._materialize(row) for row in self._rows]
+
+class BidStore:
+    """Append-only columnar storage for every bid held by InMemoryRepository.
+
+    A bid is a row number into parallel arrays of amounts, timestamps
+    (seconds since BID_EPOCH) and interned product and bidder ids: 24 bytes
+    per bid, plus 4 in each of the per-product and per-bidder row indexes.
+    Bid dicts are only built when read. The row number doubles as the bid
+    id, handed out as a decimal string because bid ids are strings on every
+    backend. Bids loaded with some other id (seed data) keep it in
+    ``_external_ids``; ids from older logs and snapshots are read as
+    strings too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._keys: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.amounts = array("d")
+        self.timestamps = array("d")
+        self.product_keys = array("I")
+        self.bidder_keys = array("I")
+        self._by_product: Dict[str, array] = {}
+        self._by_bidder: Dict[str, array] = {}
+        self._external_ids: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def _key(self, name: str) -> int:
+        key = self._keys.get(name)
+        if key is None:
+            key = self._keys[name] = len(self.names)
+            self.names.append(name)
+        return key
+
+    def _rows(self, index: Dict[str, array], name: str) -> array:
+        rows = index.get(name)
+        if rows is None:
+            with self._lock:
+                rows = index.setdefault(name, array("I"))
+        return rows
+
+    def append(self, product_id: str, bidder_id: str, amount: float, timestamp: datetime, bid_id=None) -> int:
+        with self._lock:
+            row = len(self.amounts)
+            self.amounts.append(amount)
+            self.timestamps.append((timestamp - BID_EPOCH).total_seconds())
+            self.product_keys.append(self._key(product_id))
+            self.bidder_keys.append(self._key(bidder_id))
+            self._by_product.setdefault(product_id, array("I")).append(row)
+            self._by_bidder.setdefault(bidder_id, array("I")).append(row)
+            if bid_id is not None and str(bid_id) != str(row):
+                self._external_ids[row] = str(bid_id)
+        return row
+
+    def bid_id(self, row: int) -> str:
+        return self._external_ids.get(row) or str(row)
+
+    def product_id(self, row: int) -> str:
+        return self.names[self.product_keys[row]]
+
+    def timestamp(self, row: int) -> datetime:
+        return BID_EPOCH + timedelta(seconds=self.timestamps[row])
+
+    def bid(self, row: int) -> dict:
+        return {
+            "bid_id": self._external_ids.get(row) or str(row),
+            "bidder_id": self.names[self.bidder_keys[row]],
+            "amount": self.amounts[row],
+            "timestamp": self.timestamp(row)
+        }
+
+    def product_history(self, product_id: str) -> BidHistory:
+        return BidHistory(self._rows(self._by_product, product_id), self.bid)
+
+    def bidder_history(self, bidder_id: str, materialize) -> BidHistory:
+        return BidHistory(self._rows(self._by_bidder, bidder_id), materialize)
+
+    def export(self) -> dict:
+        """Copy the columns; callers must hold off writers while this runs"""
+        return {
+            "names": list(self.names),
+            "product_keys": self.product_keys[:],
+            "bidder_keys": self.bidder_keys[:],
+            "amounts": self.amounts[:],
+            "timestamps": self.timestamps[:],
+            "external_ids": dict(self._external_ids)
+        }
+
+    def load(self, columns: dict):
+        """Replace the contents with exported columns, rebuilding the indexes"""
+        names = columns["names"]
+        external_ids = {int(row): str(bid_id) for row, bid_id in columns["external_ids"].items()}
+        with self._lock:
+            self.clear()
+            for name in names:
+                self._key(name)
+            self.product_keys.extend(columns["product_keys"])
+            self.bidder_keys.extend(columns["bidder_keys"])
+            self.amounts.extend(columns["amounts"])
+            self.timestamps.extend(columns["timestamps"])
+            self._external_ids = external_ids
+            for row, (product_key, bidder_key) in enumerate(zip(self.product_keys, self.bidder_keys)):
+                self._by_product.setdefault(names[product_key], array("I")).append(row)
+                self._by_bidder.setdefault(names[bidder_key], array("I")).append(row)
+
+class ActiveBids:
+    """A user's open bids keyed by product_id, with winning and outbid counts kept current.
+
+    Iterates in the order the bids were last placed, matching the list it
+    replaced; ``to_list`` gives that list for responses.
+    """
+
+    __slots__ = ("_bids", "winning", "outbid")
+
+    def __init__(self, bids=()):
+        self._bids: Dict[str, dict] = {}
+        self.winning = 0
+        self.outbid = 0
+        for bid in bids:
+            self._bids[bid["product_id"]] = dict(bid)
+            self._count(bid["status"], 1)
+
+    def _count(self, status: str, delta: int):
+        if status == "winning":
+            self.winning += delta
+        elif status == "outbid":
+            self.outbid += delta
+
+    def place(self, product_id: str, product_name: str, amount: float):
+        previous = self._bids.pop(product_id, None)
+        if previous is not None:
+            self._count(previous["status"], -1)
+        self._bids[product_id] = {
+            "product_id": product_id,
+            "product_name": product_name,
+            "amount": amount,
+            "status": "winning"
+        }
+        self.winning += 1
+
+    def mark_outbid(self, product_id: str):
+        bid = self._bids.get(product_id)
+        if bid is not None and bid["status"] == "winning":
+            bid["status"] = "outbid"
+            self.winning -= 1
+            self.outbid += 1
+
+    def __len__(self) -> int:
+        return len(self._bids)
+
+    def __iter__(self):
+        return iter(self._bids.values())
+
+    def to_list(self) -> List[dict]:
+        return list(self._bids.values())
+
+class ProductIndex:
+    """Product ids in end-time order, overall and per status and lower-cased category.
+
+    ``find`` bisects the end-time window out of whichever matching order is
+    shortest and checks the other filters against each candidate, so a
+    filtered listing costs time in proportion to those candidates rather
+    than to the catalogue, and comes out already ordered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}
+        self._by_end_time: List[tuple] = []
+        self._by_status: Dict[str, List[tuple]] = {}
+        self._by_category: Dict[str, List[tuple]] = {}
+
+    def _orders(self, entry: tuple) -> List[List[tuple]]:
+        return [self._by_end_time, self._by_status.setdefault(entry[0], []),
+                self._by_category.setdefault(entry[1], [])]
+
+    def put(self, product: dict):
+        """Index a new product or re-index one whose status, category or end time changed"""
+        product_id = product["id"]
+        entry = (product["status"], product["category"].lower(), product["auction_end_time"])
+        with self._lock:
+            previous = self._entries.get(product_id)
+            if previous == entry:
+                return
+            if previous is not None:
+                for order in self._orders(previous):
+                    del order[bisect.bisect_left(order, (previous[2], product_id))]
+            self._entries[product_id] = entry
+            for order in self._orders(entry):
+                bisect.insort(order, (entry[2], product_id))
+
+    def find(self, status: Optional[str] = None, category: Optional[str] = None,
+             ends_after: Optional[datetime] = None, ends_before: Optional[datetime] = None) -> List[str]:
+        """Ids of products matching every given filter, soonest ending first; end bounds are inclusive"""
+        with self._lock:
+            category = category.lower() if category is not None else None
+            # Each order with the filters its products still have to be checked against
+            orders = [(self._by_end_time, status, category)]
+            if status is not None:
+                orders.append((self._by_status.get(status, []), None, category))
+            if category is not None:
+                orders.append((self._by_category.get(category, []), status, None))
+            windows = []
+            for order, check_status, check_category in orders:
+                start = 0 if ends_after is None else bisect.bisect_left(order, (ends_after, ""))
+                stop = len(order) if ends_before is None else bisect.bisect_right(order, (ends_before, "\U0010ffff"))
+                windows.append((stop - start, start, stop, order, check_status, check_category))
+            _, start, stop, order, check_status, check_category = min(windows, key=lambda window: window[0])
+            window = order[start:stop]
+            if check_status is None and check_category is None:
+                return [product_id for _, product_id in window]
+            entries = self._entries
+            return [product_id for _, product_id in window
+                    if (check_status is None or entries[product_id][0] == check_status)
+                    and (check_category is None or entries[product_id][1] == check_category)]
+
+class InMemoryRepository:
+    """Products, bids, users and voice sessions held in process memory.
+
+    Product dicts handed out are the live records. They are only mutated
+    through ``record_bid``, ``set_product_status`` and ``set_auction_end_time``
+    inside ``transaction``,
+    which BidEngine always enters while holding the product's lock. Bids live
+    in a BidStore; product and user ``bidding_history`` entries are views
+    into it. User records keep ``active_bids`` as an ActiveBids index and are
+    handed out as shallow copies carrying plain lists.
+    """
+
+    backend = "memory"
+
+    def __init__(self, data: dict, sessions: dict):
+        # Change versions start over with the process, so tokens from an earlier one must not match
+        self.epoch = uuid.uuid4().hex[:8]
+        self.products = data["products"]
+        self.users = data["users"]
+        self.bids = BidStore()
+        self.index = ProductIndex()
+        for product in list(self.products.values()):
+            self.put_product(product)
+        for user in list(self.users.values()):
+            self.put_user(user)
+        self.sessions = sessions if isinstance(sessions, SessionStore) else SessionStore(sessions)
+        self.idempotency = IdempotencyCache()
+        self.proxies: Dict[str, Dict[str, tuple]] = {}
+        self.registry_lock = threading.Lock()
+        self._user_locks: Dict[str, threading.Lock] = {}
+
+    # Products and bids
+
+    def product_ids(self) -> List[str]:
+        return list(self.products)
+
+    def has_product(self, product_id: str) -> bool:
+        return product_id in self.products
+
+    def get_product(self, product_id: str, with_history: bool = True) -> Optional[dict]:
+        return self.products.get(product_id)
+
+    def put_product(self, product: dict):
+        """Store a product, moving any plain-list bidding history into the bid store"""
+        history = product.get("bidding_history")
+        if isinstance(history, list):
+            for bid in history:
+                self.bids.append(product["id"], bid["bidder_id"], bid["amount"], bid["timestamp"], bid["bid_id"])
+        product["bidding_history"] = self.bids.product_history(product["id"])
+        self.products[product["id"]] = product
+        self.index.put(product)
+
+    def find_products(self, status: Optional[str] = None, category: Optional[str] = None,
+                      ends_after: Optional[datetime] = None, ends_before: Optional[datetime] = None) -> List[str]:
+        """Ids of products matching every given filter, soonest ending first"""
+        return self.index.find(status, category, ends_after, ends_before)
+
+    @contextmanager
+    def transaction(self, product_id: str):
+        yield self.products.get(product_id)
+
+    @contextmanager
+    def batch(self):
+        """Group several transactions; in memory each one is already applied in place"""
+        yield
+
+    def after_commit(self, callback):
+        """Run ``callback`` once the current transaction commits; in memory changes are applied at once"""
+        callback()
+
+    def set_product_status(self, product: dict, status: str):
+        product["status"] = status
+        self.index.put(product)
+
+    def set_auction_end_time(self, product: dict, end_time: datetime):
+        product["auction_end_time"] = end_time
+        self.index.put(product)
+
+    @staticmethod
+    def _history_page(history: list, limit: int, cursor: Optional[int]):
+        """Newest-first page of an append-only list; the cursor is the list position to continue below"""
+        end = len(history) if cursor is None else min(cursor, len(history))
+        start = max(0, end - limit)
+        return history[start:end][::-1], (start if start > 0 else None)
+
+    def product_bids(self, product_id: str, limit: int, cursor: Optional[int] = None):
+        return self._history_page(self.products[product_id]["bidding_history"], limit, cursor)
+
+    def user_bids(self, user_id: str, limit: int, cursor: Optional[int] = None):
+        return self._history_page(self.users[user_id]["bidding_history"], limit, cursor)
+
+    def record_bid(self, product: dict, new_bid: dict):
+        """Apply an accepted bid to the product, the bidder and the bidder it displaced"""
+        product_id = product["id"]
+        bidder_id = new_bid["bidder_id"]
+        bid_amount = new_bid["amount"]
+        previous_highest_bidder = product["highest_bidder"]
+
+        row = self.bids.append(product_id, bidder_id, bid_amount, new_bid["timestamp"], new_bid["bid_id"])
+        new_bid["bid_id"] = self.bids.bid_id(row)
+        product["current_highest_bid"] = bid_amount
+        product["highest_bidder"] = bidder_id
+        product["total_bids"] += 1
+
+        user = self._ensure_user(bidder_id)
+        with self._user_lock(bidder_id):
+            user["active_bids"].place(product_id, product["name"], bid_amount)
+
+        if previous_highest_bidder and previous_highest_bidder != bidder_id:
+            prev_user = self.users.get(previous_highest_bidder)
+            if prev_user is not None:
+                with self._user_lock(previous_highest_bidder):
+                    prev_user["active_bids"].mark_outbid(product_id)
+
+    def proxy_bids(self, product_id: str) -> Dict[str, tuple]:
+        """Registered maximum bids on a lot as bidder id -> (max_amount, registered_at)"""
+        return dict(self.proxies.get(product_id, ()))
+
+    def set_proxy_bid(self, product_id: str, bidder_id: str, max_amount: float, registered_at: float):
+        self.proxies.setdefault(product_id, {})[bidder_id] = (max_amount, registered_at)
+
+    # Users
+
+    def _user_lock(self, user_id: str) -> threading.Lock:
+        lock = self._user_locks.get(user_id)
+        if lock is None:
+            with self.registry_lock:
+                lock = self._user_locks.setdefault(user_id, threading.Lock())
+        return lock
+
+    def _user_bid(self, row: int) -> dict:
+        product_id = self.bids.product_id(row)
+        return {
+            "product_id": product_id,
+            "product_name": self.products[product_id]["name"],
+            "amount": self.bids.amounts[row],
+            "timestamp": self.bids.timestamp(row).isoformat(),
+            "status": "winning"
+        }
+
+    def put_user(self, user: dict):
+        """Store a user; its bid history is always derived from the bid store"""
+        user["bidding_history"] = self.bids.bidder_history(user["id"], self._user_bid)
+        if not isinstance(user["active_bids"], ActiveBids):
+            user["active_bids"] = ActiveBids(user["active_bids"])
+        self.users[user["id"]] = user
+
+    def _ensure_user(self, user_id: str, name: Optional[str] = None, phone: str = "") -> dict:
+        user = self.users.get(user_id)
+        if user is None:
+            with self.registry_lock:
+                user = self.users.get(user_id)
+                if user is None:
+                    user = {
+                        "id": user_id,
+                        "name": name or f"User {user_id}",
+                        "phone": phone,
+                        "bidding_history": None,
+                        "total_spent": 0.0,
+                        "active_bids": ActiveBids()
+                    }
+                    self.put_user(user)
+        return user
+
+    @staticmethod
+    def _user_view(user: dict, with_history: bool = True) -> dict:
+        view = dict(user, active_bids=user["active_bids"].to_list())
+        if with_history:
+            view["bidding_history"] = user["bidding_history"].to_list()
+        else:
+            del view["bidding_history"]
+            view["total_bids"] = len(user["bidding_history"])
+        return view
+
+    def ensure_user(self, user_id: str, name: Optional[str] = None, phone: str = "") -> dict:
+        """Create the user if needed; returns the record without its bid history"""
+        return self._user_view(self._ensure_user(user_id, name, phone), with_history=False)
+
+    def get_user(self, user_id: str, with_history: bool = True) -> Optional[dict]:
+        user = self.users.get(user_id)
+        return self._user_view(user, with_history) if user is not None else None
+
+    def list_users(self, with_history: bool = True) -> Dict[str, dict]:
+        return {user_id: self._user_view(user, with_history) for user_id, user in list(self.users.items())}
+
+    def bid_standing(self, user_id: str) -> dict:
+        """Counts of the user's active bids that are winning and outbid"""
+        user = self.users.get(user_id)
+        if user is None:
+            return {"winning": 0, "outbid": 0}
+        return {"winning": user["active_bids"].winning, "outbid": user["active_bids"].outbid}
+
+    # Voice sessions
+
+    def get_session(self, session_id: str) -> Optional[dict]:
+        return self.sessions.get(session_id)
+
+    def put_session(self, session_id: str, session: dict) -> List[str]:
+        """Store a session; returns the ids of least recently active sessions evicted to make room"""
+        return self.sessions.put(session_id, session)
+
+    def pop_session(self, session_id: str) -> Optional[dict]:
+        return self.sessions.pop(session_id)
+
+    def touch_session(self, session_id: str, last_activity: datetime):
+        self.sessions.touch(session_id, last_activity)
+
+    def list_sessions(self) -> Dict[str, dict]:
+        return dict(self.sessions.items())
+
+    def reap_sessions(self, now: datetime) -> List[str]:
+        """Drop sessions idle past the TTL; returns their ids"""
+        return self.sessions.reap(now)
+
+    def subscribe_session(self, session_id: str, product_id: str):
+        self.sessions.subscribe(session_id, product_id)
+
+    def unsubscribe_session(self, session_id: str, product_id: str):
+        self.sessions.unsubscribe(session_id, product_id)
+
+    def sessions_for_product(self, product_id: str) -> List[str]:
+        return self.sessions.for_product(product_id)
+
+    def sessions_for_user(self, user_id: str) -> List[str]:
+        return self.sessions.for_user(user_id)
+
+    def session_stats(self) -> dict:
+        return self.sessions.stats()
+
+    # Idempotency keys
+
+    def claim_idempotency_key(self, key: str, fingerprint: str) -> Optional[dict]:
+        """Reserve ``key``; returns None if reserved, else the existing entry (status None while pending)"""
+        return self.idempotency.claim(key, fingerprint, time.time())
+
+    def complete_idempotency_key(self, key: str, status: int, body: str):
+        self.idempotency.complete(key, status, body)
+
+    def release_idempotency_key(self, key: str):
+        self.idempotency.release(key)
+
+class SQLiteRepository:
+    """The same storage interface backed by a SQLite database in WAL mode.
+
+    Each thread gets its own connection; statements are issued with bound
+    parameters so the per-connection statement cache reuses their compiled
+    form. Every call blocks its thread, so serve it from real threads (the
+    gthread worker): under gevent each greenlet would open a connection of
+    its own and every query, busy wait included, would stall the whole
+    worker. ``transaction`` opens a BEGIN IMMEDIATE write transaction, so the
+    read-validate-write of a bid stays atomic even across processes sharing
+    the database file.
+    """
+
+    backend = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS products (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            starting_price REAL NOT NULL,
+            current_highest_bid REAL NOT NULL,
+            highest_bidder TEXT,
+            auction_end_time TEXT NOT NULL,
+            total_bids INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            category TEXT NOT NULL DEFAULT '',
+            image_url TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS products_status_end ON products (status, auction_end_time);
+        CREATE INDEX IF NOT EXISTS products_category_end ON products (category COLLATE NOCASE, auction_end_time);
+        CREATE INDEX IF NOT EXISTS products_end ON products (auction_end_time);
+        CREATE TABLE IF NOT EXISTS bids (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            bid_id TEXT NOT NULL UNIQUE,
+            product_id TEXT NOT NULL,
+            bidder_id TEXT NOT NULL,
+            amount REAL NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS bids_product_time ON bids (product_id, timestamp);
+        -- Lookups by product alone use bids_product_time; databases created before that still carry this one
+        DROP INDEX IF EXISTS bids_product;
+        CREATE INDEX IF NOT EXISTS bids_bidder ON bids (bidder_id);
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            phone TEXT NOT NULL DEFAULT '',
+            total_spent REAL NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS active_bids (
+            user_id TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            product_name TEXT NOT NULL,
+            amount REAL NOT NULL,
+            status TEXT NOT NULL,
+            PRIMARY KEY (user_id, product_id)
+        );
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            phone_number TEXT NOT NULL DEFAULT '',
+            start_time TEXT NOT NULL,
+            last_activity TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_activity ON sessions (last_activity);
+        CREATE INDEX IF NOT EXISTS sessions_user ON sessions (user_id);
+        CREATE TABLE IF NOT EXISTS session_products (
+            session_id TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            PRIMARY KEY (session_id, product_id)
+        );
+        CREATE INDEX IF NOT EXISTS session_products_product ON session_products (product_id);
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            product_id TEXT,
+            payload TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS proxy_bids (
+            product_id TEXT NOT NULL,
+            bidder_id TEXT NOT NULL,
+            max_amount REAL NOT NULL,
+            registered_at REAL NOT NULL,
+            PRIMARY KEY (product_id, bidder_id)
+        );
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            key TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            status INTEGER,
+            body TEXT,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idempotency_keys_expiry ON idempotency_keys (expires_at);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    PRODUCT_COLUMNS = ("id", "name", "description", "starting_price", "current_highest_bid", "highest_bidder",
+                       "auction_end_time", "total_bids", "status", "category", "image_url")
+
+    def __init__(self, path: str, seed: Optional[dict] = None, idle_ttl: float = SESSION_IDLE_TTL_SECONDS,
+                 capacity: int = SESSION_CAPACITY):
+        self.path = path
+        self.idle_ttl = timedelta(seconds=idle_ttl)
+        self.session_capacity = capacity
+        self.sessions_reaped = 0
+        self.sessions_evicted = 0
+        self.idempotency_ttl = IDEMPOTENCY_TTL_SECONDS
+        self._idempotency_claims = itertools.count()
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(self.SCHEMA)
+        # Event ids are versions for as long as this database lives; every worker shares its epoch
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)", (uuid.uuid4().hex[:8],))
+        self.epoch = conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()[0]
+        if seed is not None and conn.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 0:
+            self._seed(seed)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=OFF")
+            self._local.conn = conn
+            self._local.after_commit = []
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._conn()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            self._local.after_commit = []
+            conn.execute("ROLLBACK")
+            raise
+        try:
+            conn.execute("COMMIT")
+        finally:
+            callbacks, self._local.after_commit = self._local.after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def after_commit(self, callback):
+        """Run ``callback`` once this thread's write transaction commits, or now if there is none"""
+        if self._conn().in_transaction:
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    def _seed(self, data: dict):
+        with self._write() as conn:
+            for product in data["products"].values():
+                conn.execute(
+                    f"INSERT INTO products ({', '.join(self.PRODUCT_COLUMNS)}) VALUES ({', '.join('?' * len(self.PRODUCT_COLUMNS))})",
+                    [product["auction_end_time"].isoformat() if column == "auction_end_time" else product[column]
+                     for column in self.PRODUCT_COLUMNS])
+                for bid in product["bidding_history"]:
+                    conn.execute(
+                        "INSERT INTO bids (bid_id, product_id, bidder_id, amount, timestamp) VALUES (?, ?, ?, ?, ?)",
+                        (bid["bid_id"], product["id"], bid["bidder_id"], bid["amount"], bid["timestamp"].isoformat()))
+            for user in data["users"].values():
+                conn.execute("INSERT INTO users (id, name, phone, total_spent) VALUES (?, ?, ?, ?)",
+                             (user["id"], user["name"], user["phone"], user["total_spent"]))
+
+    # Products and bids
+
+    def _product_from_row(self, row) -> dict:
+        product = dict(zip(self.PRODUCT_COLUMNS, row))
+        product["auction_end_time"] = datetime.fromisoformat(product["auction_end_time"])
+        return product
+
+    def _load_product(self, conn, product_id: str, with_history: bool) -> Optional[dict]:
+        row = conn.execute(f"SELECT {', '.join(self.PRODUCT_COLUMNS)} FROM products WHERE id = ?", (product_id,)).fetchone()
+        if row is None:
+            return None
+        product = self._product_from_row(row)
+        if with_history:
+            product["bidding_history"] = [
+                {"bid_id": bid_id, "bidder_id": bidder_id, "amount": amount, "timestamp": datetime.fromisoformat(timestamp)}
+                for bid_id, bidder_id, amount, timestamp in conn.execute(
+                    "SELECT bid_id, bidder_id, amount, timestamp FROM bids WHERE product_id = ? ORDER BY timestamp, seq",
+                    (product_id,))
+            ]
+        return product
+
+    def product_ids(self) -> List[str]:
+        return [row[0] for row in self._conn().execute("SELECT id FROM products ORDER BY rowid")]
+
+    def has_product(self, product_id: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM products WHERE id = ?", (product_id,)).fetchone() is not None
+
+    def find_products(self, status: Optional[str] = None, category: Optional[str] = None,
+                      ends_after: Optional[datetime] = None, ends_before: Optional[datetime] = None) -> List[str]:
+        """Ids of products matching every given filter, soonest ending first, answered from the product indexes"""
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if category is not None:
+            clauses.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        # ISO timestamps compare in time order as text
+        if ends_after is not None:
+            clauses.append("auction_end_time >= ?")
+            params.append(ends_after.isoformat())
+        if ends_before is not None:
+            clauses.append("auction_end_time <= ?")
+            params.append(ends_before.isoformat())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return [row[0] for row in self._conn().execute(
+            f"SELECT id FROM products {where} ORDER BY auction_end_time, id", params)]
+
+    def get_product(self, product_id: str, with_history: bool = True) -> Optional[dict]:
+        conn = self._conn()
+        if not with_history or conn.in_transaction:
+            return self._load_product(conn, product_id, with_history)
+        conn.execute("BEGIN")
+        try:
+            return self._load_product(conn, product_id, with_history)
+        finally:
+            conn.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self, product_id: str):
+        with self._write() as conn:
+            yield self._load_product(conn, product_id, with_history=False)
+
+    @contextmanager
+    def batch(self):
+        """Run the enclosed transactions inside one write transaction and a single commit"""
+        with self._write():
+            yield
+
+    def set_product_status(self, product: dict, status: str):
+        with self._write() as conn:
+            conn.execute("UPDATE products SET status = ? WHERE id = ?", (status, product["id"]))
+        product["status"] = status
+
+    def set_auction_end_time(self, product: dict, end_time: datetime):
+        with self._write() as conn:
+            conn.execute("UPDATE products SET auction_end_time = ? WHERE id = ?", (end_time.isoformat(), product["id"]))
+        product["auction_end_time"] = end_time
+
+    def _history_page(self, sql: str, key: str, limit: int, cursor: Optional[int]):
+        """Newest-first page of bids; the cursor is the bid sequence number to continue below"""
+        upper = cursor if cursor is not None else (1 << 63) - 1
+        rows = self._conn().execute(sql, (key, upper, limit + 1)).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [row[1:] for row in rows[:limit]], next_cursor
+
+    def product_bids(self, product_id: str, limit: int, cursor: Optional[int] = None):
+        rows, next_cursor = self._history_page(
+            "SELECT seq, bid_id, bidder_id, amount, timestamp FROM bids "
+            "WHERE product_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?", product_id, limit, cursor)
+        return [{"bid_id": bid_id, "bidder_id": bidder_id, "amount": amount, "timestamp": datetime.fromisoformat(timestamp)}
+                for bid_id, bidder_id, amount, timestamp in rows], next_cursor
+
+    def user_bids(self, user_id: str, limit: int, cursor: Optional[int] = None):
+        rows, next_cursor = self._history_page(
+            "SELECT b.seq, b.product_id, p.name, b.amount, b.timestamp FROM bids b JOIN products p ON p.id = b.product_id "
+            "WHERE b.bidder_id = ? AND b.seq < ? ORDER BY b.seq DESC LIMIT ?", user_id, limit, cursor)
+        return [{"product_id": product_id, "product_name": product_name, "amount": amount,
+                 "timestamp": timestamp, "status": "winning"}
+                for product_id, product_name, amount, timestamp in rows], next_cursor
+
+    def record_bid(self, product: dict, new_bid: dict):
+        """Apply an accepted bid to the product, the bidder and the bidder it displaced"""
+        product_id = product["id"]
+        bidder_id = new_bid["bidder_id"]
+        previous_highest_bidder = product["highest_bidder"]
+        if new_bid["bid_id"] is None:
+            new_bid["bid_id"] = str(uuid.uuid4())
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE products SET current_highest_bid = ?, highest_bidder = ?, total_bids = total_bids + 1 WHERE id = ?",
+                (new_bid["amount"], bidder_id, product_id))
+            conn.execute(
+                "INSERT INTO bids (bid_id, product_id, bidder_id, amount, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (new_bid["bid_id"], product_id, bidder_id, new_bid["amount"], new_bid["timestamp"].isoformat()))
+            conn.execute("INSERT OR IGNORE INTO users (id, name, phone, total_spent) VALUES (?, ?, '', 0)",
+                         (bidder_id, f"User {bidder_id}"))
+            conn.execute(
+                "INSERT OR REPLACE INTO active_bids (user_id, product_id, product_name, amount, status) VALUES (?, ?, ?, ?, 'winning')",
+                (bidder_id, product_id, product["name"], new_bid["amount"]))
+            if previous_highest_bidder and previous_highest_bidder != bidder_id:
+                conn.execute("UPDATE active_bids SET status = 'outbid' WHERE user_id = ? AND product_id = ?",
+                             (previous_highest_bidder, product_id))
+        product["current_highest_bid"] = new_bid["amount"]
+        product["highest_bidder"] = bidder_id
+        product["total_bids"] += 1
+
+    def proxy_bids(self, product_id: str) -> Dict[str, tuple]:
+        """Registered maximum bids on a lot as bidder id -> (max_amount, registered_at)"""
+        rows = self._conn().execute(
+            "SELECT bidder_id, max_amount, registered_at FROM proxy_bids WHERE product_id = ?", (product_id,))
+        return {bidder_id: (max_amount, registered_at) for bidder_id, max_amount, registered_at in rows}
+
+    def set_proxy_bid(self, product_id: str, bidder_id: str, max_amount: float, registered_at: float):
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO proxy_bids (product_id, bidder_id, max_amount, registered_at) VALUES (?, ?, ?, ?)",
+                (product_id, bidder_id, max_amount, registered_at))
+
+    # Users
+
+    def ensure_user(self, user_id: str, name: Optional[str] = None, phone: str = "") -> dict:
+        with self._write() as conn:
+            conn.execute("INSERT OR IGNORE INTO users (id, name, phone, total_spent) VALUES (?, ?, ?, 0)",
+                         (user_id, name or f"User {user_id}", phone))
+        return self.get_user(user_id, with_history=False)
+
+    def _load_user(self, conn, row, with_history: bool = True) -> dict:
+        user_id, name, phone, total_spent = row
+        user = {
+            "id": user_id,
+            "name": name,
+            "phone": phone,
+            "total_spent": total_spent,
+            "active_bids": [
+                {"product_id": product_id, "product_name": product_name, "amount": amount, "status": status}
+                for product_id, product_name, amount, status in conn.execute(
+                    "SELECT product_id, product_name, amount, status FROM active_bids WHERE user_id = ? ORDER BY rowid",
+                    (user_id,))
+            ]
+        }
+        if with_history:
+            user["bidding_history"] = [
+                {"product_id": product_id, "product_name": product_name, "amount": amount,
+                 "timestamp": timestamp, "status": "winning"}
+                for product_id, product_name, amount, timestamp in conn.execute(
+                    "SELECT b.product_id, p.name, b.amount, b.timestamp FROM bids b JOIN products p ON p.id = b.product_id "
+                    "WHERE b.bidder_id = ? ORDER BY b.seq", (user_id,))
+            ]
+        else:
+            user["total_bids"] = conn.execute("SELECT COUNT(*) FROM bids WHERE bidder_id = ?", (user_id,)).fetchone()[0]
+        return user
+
+    def get_user(self, user_id: str, with_history: bool = True) -> Optional[dict]:
+        conn = self._conn()
+        row = conn.execute("SELECT id, name, phone, total_spent FROM users WHERE id = ?", (user_id,)).fetchone()
+        return self._load_user(conn, row, with_history) if row is not None else None
+
+    def list_users(self, with_history: bool = True) -> Dict[str, dict]:
+        conn = self._conn()
+        return {row[0]: self._load_user(conn, row, with_history)
+                for row in conn.execute("SELECT id, name, phone, total_spent FROM users ORDER BY rowid").fetchall()}
+
+    def bid_standing(self, user_id: str) -> dict:
+        """Counts of the user's active bids that are winning and outbid"""
+        standing = {"winning": 0, "outbid": 0}
+        standing.update(self._conn().execute(
+            "SELECT status, COUNT(*) FROM active_bids WHERE user_id = ? GROUP BY status", (user_id,)).fetchall())
+        return standing
+
+    # Voice sessions
+
+    def _session_from_row(self, row) -> dict:
+        user_id, phone_number, start_time, last_activity = row
+        return {
+            "user_id": user_id,
+            "phone_number": phone_number,
+            "start_time": datetime.fromisoformat(start_time),
+            "last_activity": datetime.fromisoformat(last_activity)
+        }
+
+    def get_session(self, session_id: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT user_id, phone_number, start_time, last_activity FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return self._session_from_row(row) if row is not None else None
+
+    def put_session(self, session_id: str, session: dict) -> List[str]:
+        """Store a session; returns the ids of least recently active sessions evicted to make room"""
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, user_id, phone_number, start_time, last_activity) VALUES (?, ?, ?, ?, ?)",
+                (session_id, session["user_id"], session["phone_number"],
+                 session["start_time"].isoformat(), session["last_activity"].isoformat()))
+            excess = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.session_capacity
+            evicted = []
+            if excess > 0:
+                evicted = [row[0] for row in conn.execute(
+                    "SELECT id FROM sessions ORDER BY last_activity LIMIT ?", (excess,)).fetchall()]
+                self._delete_sessions(conn, evicted)
+        self.sessions_evicted += len(evicted)
+        return evicted
+
+    @staticmethod
+    def _delete_sessions(conn, session_ids: List[str]):
+        conn.executemany("DELETE FROM sessions WHERE id = ?", [(sid,) for sid in session_ids])
+        conn.executemany("DELETE FROM session_products WHERE session_id = ?", [(sid,) for sid in session_ids])
+
+    def pop_session(self, session_id: str) -> Optional[dict]:
+        with self._write() as conn:
+            session = self.get_session(session_id)
+            if session is not None:
+                self._delete_sessions(conn, [session_id])
+        return session
+
+    def touch_session(self, session_id: str, last_activity: datetime):
+        with self._write() as conn:
+            conn.execute("UPDATE sessions SET last_activity = ? WHERE id = ?", (last_activity.isoformat(), session_id))
+
+    def list_sessions(self) -> Dict[str, dict]:
+        return {row[0]: self._session_from_row(row[1:]) for row in self._conn().execute(
+            "SELECT id, user_id, phone_number, start_time, last_activity FROM sessions ORDER BY rowid").fetchall()}
+
+    def reap_sessions(self, now: datetime) -> List[str]:
+        """Drop sessions idle past the TTL; returns their ids"""
+        cutoff = (now - self.idle_ttl).isoformat()
+        with self._write() as conn:
+            reaped = [row[0] for row in conn.execute(
+                "SELECT id FROM sessions WHERE last_activity < ?", (cutoff,)).fetchall()]
+            self._delete_sessions(conn, reaped)
+        self.sessions_reaped += len(reaped)
+        return reaped
+
+    def subscribe_session(self, session_id: str, product_id: str):
+        with self._write() as conn:
+            conn.execute("INSERT OR IGNORE INTO session_products (session_id, product_id) "
+                         "SELECT id, ? FROM sessions WHERE id = ?", (product_id, session_id))
+
+    def unsubscribe_session(self, session_id: str, product_id: str):
+        with self._write() as conn:
+            conn.execute("DELETE FROM session_products WHERE session_id = ? AND product_id = ?",
+                         (session_id, product_id))
+
+    def sessions_for_product(self, product_id: str) -> List[str]:
+        return [row[0] for row in self._conn().execute(
+            "SELECT session_id FROM session_products WHERE product_id = ?", (product_id,))]
+
+    def sessions_for_user(self, user_id: str) -> List[str]:
+        return [row[0] for row in self._conn().execute("SELECT id FROM sessions WHERE user_id = ?", (user_id,))]
+
+    def session_stats(self) -> dict:
+        return {
+            "live": self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0],
+            "capacity": self.session_capacity,
+            "idle_ttl_seconds": self.idle_ttl.total_seconds(),
+            "reaped": self.sessions_reaped,
+            "evicted": self.sessions_evicted
+        }
+
+    # Cross-process event feed
+
+    def append_event(self, event_type: str, product_id: Optional[str], payload: str) -> int:
+        with self._write() as conn:
+            return conn.execute("INSERT INTO events (type, product_id, payload) VALUES (?, ?, ?)",
+                                (event_type, product_id, payload)).lastrowid
+
+    def events_after(self, event_id: int, limit: int = 1000) -> list:
+        return self._conn().execute(
+            "SELECT id, type, product_id, payload FROM events WHERE id > ? ORDER BY id LIMIT ?",
+            (event_id, limit)).fetchall()
+
+    def last_event_id(self) -> int:
+        return self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def prune_events(self, keep: int):
+        with self._write() as conn:
+            conn.execute("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?", (keep,))
+
+    # Idempotency keys
+
+    def claim_idempotency_key(self, key: str, fingerprint: str) -> Optional[dict]:
+        """Reserve ``key``; returns None if reserved, else the existing entry (status None while pending)"""
+        now = time.time()
+        with self._write() as conn:
+            if next(self._idempotency_claims) % 256 == 0:
+                conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+            else:
+                conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND expires_at <= ?", (key, now))
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO idempotency_keys (key, fingerprint, expires_at) VALUES (?, ?, ?)",
+                (key, fingerprint, now + self.idempotency_ttl)).rowcount
+            if inserted:
+                return None
+            row = conn.execute("SELECT fingerprint, status, body FROM idempotency_keys WHERE key = ?",
+                               (key,)).fetchone()
+        return {"fingerprint": row[0], "status": row[1], "body": row[2]}
+
+    def complete_idempotency_key(self, key: str, status: int, body: str):
+        with self._write() as conn:
+            conn.execute("UPDATE idempotency_keys SET status = ?, body = ? WHERE key = ?", (status, body, key))
+
+    def release_idempotency_key(self, key: str):
+        with self._write() as conn:
+            conn.execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+
+if STORAGE_BACKEND == "sqlite":
+    repository = SQLiteRepository(SQLITE_PATH, seed=auction_data)
+else:
+    repository = InMemoryRepository(auction_data, active_voice_sessions)
+
+# ===== BID ENGINE =====
+
+MINIMUM_BID_INCREMENT = 50.00
+# Soft close: a bid in the final window pushes the deadline out to at least the extension; 0 disables it
+SOFT_CLOSE_WINDOW_SECONDS = float(os.getenv('SOFT_CLOSE_WINDOW_SECONDS', '30'))
+SOFT_CLOSE_EXTENSION_SECONDS = float(os.getenv('SOFT_CLOSE_EXTENSION_SECONDS', '60'))
+
+class BidRejected(Exception):
+    """Raised by BidEngine when a bid fails validation.
+
+    For ``proxy_lowered`` the ``minimum_bid`` is the bidder's existing maximum.
+    """
+
+    def __init__(self, reason: str, product: Optional[dict] = None, minimum_bid: float = 0.0):
+        super().__init__(reason)
+        self.reason = reason
+        self.product_name = product["name"] if product else None
+        self.current_highest_bid = product["current_highest_bid"] if product else None
+        self.minimum_bid = minimum_bid
+
+class BidEngine:
+    """Applies bids atomically under a per-product lock.
+
+    Validation and the repository's bid write (history append, the bidder's
+    user record and the previous bidder's outbid transition) run while holding
+    the product's lock and inside a repository transaction, so concurrent bids
+    on the same lot are serialized while bids on different lots proceed in
+    parallel.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+        self.journal = None
+        self._registry_lock = threading.Lock()
+        self._product_locks: Dict[str, threading.Lock] = {}
+        self._change_listeners: list = []
+        self._transaction_listeners: list = []
+        self._deadline_listeners: list = []
+
+    def add_change_listener(self, listener):
+        """Register a callable invoked with the product id, under the product lock, once every change has committed"""
+        self._change_listeners.append(listener)
+
+    def add_transaction_listener(self, listener):
+        """Register a callable invoked with the product id inside the write transaction of every change"""
+        self._transaction_listeners.append(listener)
+
+    def add_deadline_listener(self, listener):
+        """Register a callable invoked with the product id and new end time, under the product lock, once an extension commits"""
+        self._deadline_listeners.append(listener)
+
+    def _product_changed(self, product_id: str):
+        for listener in self._transaction_listeners:
+            listener(product_id)
+        # Caches dropped before the commit could be refilled with the old state by a concurrent reader
+        self.repository.after_commit(functools.partial(self._notify_changed, product_id))
+
+    def _notify_changed(self, product_id: str):
+        for listener in self._change_listeners:
+            listener(product_id)
+
+    def _notify_deadline(self, product_id: str, end_time: datetime):
+        for listener in self._deadline_listeners:
+            listener(product_id, end_time)
+
+    def product_replaced(self, product_id: str):
+        """Tell every listener about a product written straight to the repository, as snapshot recovery does"""
+        with self.product_lock(product_id), self.repository.transaction(product_id):
+            self._product_changed(product_id)
+
+    def product_lock(self, product_id: str) -> threading.Lock:
+        lock = self._product_locks.get(product_id)
+        if lock is None:
+            with self._registry_lock:
+                lock = self._product_locks.setdefault(product_id, threading.Lock())
+        return lock
+
+    @contextmanager
+    def frozen(self, *extra_locks):
+        """Block every bid and status change: all product locks, then ``extra_locks`` in order"""
+        locks = [self.product_lock(product_id) for product_id in sorted(self.repository.product_ids())]
+        locks.extend(extra_locks)
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def place_bid(self, product_id: str, bidder_id: str, bid_amount: float) -> dict:
+        """Validate and apply a bid, returning the accepted bid and the state it replaced"""
+        if not self.repository.has_product(product_id):
+            raise BidRejected("not_found")
+
+        with self.product_lock(product_id), self.repository.transaction(product_id) as product:
+            result, lsn = self._place_locked(product, bidder_id, bid_amount)
+
+        # Wait for the group commit outside the lock so other bids on this lot keep flowing
+        result["durable"] = self._wait_durable(lsn)
+        return result
+
+    def place_bids(self, bids: List[tuple]) -> list:
+        """Validate and apply ``(product_id, bidder_id, amount)`` bids in order.
+
+        The locks of every lot involved are taken once, in sorted order like
+        ``frozen``, and the repository writes share one batch. Each outcome is
+        either the result ``place_bid`` would return or the BidRejected it
+        would raise. The journal is waited on once, for the last record, and
+        its answer is every accepted result's ``durable``.
+        """
+        product_ids = sorted({product_id for product_id, _, _ in bids if self.repository.has_product(product_id)})
+        locks = [self.product_lock(product_id) for product_id in product_ids]
+        known = set(product_ids)
+        outcomes = []
+        last_lsn = None
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self.repository.batch():
+                for product_id, bidder_id, bid_amount in bids:
+                    if product_id not in known:
+                        outcomes.append(BidRejected("not_found"))
+                        continue
+                    try:
+                        with self.repository.transaction(product_id) as product:
+                            result, lsn = self._place_locked(product, bidder_id, bid_amount)
+                    except BidRejected as e:
+                        outcomes.append(e)
+                        continue
+                    outcomes.append(result)
+                    last_lsn = lsn if lsn is not None else last_lsn
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        durable = self._wait_durable(last_lsn)
+        for outcome in outcomes:
+            if not isinstance(outcome, BidRejected):
+                outcome["durable"] = durable
+        return outcomes
+
+    def _place_locked(self, product: dict, bidder_id: str, bid_amount: float):
+        """Validate and apply a bid with the product lock held; returns the result and its journal LSN"""
+        current_time = datetime.now()
+        if current_time >= product["auction_end_time"] or product["status"] != "active":
+            raise BidRejected("ended", product)
+
+        minimum_bid = product["current_highest_bid"] + MINIMUM_BID_INCREMENT
+        if bid_amount <= product["current_highest_bid"]:
+            raise BidRejected("too_low", product, minimum_bid)
+        if bid_amount < minimum_bid:
+            raise BidRejected("increment_too_small", product, minimum_bid)
+
+        previous_highest_bid = product["current_highest_bid"]
+        previous_highest_bidder = product["highest_bidder"]
+        # Extend before applying, so the bid's change notification covers the new deadline too
+        extended = self._soft_close(product, current_time)
+        bid = self._apply_bid(product, bidder_id, bid_amount, None, current_time)["bid"]
+        lsn = self._journal_bid(product["id"], bid)
+        automatic_bids, proxy_lsn = self._resolve_proxies(product, current_time)
+        result = self._settled(product, bid, previous_highest_bid, previous_highest_bidder, automatic_bids)
+        result["extended"] = extended
+        return result, proxy_lsn if proxy_lsn is not None else lsn
+
+    def _soft_close(self, product: dict, current_time: datetime) -> bool:
+        """Push the deadline out when a bid lands in the closing window; returns True if it moved.
+
+        The new deadline is the bid time plus the extension, rounded up to a
+        whole second, so a burst of bids in the same second moves it once.
+        """
+        if SOFT_CLOSE_WINDOW_SECONDS <= 0:
+            return False
+        remaining = (product["auction_end_time"] - current_time).total_seconds()
+        if remaining > SOFT_CLOSE_WINDOW_SECONDS:
+            return False
+        end_time = current_time + timedelta(seconds=SOFT_CLOSE_EXTENSION_SECONDS)
+        if end_time.microsecond:
+            end_time = end_time.replace(microsecond=0) + timedelta(seconds=1)
+        if end_time <= product["auction_end_time"]:
+            return False
+
+        self.repository.set_auction_end_time(product, end_time)
+        if self.journal is not None:
+            self.journal.append({
+                "type": "auction_extended",
+                "product_id": product["id"],
+                "auction_end_time": end_time.isoformat()
+            })
+        # A rolled-back extension must not leave the expiry scheduler holding its deadline
+        self.repository.after_commit(functools.partial(self._notify_deadline, product["id"], end_time))
+        return True
+
+    def set_proxy_bid(self, product_id: str, bidder_id: str, max_amount: float) -> dict:
+        """Register or raise a bidder's maximum bid on a lot and let the proxies answer it at once.
+
+        The result has the same shape as ``place_bid``'s; ``bid`` is the
+        registering bidder's last automatic bid, or None if none was needed.
+        """
+        if not self.repository.has_product(product_id):
+            raise BidRejected("not_found")
+
+        with self.product_lock(product_id), self.repository.transaction(product_id) as product:
+            current_time = datetime.now()
+            if current_time >= product["auction_end_time"] or product["status"] != "active":
+                raise BidRejected("ended", product)
+
+            existing = self.repository.proxy_bids(product_id).get(bidder_id)
+            if existing is not None and max_amount < existing[0]:
+                raise BidRejected("proxy_lowered", product, existing[0])
+            minimum_bid = product["current_highest_bid"] + MINIMUM_BID_INCREMENT
+            if max_amount <= product["current_highest_bid"]:
+                raise BidRejected("too_low", product, minimum_bid)
+            # The leader only raises its ceiling; anyone else must be able to make a legal bid
+            if product["highest_bidder"] != bidder_id and max_amount < minimum_bid:
+                raise BidRejected("increment_too_small", product, minimum_bid)
+
+            registered_at = existing[1] if existing is not None else time.time()
+            self.repository.set_proxy_bid(product_id, bidder_id, max_amount, registered_at)
+            lsn = None
+            if self.journal is not None:
+                lsn = self.journal.append({
+                    "type": "proxy_bid",
+                    "product_id": product_id,
+                    "bidder_id": bidder_id,
+                    "max_amount": max_amount,
+                    "registered_at": registered_at
+                })
+
+            previous_highest_bid = product["current_highest_bid"]
+            previous_highest_bidder = product["highest_bidder"]
+            automatic_bids, proxy_lsn = self._resolve_proxies(product, current_time)
+            extended = bool(automatic_bids) and self._soft_close(product, current_time)
+            if extended:
+                self._product_changed(product_id)
+            own_bids = [bid for bid in automatic_bids if bid["bidder_id"] == bidder_id]
+            result = self._settled(product, own_bids[-1] if own_bids else None,
+                                   previous_highest_bid, previous_highest_bidder, automatic_bids)
+            result["max_amount"] = max_amount
+            result["extended"] = extended
+            lsn = proxy_lsn if proxy_lsn is not None else lsn
+
+        result["durable"] = self._wait_durable(lsn)
+        return result
+
+    def replay_auction_extension(self, record: dict):
+        product_id = record["product_id"]
+        with self.product_lock(product_id), self.repository.transaction(product_id) as product:
+            self.repository.set_auction_end_time(product, datetime.fromisoformat(record["auction_end_time"]))
+            self._product_changed(product_id)
+
+    def replay_proxy_bid(self, record: dict):
+        self.repository.set_proxy_bid(record["product_id"], record["bidder_id"],
+                                      record["max_amount"], record["registered_at"])
+
+    def _resolve_proxies(self, product: dict, current_time: datetime):
+        """Let registered maximum bids answer the current price in one pass, eBay style.
+
+        The strongest party (highest maximum; ties go to the current leader,
+        then to the earliest registration) wins at one increment over the
+        runner-up's maximum, capped at its own. Instead of the whole chain of
+        increments, at most two bids are recorded: the runner-up's last legal
+        bid and the winner's. Returns the automatic bids and the journal LSN
+        of the last one.
+        """
+        price = product["current_highest_bid"]
+        leader = product["highest_bidder"]
+        proxies = self.repository.proxy_bids(product["id"])
+        parties = [(max_amount, registered_at, bidder_id) for bidder_id, (max_amount, registered_at) in proxies.items()
+                   if bidder_id != leader and max_amount >= price + MINIMUM_BID_INCREMENT]
+        if not parties:
+            return [], None
+        if leader is not None:
+            parties.append((max(price, proxies.get(leader, (price,))[0]), float("-inf"), leader))
+        parties.sort(key=lambda party: (-party[0], party[1]))
+
+        winner_max, _, winner = parties[0]
+        planned = []
+        floor = price
+        if len(parties) > 1:
+            runner_max, _, runner = parties[1]
+            target = min(winner_max, runner_max + MINIMUM_BID_INCREMENT)
+            runner_bid = min(runner_max, target - MINIMUM_BID_INCREMENT)
+            if runner_bid >= price + MINIMUM_BID_INCREMENT:
+                planned.append((runner, runner_bid))
+                floor = runner_bid
+        else:
+            target = price + MINIMUM_BID_INCREMENT
+        planned.append((winner, max(target, floor + MINIMUM_BID_INCREMENT)))
+
+        automatic_bids = []
+        lsn = None
+        for bidder_id, amount in planned:
+            bid = self._apply_bid(product, bidder_id, amount, None, current_time)["bid"]
+            lsn = self._journal_bid(product["id"], bid)
+            automatic_bids.append(bid)
+        return automatic_bids, lsn
+
+    def _wait_durable(self, lsn: Optional[int]) -> bool:
+        """Wait for a journal record; False if its group commit failed.
+
+        By then the change is applied and visible, so it stands either way:
+        the log keeps the record and writes it with the next group that
+        succeeds. Callers report it accepted and notify as usual.
+        """
+        if lsn is None:
+            return True
+        try:
+            self.journal.wait_durable(lsn)
+        except BidLogError as e:
+            logger.error(f"{e}; the change stands and its log record will be written by the next commit")
+            return False
+        return True
+
+    def _journal_bid(self, product_id: str, bid: dict) -> Optional[int]:
+        if self.journal is None:
+            return None
+        return self.journal.append({
+            "type": "bid",
+            "product_id": product_id,
+            "bid_id": bid["bid_id"],
+            "bidder_id": bid["bidder_id"],
+            "amount": bid["amount"],
+            "timestamp": bid["timestamp"].isoformat()
+        })
+
+    @staticmethod
+    def _settled(product: dict, bid: Optional[dict], previous_highest_bid: float,
+                 previous_highest_bidder: Optional[str], automatic_bids: list) -> dict:
+        """Describe the final state of a lot after a bid and any automatic bids it triggered"""
+        displaced = []
+        for holder in [previous_highest_bidder] + [automatic["bidder_id"] for automatic in automatic_bids]:
+            if holder and holder != product["highest_bidder"] and holder not in displaced:
+                displaced.append(holder)
+        return {
+            "bid": bid,
+            "product_id": product["id"],
+            "product_name": product["name"],
+            "previous_highest_bid": previous_highest_bid,
+            "previous_highest_bidder": previous_highest_bidder,
+            "current_highest_bid": product["current_highest_bid"],
+            "highest_bidder": product["highest_bidder"],
+            "automatic_bids": automatic_bids,
+            "outbid_bidders": displaced,
+            "total_bids": product["total_bids"],
+            "auction_end_time": product["auction_end_time"]
+        }
+
+    def replay_bid(self, record: dict):
+        """Re-apply a journaled bid without validation"""
+        product_id = record["product_id"]
+        with self.product_lock(product_id), self.repository.transaction(product_id) as product:
+            self._apply_bid(product, record["bidder_id"], record["amount"], record["bid_id"],
+                            datetime.fromisoformat(record["timestamp"]))
+
+    def _apply_bid(self, product: dict, bidder_id: str, bid_amount: float,
+                   bid_id, current_time: datetime) -> dict:
+        """Record a validated bid; a ``bid_id`` of None lets the repository assign one"""
+        new_bid = {
+            "bid_id": bid_id,
+            "bidder_id": bidder_id,
+            "amount": bid_amount,
+            "timestamp": current_time
+        }
+
+        previous_highest_bid = product["current_highest_bid"]
+        previous_highest_bidder = product["highest_bidder"]
+        self.repository.record_bid(product, new_bid)
+        self._product_changed(product["id"])
+
+        return {
+            "bid": new_bid,
+            "product_id": product["id"],
+            "product_name": product["name"],
+            "previous_highest_bid": previous_highest_bid,
+            "previous_highest_bidder": previous_highest_bidder,
+            "total_bids": product["total_bids"],
+            "auction_end_time": product["auction_end_time"]
+        }
+
+    def end_auction(self, product_id: str, current_time: datetime) -> bool:
+        """Mark an auction ended if its deadline has passed; returns True on transition"""
+        with self.product_lock(product_id), self.repository.transaction(product_id) as product:
+            if product["status"] != "active" or current_time < product["auction_end_time"]:
+                return False
+            self.repository.set_product_status(product, "ended")
+            self._product_changed(product_id)
+            if self.journal is not None:
+                self.journal.append({"type": "auction_end", "product_id": product_id})
+            return True
+
+    def replay_auction_end(self, record: dict):
+        product_id = record["product_id"]
+        with self.product_lock(product_id), self.repository.transaction(product_id) as product:
+            self.repository.set_product_status(product, "ended")
+            self._product_changed(product_id)
+
+bid_engine = BidEngine(repository)
+# In multi-worker mode the expiry owner also reschedules from the shared event feed
+bid_engine.add_deadline_listener(expiry_scheduler.schedule)
+
+# ===== AUCTION SNAPSHOTS =====
+
+def serialize_bid(bid: dict) -> dict:
+    """Copy a bid with its timestamp converted to an ISO string"""
+    bid_copy = bid.copy()
+    if isinstance(bid.get("timestamp"), datetime):
+        bid_copy["timestamp"] = bid["timestamp"].isoformat()
+    return bid_copy
+
+def serialize_product(product: dict, with_history: bool = True) -> dict:
+    """Copy a product for a response, its bidding history encoded once as a JSON fragment"""
+    product_copy = product.copy()
+    if with_history:
+        product_copy["bidding_history"] = EncodedJSON(app.json.encode(list(product["bidding_history"])))
+    else:
+        product_copy.pop("bidding_history", None)
+    return product_copy
+
+def time_remaining_fields(product: dict, current_time: datetime) -> dict:
+    """Fields that depend on the clock and must be computed per request"""
+    time_remaining = product["auction_end_time"] - current_time
+    if time_remaining.total_seconds() > 0 and product["status"] == "active":
+        minutes_remaining = max(0, int(time_remaining.total_seconds() / 60))
+        seconds_remaining = max(0, int(time_remaining.total_seconds() % 60))
+        if minutes_remaining < 5:
+            urgency = "high"
+        elif minutes_remaining < 15:
+            urgency = "medium"
+        else:
+            urgency = "low"
+        return {
+            "time_remaining_minutes": minutes_remaining,
+            "time_remaining_seconds": seconds_remaining,
+            "time_remaining_text": f"{minutes_remaining} minutes and {seconds_remaining} seconds",
+            "urgency": urgency
+        }
+    return {
+        "time_remaining_minutes": 0,
+        "time_remaining_seconds": 0,
+        "time_remaining_text": "Auction ended",
+        "status": "ended",
+        "urgency": "none"
+    }
+
+class AuctionSnapshotCache:
+    """Serialized products, rebuilt only after a bid or status change touches them.
+
+    A lot's bidding history is kept already encoded, so responses listing
+    many lots splice in the bytes instead of re-encoding every bid.
+
+    Entries are built under the product lock and dropped by the BidEngine change
+    listener, which runs under the same lock once the change has committed, so
+    a reader can never cache a representation that is older than the last
+    change.
+    """
+
+    def __init__(self, engine: BidEngine):
+        self.engine = engine
+        self._entries: Dict[str, dict] = {}
+        self._summaries: Dict[str, dict] = {}
+
+    def invalidate(self, product_id: str):
+        self._entries.pop(product_id, None)
+        self._summaries.pop(product_id, None)
+
+    def get(self, product_id: str, with_history: bool = True) -> dict:
+        """Return the cached serialized product; callers must not mutate it.
+
+        Summaries leave out ``bidding_history``, so their cost does not grow
+        with the number of bids on the lot.
+        """
+        entries = self._entries if with_history else self._summaries
+        entry = entries.get(product_id)
+        if entry is not None:
+            return entry
+        with self.engine.product_lock(product_id):
+            entry = entries.get(product_id)
+            if entry is None:
+                product = self.engine.repository.get_product(product_id, with_history=with_history)
+                entry = serialize_product(product, with_history)
+                entries[product_id] = entry
+        return entry
+
+auction_snapshots = AuctionSnapshotCache(bid_engine)
+bid_engine.add_change_listener(auction_snapshots.invalidate)
+
+# ===== VOICE SUMMARY =====
+
+class VoiceSummaryCache:
+    """Active auctions kept in end-time order, each with its voice fragment cached.
+
+    Bids and status changes only mark a product dirty; the next read reloads
+    it, moves it within the order and drops its fragment. Fragments are
+    re-rendered when their product changes or its minutes remaining tick
+    over, so the most urgent auctions are the front of the order and a read
+    neither sorts nor formats anything in the common case.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+        self._lock = threading.Lock()
+        self._order: List[tuple] = []
+        self._end_times: Dict[str, datetime] = {}
+        self._products: Dict[str, dict] = {}
+        self._fragments: Dict[str, tuple] = {}
+        self._dirty = set(repository.find_products(status="active"))
+
+    def invalidate(self, product_id: str):
+        with self._lock:
+            self._dirty.add(product_id)
+
+    def _refresh(self, product_id: str):
+        end_time = self._end_times.pop(product_id, None)
+        if end_time is not None:
+            del self._order[bisect.bisect_left(self._order, (end_time, product_id))]
+        self._products.pop(product_id, None)
+        self._fragments.pop(product_id, None)
+        product = self.repository.get_product(product_id, with_history=False)
+        if product is not None and product["status"] == "active":
+            self._products[product_id] = {
+                "name": product["name"],
+                "current_bid": product["current_highest_bid"],
+                "total_bids": product["total_bids"]
+            }
+            self._end_times[product_id] = product["auction_end_time"]
+            bisect.insort(self._order, (product["auction_end_time"], product_id))
+
+    def active(self, current_time: datetime, until: Optional[datetime] = None,
+               product_ids: Optional[List[str]] = None) -> List[dict]:
+        """Auctions still running at ``current_time``, soonest ending first; callers must not mutate them.
+
+        ``until`` leaves out auctions ending after it. ``product_ids``, in
+        end-time order, restricts the result to those products.
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            for product_id in dirty:
+                self._refresh(product_id)
+            if product_ids is None:
+                # Auctions past their deadline that the expiry scheduler has not ended yet form a prefix
+                start = bisect.bisect_right(self._order, (current_time, "\U0010ffff"))
+                stop = len(self._order) if until is None else bisect.bisect_right(self._order, (until, "\U0010ffff"))
+                entries = self._order[start:stop]
+            else:
+                entries = [(self._end_times[product_id], product_id) for product_id in product_ids
+                           if product_id in self._end_times and current_time < self._end_times[product_id]
+                           and (until is None or self._end_times[product_id] <= until)]
+            auctions = []
+            for end_time, product_id in entries:
+                minutes_remaining = max(0, int((end_time - current_time).total_seconds() / 60))
+                cached = self._fragments.get(product_id)
+                if cached is None or cached[0] != minutes_remaining:
+                    product = self._products[product_id]
+                    cached = (minutes_remaining, {
+                        "id": product_id,
+                        "name": product["name"],
+                        "current_bid": product["current_bid"],
+                        "minutes_remaining": minutes_remaining,
+                        "total_bids": product["total_bids"],
+                        "voice_description": f"{product['name']} - Current bid: ${product['current_bid']:.0f} - {minutes_remaining} minutes remaining"
+                    })
+                    self._fragments[product_id] = cached
+                auctions.append(cached[1])
+            return auctions
+
+voice_summary = VoiceSummaryCache(repository)
+bid_engine.add_change_listener(voice_summary.invalidate)
+
+# ===== SEARCH INDEX =====
+
+SEARCH_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Dropped from documents and queries alike
+SEARCH_STOPWORDS = {"a", "an", "and", "are", "as", "at", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+                    "the", "this", "to", "with"}
+# Words a caller uses to ask for something rather than to describe it
+SEARCH_FILLER = {"any", "auction", "auctions", "find", "i", "item", "items", "looking", "lot", "lots", "me", "my",
+                 "please", "search", "show", "some", "want"}
+
+def search_terms(text: str, query: bool = False) -> List[str]:
+    """Lower-case alphanumeric tokens with stopwords removed and plurals folded to their singular"""
+    terms = []
+    for token in SEARCH_TOKEN_RE.findall(text.lower()):
+        if token in SEARCH_STOPWORDS or (query and token in SEARCH_FILLER):
+            continue
+        if len(token) > 4 and token.endswith(("ches", "shes", "sses", "xes")):
+            token = token[:-2]
+        elif len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+def within_one_edit(a: str, b: str) -> bool:
+    """True if one insertion, deletion, substitution or adjacent transposition turns ``a`` into ``b``"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:])
+
+class SearchIndex:
+    """Inverted index over product name, category and description with facet counts.
+
+    Each term's postings hold one set of products per field weight, and the
+    index keeps the set of products per category and per status, so matching,
+    filtering and facet counting are set operations rather than loops over
+    products. Query terms also match vocabulary terms they are a prefix of
+    and, from four letters on, terms one edit away, found through a table of
+    single-character deletions rather than a scan of the vocabulary.
+
+    The index is built when it is created and a change listener re-reads a
+    product as soon as its change commits, so queries never pay for updates.
+    Recent queries keep their scored matches together with their facet
+    counts, and recent results are kept as a whole. A bid leaves a product's
+    text and status alone and so keeps both. A status change adjusts the
+    counts of the matches holding the product and drops only their results.
+    A text change drops everything.
+    """
+
+    FIELD_WEIGHTS = (("name", 3.0), ("category", 2.0), ("description", 1.0))
+    PREFIX_FACTOR = 0.6
+    FUZZY_FACTOR = 0.4
+    MAX_EXPANSIONS = 50
+    CACHED_QUERIES = 256
+
+    def __init__(self, repository):
+        self.repository = repository
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[float, set]] = {}
+        self._deletions: Dict[str, set] = {}
+        self._vocabulary: Optional[List[str]] = None
+        self._docs: Dict[str, tuple] = {}
+        self._ordered: Optional[List[str]] = None
+        self._facets: Dict[str, Dict[str, set]] = {"category": {}, "status": {}}
+        self._matches: OrderedDict = OrderedDict()
+        self._results: OrderedDict = OrderedDict()
+        for product_id in repository.product_ids():
+            self._refresh(product_id)
+        # Kept sorted from here on as terms and products come and go
+        self._vocabulary = sorted(self._postings)
+        self._ordered = sorted(self._docs)
+
+    def invalidate(self, product_id: str):
+        """Re-read one product; called once its change has committed"""
+        with self._lock:
+            self._refresh(product_id)
+
+    @staticmethod
+    def _deletes(term: str):
+        return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+    def _add_term(self, term: str):
+        self._postings[term] = {}
+        if self._vocabulary is not None:
+            bisect.insort(self._vocabulary, term)
+        if len(term) >= 4:
+            for key in self._deletes(term) | {term}:
+                self._deletions.setdefault(key, set()).add(term)
+
+    def _drop_term(self, term: str):
+        del self._postings[term]
+        if self._vocabulary is not None:
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        if len(term) >= 4:
+            for key in self._deletes(term) | {term}:
+                terms = self._deletions[key]
+                terms.discard(term)
+                if not terms:
+                    del self._deletions[key]
+
+    def _set_facets(self, product_id: str, category: str, status: str, add: bool):
+        for facet, value in (("category", category), ("status", status)):
+            members = self._facets[facet]
+            if add:
+                members.setdefault(value, set()).add(product_id)
+            else:
+                members[value].discard(product_id)
+                if not members[value]:
+                    del members[value]
+
+    def _refresh(self, product_id: str):
+        product = self.repository.get_product(product_id, with_history=False)
+        previous = self._docs.pop(product_id, None)
+        text = (product["name"], product["category"], product["description"]) if product else None
+        status = product["status"] if product else None
+        if self._ordered is not None and previous is None and product is not None:
+            bisect.insort(self._ordered, product_id)
+        elif self._ordered is not None and previous is not None and product is None:
+            del self._ordered[bisect.bisect_left(self._ordered, product_id)]
+        if previous is None or previous[0] != text:
+            self._matches.clear()
+            self._results.clear()
+        elif previous[2] != status:
+            self._restatus(product_id, previous[2], status)
+        if previous is not None:
+            self._set_facets(product_id, previous[1], previous[2], add=False)
+            if previous[0] != text:
+                for term, weight in previous[3].items():
+                    postings = self._postings[term]
+                    postings[weight].discard(product_id)
+                    if not postings[weight]:
+                        del postings[weight]
+                    if not postings:
+                        self._drop_term(term)
+        if product is None:
+            return
+
+        if previous is not None and previous[0] == text:
+            weights = previous[3]
+        else:
+            weights: Dict[str, float] = {}
+            for field, weight in self.FIELD_WEIGHTS:
+                for term in search_terms(product[field]):
+                    if weights.get(term, 0.0) < weight:
+                        weights[term] = weight
+            for term, weight in weights.items():
+                if term not in self._postings:
+                    self._add_term(term)
+                self._postings[term].setdefault(weight, set()).add(product_id)
+        category = product["category"].lower()
+        self._docs[product_id] = (text, category, status, weights)
+        self._set_facets(product_id, category, status, add=True)
+
+    def _restatus(self, product_id: str, old: str, new: str):
+        """Move a product between status counts in the cached matches holding it and drop affected results"""
+        unaffected = set()
+        for terms, (_, matched, facets) in self._matches.items():
+            if product_id not in matched:
+                unaffected.add(terms)
+                continue
+            counts = facets["status"]
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+            counts[new] = counts.get(new, 0) + 1
+        for key in [key for key in self._results if key[0] not in unaffected]:
+            del self._results[key]
+
+    def _expand(self, term: str) -> Dict[str, float]:
+        """Vocabulary terms matching a query term, with the factor their weights are scaled by"""
+        matches: Dict[str, float] = {}
+        if term in self._postings:
+            matches[term] = 1.0
+        if len(term) >= 2:
+            start = bisect.bisect_left(self._vocabulary, term)
+            for candidate in self._vocabulary[start:start + self.MAX_EXPANSIONS]:
+                if not candidate.startswith(term):
+                    break
+                matches.setdefault(candidate, self.PREFIX_FACTOR)
+        if len(term) >= 4:
+            for key in self._deletes(term) | {term}:
+                for candidate in self._deletions.get(key, ()):
+                    if candidate not in matches and within_one_edit(term, candidate):
+                        matches[candidate] = self.FUZZY_FACTOR
+        return matches
+
+    def _levels(self, term: str) -> List[tuple]:
+        """(score, products) pairs for a query term, best first, each product in its best level only"""
+        by_score: Dict[float, list] = {}
+        for candidate, factor in self._expand(term).items():
+            for weight, members in self._postings[candidate].items():
+                by_score.setdefault(weight * factor, []).append(members)
+        levels, seen = [], set()
+        for score in sorted(by_score, reverse=True):
+            members = set().union(*by_score[score]) - seen
+            if members:
+                levels.append((score, members))
+                seen |= members
+        return levels
+
+    def _smallest(self, members, need: int, active: set, want_active: bool) -> List[str]:
+        """Lowest ``need`` ids in ``members`` whose active status is ``want_active``"""
+        total = len(self._docs)
+        share = len(active) if want_active else total - len(active)
+        # Walking the id order finds them after about need * total^2 / (|members| * share) steps
+        if share and need * total * total < len(members) * len(members) * share:
+            found = []
+            for product_id in self._ordered:
+                if product_id in members and (product_id in active) == want_active:
+                    found.append(product_id)
+                    if len(found) == need:
+                        break
+            return found
+        return heapq.nsmallest(need, members & active if want_active else members - active)
+
+    def _top(self, levels: List[tuple], limit: int) -> list:
+        """Best ``limit`` products from disjoint score levels; ties go to active lots, then by id"""
+        active = self._facets["status"].get("active", set())
+        ranked = []
+        for score, members in levels:
+            for want_active in (True, False):
+                need = limit - len(ranked)
+                if need <= 0:
+                    return ranked
+                ranked.extend((product_id, score)
+                              for product_id in self._smallest(members, need, active, want_active))
+        return ranked
+
+    def _match(self, terms: tuple) -> tuple:
+        """Disjoint score levels, matched products and facet counts for a query's terms"""
+        if terms in self._matches:
+            self._matches.move_to_end(terms)
+            return self._matches[terms]
+        term_levels = [levels for levels in map(self._levels, terms) if levels]
+        if not term_levels:
+            levels, matched = [], set()
+        elif len(term_levels) == 1:
+            levels = term_levels[0]
+            matched = set().union(*(members for _, members in levels))
+        else:
+            matched = set.intersection(*(set().union(*(members for _, members in levels))
+                                         for levels in term_levels))
+            scores: Dict[float, set] = {}
+            for product_id in matched:
+                score = sum(next(score for score, members in levels if product_id in members)
+                            for levels in term_levels)
+                scores.setdefault(score, set()).add(product_id)
+            levels = sorted(scores.items(), reverse=True)
+        facets = {facet: {value: count for value, members in values.items() if (count := len(matched & members))}
+                  for facet, values in self._facets.items()}
+        entry = self._matches[terms] = (levels, matched, facets)
+        while len(self._matches) > self.CACHED_QUERIES:
+            self._matches.popitem(last=False)
+        return entry
+
+    def search(self, query: str, category: Optional[str] = None, status: Optional[str] = None,
+               limit: int = 10) -> dict:
+        """Rank products matching every recognised query term; terms matching nothing are ignored.
+
+        A query without any terms matches the whole catalogue, one whose terms
+        all match nothing matches nothing. Facet counts cover all matches
+        before the category and status filters are applied, so a caller can
+        offer them as refinements.
+        """
+        category = category.lower() if category else None
+        terms = tuple(dict.fromkeys(search_terms(query, query=True)))
+        key = (terms, category, status, limit)
+        with self._lock:
+            found = self._results.get(key)
+            if found is not None:
+                self._results.move_to_end(key)
+                return dict(found)
+
+            filters = [self._facets[facet].get(value, set())
+                       for facet, value in (("category", category), ("status", status)) if value]
+            if terms:
+                levels, matched, counts = self._match(terms)
+                facets = {facet: dict(values) for facet, values in counts.items()}
+                allowed = matched.intersection(*filters) if filters else matched
+                if filters:
+                    levels = [(score, members & allowed) for score, members in levels]
+            else:
+                facets = {facet: {value: len(members) for value, members in values.items()}
+                          for facet, values in self._facets.items()}
+                allowed = set.intersection(*filters) if filters else self._docs.keys()
+                levels = [(0.0, allowed)]
+            found = {
+                "total": len(allowed),
+                "results": [(product_id, round(score, 3)) for product_id, score in self._top(levels, limit)],
+                "facets": facets
+            }
+            self._results[key] = found
+            while len(self._results) > self.CACHED_QUERIES:
+                self._results.popitem(last=False)
+        return dict(found)
+
+search_index = SearchIndex(repository)
+bid_engine.add_change_listener(search_index.invalidate)
+
+# ===== CHANGE VERSIONS =====
+
+class ChangeTracker:
+    """Monotonic global version plus the version at which each product last changed.
+
+    Products are kept in an OrderedDict ordered by their last change, so the set
+    changed since a given version is read from the tail in time proportional to
+    the number of changes rather than the size of the catalogue.
+
+    Versions handed to clients are tokens of the form ``<epoch>-<version>``.
+    The epoch is the repository's, so a token from before a restart that
+    reset the counter never matches a version counted since.
+    """
+
+    def __init__(self, epoch: str):
+        self.epoch = epoch
+        self._lock = threading.Lock()
+        self.version = 0
+        self._product_versions: "OrderedDict[str, int]" = OrderedDict()
+
+    def bump(self, product_id: str) -> int:
+        with self._lock:
+            self.version += 1
+            self._product_versions[product_id] = self.version
+            self._product_versions.move_to_end(product_id)
+            return self.version
+
+    def record(self, product_id: str, version: int):
+        """Apply a change whose version was assigned by another process"""
+        with self._lock:
+            self.version = max(self.version, version)
+            self._product_versions[product_id] = version
+            self._product_versions.move_to_end(product_id)
+
+    def token(self, version: int) -> str:
+        return f"{self.epoch}-{version}"
+
+    def parse(self, token: str) -> Optional[int]:
+        """The version in a token from this epoch; None for another epoch's or a malformed one"""
+        epoch, _, version = token.rpartition("-")
+        return int(version) if epoch == self.epoch and version.isdigit() else None
+
+    def changed_since(self, since: int):
+        """Return the current version and the ids of products changed after ``since``"""
+        with self._lock:
+            changed = []
+            for product_id, version in reversed(self._product_versions.items()):
+                if version <= since:
+                    break
+                changed.append(product_id)
+            return self.version, changed
+
+change_tracker = ChangeTracker(repository.epoch)
+if repository.backend == "memory":
+    for product_id in repository.product_ids():
+        change_tracker.bump(product_id)
+    bid_engine.add_change_listener(change_tracker.bump)
+# With shared SQLite storage, versions are event ids from SharedEventRelay so every worker agrees on them
+
+def notify_bid_placed(result: dict):
+    """Send the outbid and new bid notifications for an accepted bid.
+
+    Automatic bids triggered by the same operation are not announced one by
+    one; only the final price and leader are.
+    """
+    for previous_bidder in result["outbid_bidders"]:
+        publish_auction_event({
+            "type": "outbid",
+            "product_id": result["product_id"],
+            "product_name": result["product_name"],
+            "new_amount": result["current_highest_bid"],
+            "previous_bidder": previous_bidder
+        })
+
+    publish_auction_event({
+        "type": "new_bid",
+        "product_id": result["product_id"],
+        "product_name": result["product_name"],
+        "amount": result["current_highest_bid"],
+        "bidder_id": result["highest_bidder"],
+        "previous_amount": result["previous_highest_bid"]
+    })
+
+    if result.get("extended"):
+        publish_auction_event({
+            "type": "auction_extended",
+            "product_id": result["product_id"],
+            "product_name": result["product_name"],
+            "auction_end_time": result["auction_end_time"].isoformat(),
+            "extension_seconds": SOFT_CLOSE_EXTENSION_SECONDS
+        })
+
+# ===== DURABLE BID LOG =====
+
+AUCTION_DATA_DIR = os.getenv('AUCTION_DATA_DIR', '')
+BIDLOG_COMMIT_INTERVAL_MS = float(os.getenv('BIDLOG_COMMIT_INTERVAL_MS', '2'))
+BIDLOG_SYNC_COMMIT = os.getenv('BIDLOG_SYNC_COMMIT', '1') == '1'
+BIDLOG_SNAPSHOT_SECONDS = float(os.getenv('BIDLOG_SNAPSHOT_SECONDS', '300'))
+
+class BidLogError(Exception):
+    """A group commit failed; its records stay queued and are written by the next one that succeeds"""
+
+class BidLog:
+    """Append-only JSON-lines journal of state changes with group commit.
+
+    ``append`` only buffers the record and hands back a log sequence number; a
+    writer thread wakes every ``commit_interval`` seconds, writes everything
+    buffered in one go and fsyncs once for the whole group. Callers that need
+    durability wait on ``wait_durable`` after releasing their locks. The log is
+    split into numbered segments so a snapshot can retire the older ones.
+
+    A group whose write or fsync fails is cut back off the segment and put
+    back at the head of the buffer, so no record is lost or written twice and
+    the durable LSN never passes a record that is not on disk. Waiters for
+    records in that group get a BidLogError instead of hanging.
+    """
+
+    def __init__(self, directory: str, commit_interval: float = BIDLOG_COMMIT_INTERVAL_MS / 1000,
+                 sync_commit: bool = BIDLOG_SYNC_COMMIT):
+        self.directory = directory
+        self.commit_interval = commit_interval
+        self.sync_commit = sync_commit
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending: List[str] = []
+        self._last_lsn = 0
+        self._durable_lsn = 0
+        self._failed_lsn = 0
+        self._error: Optional[Exception] = None
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        self.segment = 0
+        self.groups_committed = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"bids-{segment:06d}.log")
+
+    def segments(self) -> List[int]:
+        return sorted(int(name[5:11]) for name in os.listdir(self.directory)
+                      if name.startswith("bids-") and name.endswith(".log"))
+
+    def start(self):
+        """Open a fresh segment after any existing ones and start the writer thread"""
+        if self._thread is not None:
+            return
+        existing = self.segments()
+        self.segment = (existing[-1] if existing else 0) + 1
+        self._file = open(self.segment_path(self.segment), "ab", buffering=0)
+        self._thread = threading.Thread(target=self._run, name="bid-log-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, record: dict) -> Optional[int]:
+        """Buffer a record; returns its LSN if the caller should wait for it, else None"""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._cond:
+            self._pending.append(line)
+            self._last_lsn += 1
+            if len(self._pending) == 1:
+                self._cond.notify_all()
+            return self._last_lsn if self.sync_commit else None
+
+    def wait_durable(self, lsn: int):
+        """Block until the record with ``lsn`` is on disk; raises BidLogError if its group commit failed"""
+        with self._cond:
+            while self._durable_lsn < lsn:
+                if self._failed_lsn >= lsn:
+                    raise BidLogError(f"Bid log commit failed: {self._error}")
+                self._cond.wait()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            if self.commit_interval > 0:
+                time.sleep(self.commit_interval)
+            try:
+                self._commit()
+            except Exception as e:
+                logger.error(f"Error committing bid log: {e}")
+                time.sleep(1)
+
+    def _commit(self):
+        with self._io_lock:
+            with self._cond:
+                lines, self._pending = self._pending, []
+                lsn = self._last_lsn
+            if lines:
+                try:
+                    self._write_group("".join(lines).encode("utf-8"))
+                except Exception as e:
+                    with self._cond:
+                        self._pending[:0] = lines
+                        self._failed_lsn = lsn
+                        self._error = e
+                        self._cond.notify_all()
+                    raise
+                self.groups_committed += 1
+            with self._cond:
+                self._durable_lsn = lsn
+                self._error = None
+                self._cond.notify_all()
 
-# Configuration for OmniDimension webhooks
-OMNIDIMENSION_WEBHOOK_URL = os.getenv('OMNIDIMENSION_WEBHOOK_URL', '')
-OMNIDIMENSION_API_KEY = os.environ.get('OMNIDIMENSION_API_KEY')
-if not OMNIDIMENSION_API_KEY:
-    raise ValueError("OMNIDIMENSION_API_KEY environment variable is required")
+    def _write_group(self, data: bytes):
+        """Append and fsync one group; on failure truncate the segment back to where the group began"""
+        fd = self._file.fileno()
+        start = os.lseek(fd, 0, os.SEEK_END)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[self._file.write(view):]
+            os.fsync(fd)
+        except Exception:
+            try:
+                os.ftruncate(fd, start)
+            except OSError as e:
+                logger.error(f"Could not cut failed group off bid log segment {self.segment}: {e}")
+            raise
 
-# In-memory auction data with more realistic data
-auction_data = {
-    "products": {
-        "prod_1": {
-            "id": "prod_1",
-            "name": "Vintage Rolex Submariner",
-            "description": "Rare 1965 Rolex Submariner in excellent condition with original box and papers",
-            "starting_price": 50000.00,
-            "current_highest_bid": 55000.00,
-            "highest_bidder": "user_001",
-            "auction_end_time": datetime.now() + timedelta(minutes=30),
-            "bidding_history": [
-                {
-                    "bid_id": "bid_001",
-                    "bidder_id": "user_001",
-                    "amount": 55000.00,
-                    "timestamp": datetime.now() - timedelta(minutes=5)
-                }
-            ],
-            "total_bids": 1,
-            "status": "active",
-            "category": "watches",
-            "image_url": "https://awadwatches.com/wp-content/uploads/2019/03/1965_vintage_rolex_datejust_1601_rare_14k_gold_roman_dial_swiss_only_1.jpeg"
-        },
-        "prod_2": {
-            "id": "prod_2",
-            "name": "1967 Ford Mustang Fastback",
-            "description": "Fully restored classic Mustang with 390 V8 engine, stunning condition",
-            "starting_price": 25000.00,
-            "current_highest_bid": 28500.00,
-            "highest_bidder": "user_002",
-            "auction_end_time": datetime.now() + timedelta(minutes=45),
-            "bidding_history": [
-                {
-                    "bid_id": "bid_002",
-                    "bidder_id": "user_002",
-                    "amount": 26000.00,
-                    "timestamp": datetime.now() - timedelta(minutes=10)
-                },
-                {
-                    "bid_id": "bid_003",
-                    "bidder_id": "user_003",
-                    "amount": 28500.00,
-                    "timestamp": datetime.now() - timedelta(minutes=3)
-                }
-            ],
-            "total_bids": 2,
-            "status": "active",
-            "category": "vehicles",
-            "image_url": "https://bringatrailer.com/wp-content/uploads/2019/05/1967_ford_mustang_fastback_1561126084a7ce40810bf523f006_exterior.jpg"
-        },
-        "prod_3": {
-            "id": "prod_3",
-            "name": "Original Van Gogh Sketch",
-            "description": "Authenticated Van Gogh preparatory sketch with provenance documentation",
-            "starting_price": 1500000.00,
-            "current_highest_bid": 2200000.00,
-            "highest_bidder": "user_004",
-            "auction_end_time": datetime.now() + timedelta(minutes=20),
-            "bidding_history": [
-                {
-                    "bid_id": "bid_004",
-                    "bidder_id": "user_003",
-                    "amount": 1600000.00,
-                    "timestamp": datetime.now() - timedelta(minutes=15)
-                },
-                {
-                    "bid_id": "bid_005", 
-                    "bidder_id": "user_004",
-                    "amount": 1850000.00,
-                    "timestamp": datetime.now() - timedelta(minutes=12)
-                },
-                {
-                    "bid_id": "bid_006",
-                    "bidder_id": "user_005",
-                    "amount": 2200000.00,
-                    "timestamp": datetime.now() - timedelta(minutes=8)
-                }
-            ],
-            "total_bids": 3,
-            "status": "active",
-            "category": "art",
-            "image_url": "https://image.invaluable.com/housePhotos/Gallery320/16/665116/H19737-L198711707.jpg"
-        }
-    },
-    "users": {
-        "voice_user_001": {
-            "id": "voice_user_001",
-            "name": "Voice User",
-            "phone": "+918439473928",
-            "bidding_history": [],
-            "total_spent": 0.0,
-            "active_bids": []
-        }
-    }
-}
+    def rotate(self) -> int:
+        """Commit what is buffered, then switch to a new segment; returns the new segment number"""
+        self._commit()
+        with self._io_lock:
+            self._file.close()
+            self.segment += 1
+            self._file = open(self.segment_path(self.segment), "ab", buffering=0)
+            return self.segment
 
-# Global state for tracking active voice sessions
-active_voice_sessions = {}
+    def read_records(self, from_segment: int = 0):
+        """Yield records from every segment at or after ``from_segment``, stopping at a torn tail"""
+        for segment in self.segments():
+            if segment < from_segment:
+                continue
+            with open(self.segment_path(segment), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Ignoring torn record at end of bid log segment {segment}")
+                        break
 
-def send_omnidimension_webhook(session_id: str, message: str, data: Optional[dict] = None):
-    """Send webhook notification to OmniDimension for a specific session"""
-    if not OMNIDIMENSION_WEBHOOK_URL:
-        logger.warning("OmniDimension webhook URL not configured")
-        return
-    
-    try:
-        payload = {
-            "session_id": session_id,
-            "message": message,
-            "timestamp": datetime.now().isoformat(),
-            "data": data or {}
-        }
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
-        if OMNIDIMENSION_API_KEY:
-            headers["Authorization"] = f"Bearer {OMNIDIMENSION_API_KEY}"
-        
-        response = requests.post(
-            OMNIDIMENSION_WEBHOOK_URL,
-            json=payload,
-            headers=headers,
-            timeout=5
-        )
-        
-        if response.status_code == 200:
-            logger.info(f"Webhook sent successfully to session {session_id}")
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "segment": self.segment,
+                "last_lsn": self._last_lsn,
+                "durable_lsn": self._durable_lsn,
+                "pending": len(self._pending),
+                "error": None if self._error is None else str(self._error),
+                "groups_committed": self.groups_committed
+            }
+
+def write_snapshot(log: BidLog, engine: BidEngine) -> str:
+    """Write a compacted snapshot of all state and retire the log segments it covers.
+
+    Every mutation is blocked only while the new segment is opened and the
+    mutable parts of the state are copied. Bids are written as the bid
+    store's columns; the bidding histories are rebuilt from them on load.
+    """
+    store = engine.repository
+    with engine.frozen(sessions_lock, store.registry_lock):
+        segment = log.rotate()
+        bids = store.bids.export()
+        products = {product_id: dict(product) for product_id, product in store.products.items()}
+        users = {user_id: (dict(user), [dict(bid) for bid in user["active_bids"]])
+                 for user_id, user in store.users.items()}
+        proxies = {product_id: dict(bidders) for product_id, bidders in store.proxies.items()}
+        session_copies = {session_id: dict(session) for session_id, session in store.sessions.items()}
+
+    state = {"segment": segment, "bids": {}, "products": {}, "users": {}, "sessions": {}, "proxy_bids": proxies}
+    for column, values in bids.items():
+        state["bids"][column] = values.tolist() if isinstance(values, array) else values
+    for product_id, product in products.items():
+        product["auction_end_time"] = product["auction_end_time"].isoformat()
+        del product["bidding_history"]
+        state["products"][product_id] = product
+    for user_id, (user, active_bids) in users.items():
+        del user["bidding_history"]
+        user["active_bids"] = active_bids
+        state["users"][user_id] = user
+    for session_id, session in session_copies.items():
+        session["start_time"] = session["start_time"].isoformat()
+        session["last_activity"] = session["last_activity"].isoformat()
+        state["sessions"][session_id] = session
+
+    path = os.path.join(log.directory, "snapshot.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+    for old_segment in log.segments():
+        if old_segment < segment:
+            os.remove(log.segment_path(old_segment))
+    logger.info(f"Wrote auction snapshot covering log up to segment {segment}")
+    return path
+
+def recover_state(log: BidLog, engine: BidEngine) -> int:
+    """Load the latest snapshot and replay the log after it; returns the number of records replayed"""
+    store = engine.repository
+    from_segment = 0
+    path = os.path.join(log.directory, "snapshot.json")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        from_segment = state["segment"]
+        if "bids" in state:
+            store.bids.load(state["bids"])
         else:
-            logger.error(f"Webhook failed: Status {response.status_code}")
-            
-    except Exception as e:
-        logger.error(f"Error sending webhook: {e}")
+            store.bids.clear()
+        for product_id, product in state["products"].items():
+            product["auction_end_time"] = datetime.fromisoformat(product["auction_end_time"])
+            # Snapshots written before the bid store carry per-product history lists
+            for bid in product.get("bidding_history", ()):
+                bid["timestamp"] = datetime.fromisoformat(bid["timestamp"])
+            store.put_product(product)
+            # Caches and indexes built at startup still hold the seed catalogue's version
+            engine.product_replaced(product_id)
+        store.users.clear()
+        for user in state["users"].values():
+            store.put_user(user)
+        store.proxies.clear()
+        for product_id, bidders in state.get("proxy_bids", {}).items():
+            for bidder_id, (max_amount, registered_at) in bidders.items():
+                store.set_proxy_bid(product_id, bidder_id, max_amount, registered_at)
+        store.sessions.clear()
+        for session_id, session in state["sessions"].items():
+            session["start_time"] = datetime.fromisoformat(session["start_time"])
+            session["last_activity"] = datetime.fromisoformat(session["last_activity"])
+            store.put_session(session_id, session)
+            for bid in store.get_user(session["user_id"], with_history=False)["active_bids"]:
+                store.subscribe_session(session_id, bid["product_id"])
+
+    replayed = 0
+    for record in log.read_records(from_segment):
+        record_type = record["type"]
+        if record_type == "bid":
+            engine.replay_bid(record)
+        elif record_type == "auction_end":
+            engine.replay_auction_end(record)
+        elif record_type == "proxy_bid":
+            engine.replay_proxy_bid(record)
+        elif record_type == "auction_extended":
+            engine.replay_auction_extension(record)
+        elif record_type == "session_start":
+            _register_session(record["session_id"], record["phone_number"],
+                              datetime.fromisoformat(record["timestamp"]))
+        elif record_type == "session_end":
+            store.pop_session(record["session_id"])
+        replayed += 1
+    return replayed
 
-def check_auction_expiry():
-    """Background thread to check and update expired auctions"""
+def snapshot_loop(log: BidLog, engine: BidEngine, interval: float):
+    """Background thread that periodically compacts the log into a snapshot"""
+    last_lsn = log.stats()["last_lsn"]
     while True:
+        time.sleep(interval)
         try:
-            current_time = datetime.now()
-            for product_id, product in auction_data["products"].items():
-                if product["status"] == "active" and current_time >= product["auction_end_time"]:
-                    product["status"] = "ended"
-                    logger.info(f"Auction for {product['name']} has ended! Winner: {product['highest_bidder']} with ${product['current_highest_bid']:.2f}")
-                    
-                    # Notify active voice sessions about auction end
-                    notify_voice_sessions({
-                        "type": "auction_ended",
-                        "product_id": product_id,
-                        "product_name": product["name"],
-                        "final_amount": product["current_highest_bid"],
-                        "winner": product["highest_bidder"]
-                    })
-            
-            time.sleep(30)  # Check every 30 seconds
+            current_lsn = log.stats()["last_lsn"]
+            if current_lsn != last_lsn:
+                write_snapshot(log, engine)
+                last_lsn = current_lsn
         except Exception as e:
-            logger.error(f"Error in auction expiry check: {e}")
-            time.sleep(30)
+            logger.error(f"Error writing auction snapshot: {e}")
 
-def notify_voice_sessions(update_data):
-    """Notify all active voice sessions about updates"""
-    for session_id, session_data in active_voice_sessions.items():
-        try:
-            message = ""
-            if update_data["type"] == "auction_ended":
-                message = f"ATTENTION: The auction for {update_data['product_name']} has ended! Final winning bid: ${update_data['final_amount']:.2f}"
-            elif update_data["type"] == "new_bid":
-                message = f"NEW BID ALERT: ${update_data['amount']:.2f} placed on {update_data['product_name']}"
-            elif update_data["type"] == "outbid":
-                message = f"You have been outbid on {update_data['product_name']}! New highest bid: ${update_data['new_amount']:.2f}"
-            
-            send_omnidimension_webhook(session_id, message, update_data)
-            
-        except Exception as e:
-            logger.error(f"Error notifying session {session_id}: {e}")
+# The SQLite backend is durable on its own; the log only backs the in-memory store
+bid_log: Optional[BidLog] = BidLog(AUCTION_DATA_DIR) if AUCTION_DATA_DIR and repository.backend == "memory" else None
+
+# ===== API KEY CHECK =====
+
+def require_api_key(view):
+    """Refuse the request with 401 unless it carries OMNIDIMENSION_API_KEY.
+
+    The key is accepted as ``Authorization: Bearer <key>``, the header this
+    service sends on its own webhooks, or as ``X-API-Key``.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        key = token if scheme.lower() == "bearer" else request.headers.get("X-API-Key", "")
+        if not hmac.compare_digest(key.encode(), OMNIDIMENSION_API_KEY.encode()):
+            return jsonify({"success": False, "error": "Invalid or missing API key"}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+# ===== IDEMPOTENT REQUESTS =====
+
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '5'))
 
-# Start background thread
-threading.Thread(target=check_auction_expiry, daemon=True).start()
+def idempotent(view):
+    """Replay the stored response when a request repeats an ``idempotency_key``.
+
+    The key comes from the ``Idempotency-Key`` header or an ``idempotency_key``
+    field in the JSON body and is scoped to the request path. A repeat gets
+    the original status and body back without the view running again, so
+    there is no second validation, bid or notification fan-out. A repeat that
+    arrives while the original is still in flight waits for its outcome.
+    Server errors are not stored, which leaves the key free for a retry.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True)
+        key = request.headers.get("Idempotency-Key")
+        if not key and isinstance(data, dict):
+            key = data.get("idempotency_key")
+        if not key:
+            return view(*args, **kwargs)
+
+        key = f"{request.path}:{key}"
+        params = {k: v for k, v in data.items() if k != "idempotency_key"} if isinstance(data, dict) else data
+        fingerprint = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            entry = repository.claim_idempotency_key(key, fingerprint)
+            if entry is None:
+                break
+            if entry["fingerprint"] != fingerprint:
+                return jsonify({"success": False,
+                                "error": "Idempotency key was already used for a different request"}), 422
+            if entry["status"] is not None:
+                logger.info(f"Replaying stored response for idempotency key {key}")
+                response = app.response_class(entry["body"], status=entry["status"], mimetype="application/json")
+                response.headers["Idempotent-Replayed"] = "true"
+                return response
+            if time.monotonic() >= deadline:
+                return jsonify({"success": False,
+                                "error": "A request with this idempotency key is still in progress"}), 409
+            time.sleep(0.02)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except BaseException:
+            repository.release_idempotency_key(key)
+            raise
+        if response.status_code >= 500:
+            repository.release_idempotency_key(key)
+        else:
+            repository.complete_idempotency_key(key, response.status_code, response.get_data(as_text=True))
+        return response
+    return wrapper
 
 # ===== SESSION MANAGEMENT ENDPOINTS =====
 
+def _register_session(session_id: str, phone_number: str, start_time: datetime) -> str:
+    # Create user ID based on phone number or session ID
+    user_id = f"voice_user_{phone_number.replace('+', '').replace('-', '')}" if phone_number else f"voice_user_{session_id}"
+    
+    # Create user if doesn't exist
+    repository.ensure_user(
+        user_id,
+        name=f"Voice User ({phone_number})" if phone_number else f"Voice User {session_id[:8]}",
+        phone=phone_number
+    )
+    
+    # Store session info
+    evicted = repository.put_session(session_id, {
+        "user_id": user_id,
+        "phone_number": phone_number,
+        "start_time": start_time,
+        "last_activity": start_time
+    })
+    if evicted:
+        logger.info(f"Evicted {len(evicted)} least recently active voice session(s) to stay within capacity")
+    # A returning caller hears about the lots they already have bids on
+    for bid in repository.get_user(user_id, with_history=False)["active_bids"]:
+        repository.subscribe_session(session_id, bid["product_id"])
+    return user_id
+
+def open_voice_session(session_id: str, phone_number: str) -> str:
+    """Start a voice session, creating its user if needed; returns the user id"""
+    start_time = datetime.now()
+    with sessions_lock:
+        user_id = _register_session(session_id, phone_number, start_time)
+        if bid_log is not None:
+            bid_log.append({
+                "type": "session_start",
+                "session_id": session_id,
+                "phone_number": phone_number,
+                "timestamp": start_time.isoformat()
+            })
+    return user_id
+
+def close_voice_session(session_id: str) -> Optional[dict]:
+    """End a voice session; returns its data, or None if it was not active"""
+    with sessions_lock:
+        session_data = repository.pop_session(session_id)
+        if session_data is not None and bid_log is not None:
+            bid_log.append({"type": "session_end", "session_id": session_id})
+    return session_data
+
+def session_reaper_loop(interval: float):
+    """Background thread that ends voice sessions idle past the TTL (dropped calls)"""
+    while True:
+        time.sleep(interval)
+        try:
+            with sessions_lock:
+                reaped = repository.reap_sessions(datetime.now())
+                if bid_log is not None:
+                    for session_id in reaped:
+                        bid_log.append({"type": "session_end", "session_id": session_id})
+            if reaped:
+                logger.info(f"Reaped {len(reaped)} idle voice session(s)")
+        except Exception as e:
+            logger.error(f"Error reaping voice sessions: {e}")
+
 @app.route('/api/session/start', methods=['POST'])
 def start_voice_session():
     """Start a new voice session for a user"""
@@ -214,27 +3687,7 @@ def start_voice_session():
         phone_number = data.get('phone_number', '')
         session_id = data.get('session_id', str(uuid.uuid4()))
         
-        # Create user ID based on phone number or session ID
-        user_id = f"voice_user_{phone_number.replace('+', '').replace('-', '')}" if phone_number else f"voice_user_{session_id}"
-        
-        # Create user if doesn't exist
-        if user_id not in auction_data["users"]:
-            auction_data["users"][user_id] = {
-                "id": user_id,
-                "name": f"Voice User ({phone_number})" if phone_number else f"Voice User {session_id[:8]}",
-                "phone": phone_number,
-                "bidding_history": [],
-                "total_spent": 0.0,
-                "active_bids": []
-            }
-        
-        # Store session info
-        active_voice_sessions[session_id] = {
-            "user_id": user_id,
-            "phone_number": phone_number,
-            "start_time": datetime.now(),
-            "last_activity": datetime.now()
-        }
+        user_id = open_voice_session(session_id, phone_number)
         
         logger.info(f"Started voice session {session_id} for user {user_id}")
         
@@ -253,8 +3706,8 @@ def start_voice_session():
 def end_voice_session(session_id):
     """End a voice session"""
     try:
-        if session_id in active_voice_sessions:
-            session_data = active_voice_sessions.pop(session_id)
+        session_data = close_voice_session(session_id)
+        if session_data is not None:
             logger.info(f"Ended voice session {session_id}")
             
             return jsonify({
@@ -273,29 +3726,29 @@ def end_voice_session(session_id):
 
 @app.route('/api/voice/auctions/summary', methods=['GET'])
 def get_voice_auction_summary():
-    """Get a voice-friendly summary of all active auctions"""
+    """Get a voice-friendly summary of active auctions, optionally narrowed by ?category=&ending_within=<seconds>"""
     try:
         current_time = datetime.now()
-        active_auctions = []
-        
-        for product_id, product in auction_data["products"].items():
-            if product["status"] == "active" and current_time < product["auction_end_time"]:
-                time_remaining = product["auction_end_time"] - current_time
-                minutes_remaining = max(0, int(time_remaining.total_seconds() / 60))
-                
-                active_auctions.append({
-                    "id": product_id,
-                    "name": product["name"],
-                    "current_bid": product["current_highest_bid"],
-                    "minutes_remaining": minutes_remaining,
-                    "total_bids": product["total_bids"],
-                    "voice_description": f"{product['name']} - Current bid: ${product['current_highest_bid']:.0f} - {minutes_remaining} minutes remaining"
-                })
+        try:
+            filters = listing_filter_args(current_time)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
         
-        # Sort by urgency (time remaining)
-        active_auctions.sort(key=lambda x: x["minutes_remaining"])
+        # Already ordered by urgency (time remaining)
+        product_ids = None
+        if "category" in filters:
+            product_ids = repository.find_products(status="active", category=filters["category"],
+                                                   ends_before=filters.get("ends_before"))
+        active_auctions = voice_summary.active(current_time, filters.get("ends_before"), product_ids)
         
-        summary_text = f"There are {len(active_auctions)} active auctions. "
+        scope = ""
+        if "category" in filters:
+            scope += f" in {filters['category'].lower()}"
+        if "ends_before" in filters:
+            window = (filters["ends_before"] - current_time).total_seconds()
+            minutes = max(1, int(-(-window // 60)))
+            scope += f" ending in the next {minutes} minute{'s' if minutes != 1 else ''}"
+        summary_text = f"There are {len(active_auctions)} active auctions{scope}. "
         if active_auctions:
             summary_text += "Here are the current items: "
             for i, auction in enumerate(active_auctions[:3], 1):  # Limit to top 3 for voice
@@ -312,18 +3765,71 @@ def get_voice_auction_summary():
         logger.error(f"Error getting voice auction summary: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/voice/auctions/search', methods=['GET'])
+def search_voice_auctions():
+    """Resolve a spoken description such as "the Rolex" or "show me vehicles" to active auctions"""
+    try:
+        query = request.args.get("q", "").strip()
+        if not query:
+            return jsonify({
+                "success": False,
+                "error": "Missing q",
+                "voice_message": "What kind of item are you looking for?"
+            }), 400
+        
+        found = search_index.search(query, status="active", limit=3)
+        current_time = datetime.now()
+        matches = []
+        for product_id, score in found["results"]:
+            product = repository.get_product(product_id, with_history=False)
+            if product is None:
+                continue
+            minutes_remaining = max(0, int((product["auction_end_time"] - current_time).total_seconds() / 60))
+            matches.append({
+                "id": product_id,
+                "name": product["name"],
+                "current_bid": product["current_highest_bid"],
+                "minutes_remaining": minutes_remaining,
+                "score": score
+            })
+        
+        if not matches:
+            voice_message = f"I couldn't find any active auctions matching {query}."
+        elif len(matches) == 1:
+            match = matches[0]
+            voice_message = f"I found {match['name']}. The current bid is ${match['current_bid']:.0f} with {match['minutes_remaining']} minutes remaining."
+        else:
+            voice_message = f"I found {found['total']} active auctions matching {query}. "
+            for i, match in enumerate(matches, 1):
+                voice_message += f"{i}. {match['name']} - Current bid: ${match['current_bid']:.0f}. "
+        
+        return jsonify({
+            "success": True,
+            "total_matches": found["total"],
+            "matches": matches,
+            "voice_message": voice_message.strip()
+        })
+        
+    except Exception as e:
+        logger.error(f"Error searching voice auctions: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/voice/auctions/<product_id>/details', methods=['GET'])
 def get_voice_auction_details(product_id):
-    """Get voice-friendly details for a specific auction"""
+    """Get voice-friendly details for a specific auction; ?session_id= also subscribes that session to it"""
     try:
-        if product_id not in auction_data["products"]:
+        product = repository.get_product(product_id, with_history=False)
+        if product is None:
             return jsonify({
                 "success": False, 
                 "error": "Product not found",
                 "voice_message": "Sorry, I couldn't find that auction item."
             }), 404
         
-        product = auction_data["products"][product_id]
+        session_id = request.args.get("session_id")
+        if session_id:
+            repository.subscribe_session(session_id, product_id)
+        
         current_time = datetime.now()
         time_remaining = product["auction_end_time"] - current_time
         
@@ -364,7 +3870,32 @@ def get_voice_auction_details(product_id):
         logger.error(f"Error getting voice auction details: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/voice/subscribe', methods=['POST'])
+def subscribe_voice_session():
+    """Subscribe a voice session to updates for a product, or unsubscribe with "subscribe": false"""
+    try:
+        data = request.json or {}
+        session_id = data.get("session_id")
+        product_id = data.get("product_id")
+        if not session_id or not product_id:
+            return jsonify({"success": False, "error": "Missing session_id or product_id"}), 400
+        if repository.get_session(session_id) is None:
+            return jsonify({"success": False, "error": "Invalid session"}), 400
+        if not repository.has_product(product_id):
+            return jsonify({"success": False, "error": "Product not found"}), 404
+        
+        subscribe = data.get("subscribe", True)
+        if subscribe:
+            repository.subscribe_session(session_id, product_id)
+        else:
+            repository.unsubscribe_session(session_id, product_id)
+        return jsonify({"success": True, "session_id": session_id, "product_id": product_id, "subscribed": bool(subscribe)})
+    except Exception as e:
+        logger.error(f"Error updating voice subscription: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/voice/bid', methods=['POST'])
+@idempotent
 def place_voice_bid():
     """Place a bid from voice agent with session context"""
     try:
@@ -383,132 +3914,82 @@ def place_voice_bid():
         session_id = data["session_id"]
         
         # Get user from session
-        if session_id not in active_voice_sessions:
+        session_data = repository.get_session(session_id)
+        if session_data is None:
             return jsonify({
                 "success": False,
                 "error": "Invalid session",
                 "voice_message": "Your session has expired. Please start a new call."
             }), 400
         
-        session_data = active_voice_sessions[session_id]
         bidder_id = session_data["user_id"]
         
         # Update last activity
-        session_data["last_activity"] = datetime.now()
+        repository.touch_session(session_id, datetime.now())
         
-        if product_id not in auction_data["products"]:
+        if not repository.has_product(product_id):
             return jsonify({
                 "success": False,
                 "error": "Product not found",
                 "voice_message": "I couldn't find that auction item. Please try again."
             }), 404
         
-        product = auction_data["products"][product_id]
+        repository.subscribe_session(session_id, product_id)
         
         try:
             bid_amount = float(data["amount"])
         except (ValueError, TypeError):
             return jsonify({
                 "success": False,
-                "error": "Invalid bid amount",
-                "voice_message": "Please provide a valid dollar amount for your bid."
-            }), 400
-        
-        # Check if auction is still active
-        current_time = datetime.now()
-        if current_time >= product["auction_end_time"] or product["status"] != "active":
-            return jsonify({
-                "success": False,
-                "error": "Auction has ended",
-                "voice_message": f"Sorry, the auction for {product['name']} has already ended."
-            }), 400
-        
-        # Check if bid is higher than current highest bid
-        minimum_bid = product["current_highest_bid"] + 50.00
-        if bid_amount <= product["current_highest_bid"]:
-            return jsonify({
-                "success": False,
-                "error": "Bid too low",
-                "voice_message": f"Your bid must be higher than the current bid of ${product['current_highest_bid']:.0f}. The minimum bid is ${minimum_bid:.0f}."
-            }), 400
-        
-        if bid_amount < minimum_bid:
-            return jsonify({
-                "success": False,
-                "error": "Bid increment too small",
-                "voice_message": f"Your bid must be at least ${minimum_bid:.0f}, which includes the 50 dollar minimum increment."
-            }), 400
-        
-        # Create new bid
-        new_bid = {
-            "bid_id": str(uuid.uuid4()),
-            "bidder_id": bidder_id,
-            "amount": bid_amount,
-            "timestamp": current_time
-        }
-        
-        # Store previous info for notifications
-        previous_highest_bid = product["current_highest_bid"]
-        previous_highest_bidder = product["highest_bidder"]
-        
-        # Update product data
-        product["current_highest_bid"] = bid_amount
-        product["highest_bidder"] = bidder_id
-        product["bidding_history"].append(new_bid)
-        product["total_bids"] += 1
-        
-        # Update user data
-        user = auction_data["users"][bidder_id]
-        user["bidding_history"].append({
-            "product_id": product_id,
-            "product_name": product["name"],
-            "amount": bid_amount,
-            "timestamp": current_time.isoformat(),
-            "status": "winning"
-        })
-        
-        # Update active bids
-        user["active_bids"] = [bid for bid in user["active_bids"] if bid["product_id"] != product_id]
-        user["active_bids"].append({
-            "product_id": product_id,
-            "product_name": product["name"],
-            "amount": bid_amount,
-            "status": "winning"
-        })
+                "error": "Invalid bid amount",
+                "voice_message": "Please provide a valid dollar amount for your bid."
+            }), 400
         
-        # Notify previous highest bidder they've been outbid
-        if previous_highest_bidder and previous_highest_bidder != bidder_id:
-            if previous_highest_bidder in auction_data["users"]:
-                prev_user = auction_data["users"][previous_highest_bidder]
-                for bid in prev_user["active_bids"]:
-                    if bid["product_id"] == product_id:
-                        bid["status"] = "outbid"
-            
-            # Send outbid notification
-            notify_voice_sessions({
-                "type": "outbid",
-                "product_id": product_id,
-                "product_name": product["name"],
-                "new_amount": bid_amount,
-                "previous_bidder": previous_highest_bidder
-            })
+        try:
+            result = bid_engine.place_bid(product_id, bidder_id, bid_amount)
+        except BidRejected as e:
+            if e.reason == "not_found":
+                return jsonify({
+                    "success": False,
+                    "error": "Product not found",
+                    "voice_message": "I couldn't find that auction item. Please try again."
+                }), 404
+            if e.reason == "ended":
+                return jsonify({
+                    "success": False,
+                    "error": "Auction has ended",
+                    "voice_message": f"Sorry, the auction for {e.product_name} has already ended."
+                }), 400
+            if e.reason == "too_low":
+                return jsonify({
+                    "success": False,
+                    "error": "Bid too low",
+                    "voice_message": f"Your bid must be higher than the current bid of ${e.current_highest_bid:.0f}. The minimum bid is ${e.minimum_bid:.0f}."
+                }), 400
+            return jsonify({
+                "success": False,
+                "error": "Bid increment too small",
+                "voice_message": f"Your bid must be at least ${e.minimum_bid:.0f}, which includes the 50 dollar minimum increment."
+            }), 400
         
-        # Notify all sessions about new bid
-        notify_voice_sessions({
-            "type": "new_bid",
-            "product_id": product_id,
-            "product_name": product["name"],
-            "amount": bid_amount,
-            "bidder_id": bidder_id,
-            "previous_amount": previous_highest_bid
-        })
+        notify_bid_placed(result)
         
-        logger.info(f"Voice bid placed: ${bid_amount:.2f} on {product['name']} by {bidder_id} (session: {session_id})")
+        new_bid = result["bid"]
+        current_time = new_bid["timestamp"]
+        previous_highest_bid = result["previous_highest_bid"]
+        product_name = result["product_name"]
         
-        time_remaining = max(0, int((product["auction_end_time"] - current_time).total_seconds() / 60))
+        logger.info(f"Voice bid placed: ${bid_amount:.2f} on {product_name} by {bidder_id} (session: {session_id})")
         
-        success_message = f"Congratulations! Your bid of ${bid_amount:.0f} on {product['name']} has been placed successfully. "
-        success_message += f"You are now the highest bidder. There are {time_remaining} minutes remaining in this auction."
+        time_remaining = max(0, int((result["auction_end_time"] - current_time).total_seconds() / 60))
+        
+        if result["highest_bidder"] == bidder_id:
+            success_message = f"Congratulations! Your bid of ${bid_amount:.0f} on {product_name} has been placed successfully. "
+            success_message += f"You are now the highest bidder. There are {time_remaining} minutes remaining in this auction."
+        else:
+            success_message = f"Your bid of ${bid_amount:.0f} on {product_name} was placed, but another bidder's maximum bid "
+            success_message += f"outbid it automatically. The current bid is ${result['current_highest_bid']:.0f}, "
+            success_message += f"with {time_remaining} minutes remaining."
         
         return jsonify({
             "success": True,
@@ -516,11 +3997,13 @@ def place_voice_bid():
             "bid_details": {
                 "bid_id": new_bid["bid_id"],
                 "amount": bid_amount,
-                "product_name": product["name"],
-                "new_highest_bid": bid_amount,
+                "product_name": product_name,
+                "new_highest_bid": result["current_highest_bid"],
+                "is_highest_bidder": result["highest_bidder"] == bidder_id,
                 "previous_highest_bid": previous_highest_bid,
-                "total_bids": product["total_bids"],
-                "minutes_remaining": time_remaining
+                "total_bids": result["total_bids"],
+                "minutes_remaining": time_remaining,
+                "durable": result["durable"]
             }
         })
         
@@ -539,50 +4022,54 @@ def get_voice_user_status():
         data = request.json or {}
         session_id = data.get("session_id")
         
-        if not session_id or session_id not in active_voice_sessions:
+        session_data = repository.get_session(session_id) if session_id else None
+        if session_data is None:
             return jsonify({
                 "success": False,
                 "error": "Invalid session",
                 "voice_message": "Your session has expired. Please start a new call."
             }), 400
         
-        session_data = active_voice_sessions[session_id]
         user_id = session_data["user_id"]
-        user = auction_data["users"][user_id]
+        repository.touch_session(session_id, datetime.now())
+        user = repository.ensure_user(user_id)
+        standing = repository.bid_standing(user_id)
         
         active_bids = user["active_bids"]
-        winning_bids = [bid for bid in active_bids if bid["status"] == "winning"]
-        outbid_bids = [bid for bid in active_bids if bid["status"] == "outbid"]
         
         status_message = f"Here's your current status: "
         
         if not active_bids:
             status_message += "You don't have any active bids at the moment."
         else:
-            if winning_bids:
-                status_message += f"You are currently winning {len(winning_bids)} auction"
-                if len(winning_bids) > 1:
+            winning_parts = []
+            outbid_parts = []
+            for bid in active_bids:
+                if bid["status"] == "winning":
+                    winning_parts.append(f"{bid['product_name']} with a bid of ${bid['amount']:.0f}. ")
+                elif bid["status"] == "outbid":
+                    outbid_parts.append(f"{bid['product_name']}. ")
+            
+            if standing["winning"]:
+                status_message += f"You are currently winning {standing['winning']} auction"
+                if standing["winning"] > 1:
                     status_message += "s"
-                status_message += ": "
-                for bid in winning_bids:
-                    status_message += f"{bid['product_name']} with a bid of ${bid['amount']:.0f}. "
+                status_message += ": " + "".join(winning_parts)
             
-            if outbid_bids:
-                status_message += f"You have been outbid on {len(outbid_bids)} item"
-                if len(outbid_bids) > 1:
+            if standing["outbid"]:
+                status_message += f"You have been outbid on {standing['outbid']} item"
+                if standing["outbid"] > 1:
                     status_message += "s"
-                status_message += ": "
-                for bid in outbid_bids:
-                    status_message += f"{bid['product_name']}. "
+                status_message += ": " + "".join(outbid_parts)
         
         return jsonify({
             "success": True,
             "voice_message": status_message.strip(),
             "user_status": {
                 "total_active_bids": len(active_bids),
-                "winning_bids": len(winning_bids),
-                "outbid_bids": len(outbid_bids),
-                "total_bid_history": len(user["bidding_history"])
+                "winning_bids": standing["winning"],
+                "outbid_bids": standing["outbid"],
+                "total_bid_history": user["total_bids"]
             },
             "active_bids": active_bids
         })
@@ -597,12 +4084,29 @@ def get_voice_user_status():
 
 @app.route('/api/user/<user_id>/bids', methods=['GET'])
 def get_user_bids(user_id):
-    """Get all bids for a specific user"""
+    """Get all bids for a specific user, or one newest-first page with ?limit=&cursor="""
     try:
-        if user_id not in auction_data["users"]:
-            return jsonify({"success": False, "error": "User not found"}), 404
+        if "limit" in request.args or "cursor" in request.args:
+            try:
+                limit, cursor = history_page_args()
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            user = repository.get_user(user_id, with_history=False)
+            if user is None:
+                return jsonify({"success": False, "error": "User not found"}), 404
+            bids, next_cursor = repository.user_bids(user_id, limit, cursor)
+            return jsonify({
+                "success": True,
+                "user_id": user_id,
+                "bidding_history": [serialize_bid(bid) for bid in bids],
+                "active_bids": user["active_bids"],
+                "total_bids": user["total_bids"],
+                "next_cursor": None if next_cursor is None else str(next_cursor)
+            })
         
-        user = auction_data["users"][user_id]
+        user = repository.get_user(user_id)
+        if user is None:
+            return jsonify({"success": False, "error": "User not found"}), 404
         
         return jsonify({
             "success": True,
@@ -631,18 +4135,12 @@ def omnidimension_webhook():
         if event_type == "call_started" and session_id:
             # Auto-start session when call begins
             phone_number = (data or {}).get("caller_number", "")
-            # Call start_voice_session internally
-            session_data = {
-                "phone_number": phone_number,
-                "session_id": session_id
-            }
-            start_voice_session_internal(session_data)
+            open_voice_session(session_id, phone_number)
             logger.info(f"Auto-started session for call: {session_id}")
         
         elif event_type == "call_ended" and session_id:
             # Auto-end session when call ends
-            if session_id in active_voice_sessions:
-                active_voice_sessions.pop(session_id)
+            if close_voice_session(session_id) is not None:
                 logger.info(f"Auto-ended session for call: {session_id}")
         
         return jsonify({"success": True, "message": "Webhook processed"})
@@ -651,119 +4149,187 @@ def omnidimension_webhook():
         logger.error(f"Error processing OmniDimension webhook: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
-def start_voice_session_internal(data):
-    """Internal function to start voice session (used by webhook)"""
-    phone_number = data.get('phone_number', '')
-    session_id = data.get('session_id', str(uuid.uuid4()))
-    
-    # Create user ID based on phone number or session ID
-    user_id = f"voice_user_{phone_number.replace('+', '').replace('-', '')}" if phone_number else f"voice_user_{session_id}"
-    
-    # Create user if doesn't exist
-    if user_id not in auction_data["users"]:
-        auction_data["users"][user_id] = {
-            "id": user_id,
-            "name": f"Voice User ({phone_number})" if phone_number else f"Voice User {session_id[:8]}",
-            "phone": phone_number,
-            "bidding_history": [],
-            "total_spent": 0.0,
-            "active_bids": []
-        }
-    
-    # Store session info
-    active_voice_sessions[session_id] = {
-        "user_id": user_id,
-        "phone_number": phone_number,
-        "start_time": datetime.now(),
-        "last_activity": datetime.now()
-    }
-
 # ===== ORIGINAL ENDPOINTS (kept for compatibility) =====
 
+HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '50'))
+HISTORY_PAGE_MAX = 500
+
+def history_page_args():
+    """Parse ?limit=&cursor= for a history page; raises ValueError on bad input"""
+    try:
+        limit = int(request.args.get("limit", HISTORY_PAGE_SIZE))
+        cursor = request.args.get("cursor")
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        raise ValueError("limit and cursor must be integers")
+    if not 1 <= limit <= HISTORY_PAGE_MAX:
+        raise ValueError(f"limit must be between 1 and {HISTORY_PAGE_MAX}")
+    if cursor is not None and cursor < 0:
+        raise ValueError("cursor must not be negative")
+    return limit, cursor
+
+SEARCH_LIMIT_MAX = 100
+
+def search_args():
+    """Parse ?q=&category=&status=&limit= for a search; raises ValueError on bad input"""
+    try:
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= SEARCH_LIMIT_MAX:
+        raise ValueError(f"limit must be between 1 and {SEARCH_LIMIT_MAX}")
+    return (request.args.get("q", ""), request.args.get("category") or None,
+            request.args.get("status") or None, limit)
+
+def listing_filter_args(current_time: datetime) -> dict:
+    """Parse ?status=&category=&ending_within=<seconds> into find_products filters; raises ValueError on bad input"""
+    filters = {}
+    for name in ("status", "category"):
+        if request.args.get(name):
+            filters[name] = request.args[name]
+    ending_within = request.args.get("ending_within")
+    if ending_within:
+        try:
+            seconds = float(ending_within)
+        except ValueError:
+            raise ValueError("ending_within must be a number of seconds")
+        if seconds < 0:
+            raise ValueError("ending_within must not be negative")
+        filters["ends_after"] = current_time
+        filters["ends_before"] = current_time + timedelta(seconds=seconds)
+    return filters
+
+def matches_filters(product: dict, filters: dict) -> bool:
+    """True if ``product`` passes filters from listing_filter_args"""
+    return (product["status"] == filters.get("status", product["status"])
+            and product["category"].lower() == filters.get("category", product["category"]).lower()
+            and filters.get("ends_after", product["auction_end_time"]) <= product["auction_end_time"]
+            <= filters.get("ends_before", product["auction_end_time"]))
+
+def summary_requested() -> bool:
+    """True when ?summary= asks for responses without bidding histories"""
+    return request.args.get("summary", "").lower() in ("1", "true", "yes")
+
+def listing_product(product_id: str, current_time: datetime, with_history: bool = True) -> dict:
+    """Build the /api/auctions representation of one product"""
+    product = repository.get_product(product_id, with_history=False)
+    product_copy = dict(auction_snapshots.get(product_id, with_history))
+    product_copy["category"] = product["category"].title()
+    product_copy.update(time_remaining_fields(product, current_time))
+    return product_copy
+
+def detail_product(product_id: str, current_time: datetime, with_history: bool = True) -> dict:
+    """Build the /api/auctions/<id> representation of one product"""
+    product = dict(auction_snapshots.get(product_id, with_history))
+    product.update(time_remaining_fields(repository.get_product(product_id, with_history=False), current_time))
+    product.pop("urgency")
+    return product
+
+def versioned_response(payload: dict, etag: Optional[str]):
+    """JSON response carrying a weak ETag, or an empty 304 if the client already has it; no ETag when None.
+
+    The ETag is weak because it stands for the products' state, not for the
+    fields computed from the clock at response time.
+    """
+    if etag is None:
+        return jsonify(payload)
+    if request.if_none_match.contains_weak(etag):
+        response = make_response("", 304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 @app.route('/api/auctions', methods=['GET'])
 def get_all_auctions():
-    """Get all auction products with current status"""
+    """Get all auction products with current status.
+
+    Responses carry a weak ETag of the global change version and answer 304
+    when it matches If-None-Match. The version moves with bids and status
+    changes only, so the ETag does not cover what is computed from the clock:
+    ``time_remaining_*``, ``urgency``, and a status of "ended" read off a
+    deadline the expiry scheduler has not acted on yet. Clients revalidating
+    with it count down from ``auction_end_time`` themselves. With
+    ``?since=<version>``, the ``version`` token of an earlier response, only
+    products changed after it are returned; a token from another epoch (the
+    server restarted) or one ahead of the server gets the full listing. ``?summary=true`` leaves out each
+    product's bidding history; page through it with /api/auctions/<id>/bids.
+    ``?status=``, ``?category=`` and ``?ending_within=<seconds>`` narrow the
+    listing through the product indexes; filtered listings are ordered by
+    end time. An ``ending_within`` window moves with the clock, so those
+    responses carry no ETag.
+    """
     try:
-        products_with_time = {}
         current_time = datetime.now()
+        since_token = request.args.get("since")
+        since = change_tracker.parse(since_token) if since_token else None
+        with_history = not summary_requested()
+        try:
+            filters = listing_filter_args(current_time)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        variant = "" if with_history else "-summary"
+        if "status" in filters or "category" in filters:
+            variant += f"-{filters.get('status', '')}-{filters.get('category', '').lower()}"
+        moving = "ends_before" in filters
         
-        for product_id, product in auction_data["products"].items():
-            product_copy = product.copy()
-            product_copy["category"] = product["category"].title()
-            time_remaining = product["auction_end_time"] - current_time
-            
-            if time_remaining.total_seconds() > 0 and product["status"] == "active":
-                minutes_remaining = max(0, int(time_remaining.total_seconds() / 60))
-                seconds_remaining = max(0, int(time_remaining.total_seconds() % 60))
-                product_copy["time_remaining_minutes"] = minutes_remaining
-                product_copy["time_remaining_seconds"] = seconds_remaining
-                product_copy["time_remaining_text"] = f"{minutes_remaining} minutes and {seconds_remaining} seconds"
-                if minutes_remaining < 5:
-                    product_copy["urgency"] = "high"
-                elif minutes_remaining < 15:
-                    product_copy["urgency"] = "medium"
-                else:
-                    product_copy["urgency"] = "low"
-            else:
-                product_copy["time_remaining_minutes"] = 0
-                product_copy["time_remaining_seconds"] = 0
-                product_copy["time_remaining_text"] = "Auction ended"
-                product_copy["status"] = "ended"
-                product_copy["urgency"] = "none"
-            
-            # Convert datetime objects to strings for JSON serialization
-            product_copy["auction_end_time"] = product["auction_end_time"].isoformat()
-            bidding_history_copy = []
-            for bid in product_copy["bidding_history"]:
-                bid_copy = bid.copy()
-                bid_copy["timestamp"] = bid["timestamp"].isoformat()
-                bidding_history_copy.append(bid_copy)
-            product_copy["bidding_history"] = bidding_history_copy
-            
-            products_with_time[product_id] = product_copy
+        if since is not None:
+            version, changed = change_tracker.changed_since(since)
+            if since <= version:
+                # A changed product that no longer passes the filters is reported as removed from the listing
+                removed = []
+                if filters:
+                    matching = []
+                    for product_id in changed:
+                        product = repository.get_product(product_id, with_history=False)
+                        (matching if matches_filters(product, filters) else removed).append(product_id)
+                    changed = matching
+                products = {product_id: listing_product(product_id, current_time, with_history) for product_id in changed}
+                payload = {
+                    "success": True,
+                    "version": change_tracker.token(version),
+                    "since": since_token,
+                    "full": False,
+                    "products": products,
+                    "changed_products": len(products)
+                }
+                if filters:
+                    payload["removed"] = removed
+                return versioned_response(payload, None if moving
+                                          else f"v{change_tracker.token(version)}-since{since}{variant}")
         
-        return jsonify({
+        # Read the version before building so no later change can be missed
+        version = change_tracker.version
+        etag = None if moving else f"v{change_tracker.token(version)}{variant}"
+        if etag is not None and request.if_none_match.contains_weak(etag):
+            return versioned_response({}, etag)
+        
+        product_ids = repository.find_products(**filters) if filters else repository.product_ids()
+        products_with_time = {}
+        for product_id in product_ids:
+            products_with_time[product_id] = listing_product(product_id, current_time, with_history)
+        
+        return versioned_response({
             "success": True,
+            "version": change_tracker.token(version),
+            "full": True,
             "products": products_with_time,
             "total_products": len(products_with_time),
             "active_products": len([p for p in products_with_time.values() if p["status"] == "active"])
-        })
+        }, etag)
     except Exception as e:
         logger.error(f"Error getting auctions: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/auctions/<product_id>', methods=['GET'])
 def get_auction_details(product_id):
-    """Get details for a specific auction product"""
+    """Get details for a specific auction product; ?summary=true omits the bidding history"""
     try:
-        if product_id not in auction_data["products"]:
+        if not repository.has_product(product_id):
             return jsonify({"success": False, "error": "Product not found"}), 404
         
-        product = auction_data["products"][product_id].copy()
-        current_time = datetime.now()
-        time_remaining = product["auction_end_time"] - current_time
-        
-        if time_remaining.total_seconds() > 0 and product["status"] == "active":
-            minutes_remaining = max(0, int(time_remaining.total_seconds() / 60))
-            seconds_remaining = max(0, int(time_remaining.total_seconds() % 60))
-            product["time_remaining_minutes"] = minutes_remaining
-            product["time_remaining_seconds"] = seconds_remaining
-            product["time_remaining_text"] = f"{minutes_remaining} minutes and {seconds_remaining} seconds"
-        else:
-            product["time_remaining_minutes"] = 0
-            product["time_remaining_seconds"] = 0
-            product["time_remaining_text"] = "Auction ended"
-            if product["status"] == "active":
-                product["status"] = "ended"
-        
-        # Convert datetime objects to strings
-        product["auction_end_time"] = product["auction_end_time"].isoformat()
-        bidding_history_copy = []
-        for bid in product["bidding_history"]:
-            bid_copy = bid.copy()
-            bid_copy["timestamp"] = bid["timestamp"].isoformat()
-            bidding_history_copy.append(bid_copy)
-        product["bidding_history"] = bidding_history_copy
+        product = detail_product(product_id, datetime.now(), not summary_requested())
         
         return jsonify({
             "success": True,
@@ -773,18 +4339,82 @@ def get_auction_details(product_id):
         logger.error(f"Error getting auction details: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search_auctions():
+    """Ranked full-text search over name, category and description: ?q=&category=&status=&limit=.
+
+    Matches tolerate prefixes and one typo per word; ``facets`` counts the
+    matches by category and status before the filters are applied.
+    """
+    try:
+        try:
+            query, category, status, limit = search_args()
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        found = search_index.search(query, category, status, limit)
+        results = []
+        for product_id, score in found["results"]:
+            product = repository.get_product(product_id, with_history=False)
+            if product is None:
+                continue
+            results.append({
+                "id": product_id,
+                "name": product["name"],
+                "category": product["category"].title(),
+                "status": product["status"],
+                "current_highest_bid": product["current_highest_bid"],
+                "total_bids": product["total_bids"],
+                "auction_end_time": product["auction_end_time"].isoformat(),
+                "score": score
+            })
+        
+        return jsonify({
+            "success": True,
+            "query": query,
+            "total": found["total"],
+            "results": results,
+            "facets": found["facets"]
+        })
+    except Exception as e:
+        logger.error(f"Error searching auctions: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/auctions/<product_id>/bids', methods=['GET'])
+def get_auction_bids(product_id):
+    """Page through a product's bids, newest first, with ?limit=&cursor="""
+    try:
+        if not repository.has_product(product_id):
+            return jsonify({"success": False, "error": "Product not found"}), 404
+        try:
+            limit, cursor = history_page_args()
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        bids, next_cursor = repository.product_bids(product_id, limit, cursor)
+        return jsonify({
+            "success": True,
+            "product_id": product_id,
+            "bids": [serialize_bid(bid) for bid in bids],
+            "total_bids": repository.get_product(product_id, with_history=False)["total_bids"],
+            "next_cursor": None if next_cursor is None else str(next_cursor)
+        })
+    except Exception as e:
+        logger.error(f"Error getting auction bids: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/api/auctions/<product_id>/bid', methods=['POST'])
+@idempotent
 def place_bid(product_id):
     """Place a new bid on a product (original endpoint)"""
     try:
-        if product_id not in auction_data["products"]:
+        if not repository.has_product(product_id):
             return jsonify({"success": False, "error": "Product not found"}), 404
         
         data = request.json
         if not data or "amount" not in data or "bidder_id" not in data:
             return jsonify({"success": False, "error": "Missing bid amount or bidder ID"}), 400
         
-        product = auction_data["products"][product_id]
         try:
             bid_amount = float(data["amount"])
         except (ValueError, TypeError):
@@ -792,131 +4422,205 @@ def place_bid(product_id):
             
         bidder_id = data["bidder_id"]
         
-        # Check if auction is still active
-        current_time = datetime.now()
-        if current_time >= product["auction_end_time"] or product["status"] != "active":
-            return jsonify({"success": False, "error": "Auction has ended"}), 400
+        try:
+            result = bid_engine.place_bid(product_id, bidder_id, bid_amount)
+        except BidRejected as e:
+            error, status = bid_rejection_error(e)
+            return jsonify({"success": False, "error": error}), status
         
-        # Check if bid is higher than current highest bid
-        minimum_bid = product["current_highest_bid"] + 50.00  # Minimum increment
-        if bid_amount <= product["current_highest_bid"]:
-            return jsonify({
-                "success": False,
-                "error": f"Bid must be higher than current highest bid of ${product['current_highest_bid']:.2f}. Minimum bid: ${minimum_bid:.2f}"
-            }), 400
+        notify_bid_placed(result)
         
-        if bid_amount < minimum_bid:
-            return jsonify({
-                "success": False,
-                "error": f"Bid must be at least ${minimum_bid:.2f} (current bid + $50 minimum increment)"
-            }), 400
+        logger.info(f"Bid placed: ${bid_amount:.2f} on {result['product_name']} by {bidder_id}")
         
-        # Create new bid
-        new_bid = {
-            "bid_id": str(uuid.uuid4()),
-            "bidder_id": bidder_id,
-            "amount": bid_amount,
-            "timestamp": current_time
-        }
+        message = f"Bid of ${bid_amount:.2f} placed successfully!"
+        if result["highest_bidder"] != bidder_id:
+            message += f" It was outbid by an automatic bid; the current bid is ${result['current_highest_bid']:.2f}."
+        return jsonify({
+            "success": True,
+            "message": message,
+            "bid_details": bid_details(result)
+        })
         
-        # Store previous info for notifications
-        previous_highest_bid = product["current_highest_bid"]
-        previous_highest_bidder = product["highest_bidder"]
+    except Exception as e:
+        logger.error(f"Error placing bid: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '100'))
+
+def bid_rejection_error(e: BidRejected):
+    """Error message and status code for a rejected bid"""
+    if e.reason == "not_found":
+        return "Product not found", 404
+    if e.reason == "ended":
+        return "Auction has ended", 400
+    if e.reason == "proxy_lowered":
+        return f"Maximum bid cannot be lowered below your current maximum of ${e.minimum_bid:.2f}", 400
+    if e.reason == "too_low":
+        return f"Bid must be higher than current highest bid of ${e.current_highest_bid:.2f}. Minimum bid: ${e.minimum_bid:.2f}", 400
+    return f"Bid must be at least ${e.minimum_bid:.2f} (current bid + $50 minimum increment)", 400
+
+def bid_details(result: dict) -> dict:
+    return {
+        "bid_id": result["bid"]["bid_id"] if result["bid"] else None,
+        "amount": result["bid"]["amount"] if result["bid"] else None,
+        "product_name": result["product_name"],
+        "new_highest_bid": result["current_highest_bid"],
+        "highest_bidder": result["highest_bidder"],
+        "previous_highest_bid": result["previous_highest_bid"],
+        "automatic_bids": len(result["automatic_bids"]),
+        "total_bids": result["total_bids"],
+        # False when the bid log could not confirm the write yet; the bid stands regardless
+        "durable": result["durable"]
+    }
+
+@app.route('/api/auctions/<product_id>/proxy-bid', methods=['POST'])
+@idempotent
+def place_proxy_bid(product_id):
+    """Register or raise a maximum bid; the server bids on the bidder's behalf up to it"""
+    try:
+        if not repository.has_product(product_id):
+            return jsonify({"success": False, "error": "Product not found"}), 404
         
-        # Update product data
-        product["current_highest_bid"] = bid_amount
-        product["highest_bidder"] = bidder_id
-        product["bidding_history"].append(new_bid)
-        product["total_bids"] += 1
+        data = request.json
+        if not data or "max_amount" not in data or "bidder_id" not in data:
+            return jsonify({"success": False, "error": "Missing maximum bid amount or bidder ID"}), 400
         
-        # Create user if doesn't exist
-        if bidder_id not in auction_data["users"]:
-            auction_data["users"][bidder_id] = {
-                "id": bidder_id,
-                "name": f"User {bidder_id}",
-                "phone": "",
-                "bidding_history": [],
-                "total_spent": 0.0,
-                "active_bids": []
-            }
+        try:
+            max_amount = float(data["max_amount"])
+        except (ValueError, TypeError):
+            return jsonify({"success": False, "error": "Invalid maximum bid amount"}), 400
         
-        # Update user data
-        user = auction_data["users"][bidder_id]
-        user["bidding_history"].append({
-            "product_id": product_id,
-            "product_name": product["name"],
-            "amount": bid_amount,
-            "timestamp": current_time.isoformat(),
-            "status": "winning"
-        })
+        bidder_id = data["bidder_id"]
         
-        # Update active bids
-        user["active_bids"] = [bid for bid in user["active_bids"] if bid["product_id"] != product_id]
-        user["active_bids"].append({
-            "product_id": product_id,
-            "product_name": product["name"],
-            "amount": bid_amount,
-            "status": "winning"
-        })
+        try:
+            result = bid_engine.set_proxy_bid(product_id, bidder_id, max_amount)
+        except BidRejected as e:
+            error, status = bid_rejection_error(e)
+            return jsonify({"success": False, "error": error}), status
         
-        # Notify previous highest bidder they've been outbid
-        if previous_highest_bidder and previous_highest_bidder != bidder_id:
-            if previous_highest_bidder in auction_data["users"]:
-                prev_user = auction_data["users"][previous_highest_bidder]
-                for bid in prev_user["active_bids"]:
-                    if bid["product_id"] == product_id:
-                        bid["status"] = "outbid"
-        
-        # Notify all sessions about new bid
-        notify_voice_sessions({
-            "type": "new_bid",
-            "product_id": product_id,
-            "product_name": product["name"],
-            "amount": bid_amount,
-            "bidder_id": bidder_id,
-            "previous_amount": previous_highest_bid
+        if result["automatic_bids"]:
+            notify_bid_placed(result)
+        
+        winning = result["highest_bidder"] == bidder_id
+        logger.info(f"Maximum bid of ${max_amount:.2f} on {result['product_name']} by {bidder_id}; "
+                    f"{len(result['automatic_bids'])} automatic bids")
+        
+        return jsonify({
+            "success": True,
+            "message": f"Maximum bid of ${max_amount:.2f} registered. "
+                       + (f"You are the highest bidder at ${result['current_highest_bid']:.2f}."
+                          if winning else f"Another bidder's maximum is higher; the current bid is ${result['current_highest_bid']:.2f}."),
+            "max_amount": max_amount,
+            "is_highest_bidder": winning,
+            "bid_details": bid_details(result)
         })
         
-        logger.info(f"Bid placed: ${bid_amount:.2f} on {product['name']} by {bidder_id}")
+    except Exception as e:
+        logger.error(f"Error placing proxy bid: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/bids:batch', methods=['POST'])
+@idempotent
+def place_bids_batch():
+    """Place up to BATCH_MAX_ITEMS bids in one request, with a result per item.
+
+    Body: ``{"bids": [{"product_id", "bidder_id", "amount"}, ...]}``. Items are
+    applied in order, so a later bid on the same lot sees the earlier ones.
+    One item's rejection does not affect the others.
+    """
+    try:
+        data = request.get_json(silent=True)
+        items = data.get("bids") if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({"success": False, "error": "Missing bids list"}), 400
+        if len(items) > BATCH_MAX_ITEMS:
+            return jsonify({"success": False, "error": f"At most {BATCH_MAX_ITEMS} bids per batch"}), 400
+        
+        results: List[Optional[dict]] = [None] * len(items)
+        valid, positions = [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or "product_id" not in item or "amount" not in item or "bidder_id" not in item:
+                results[index] = {"success": False, "status": 400, "error": "Missing product ID, bid amount or bidder ID"}
+                continue
+            try:
+                bid_amount = float(item["amount"])
+            except (ValueError, TypeError):
+                results[index] = {"success": False, "status": 400, "error": "Invalid bid amount"}
+                continue
+            valid.append((item["product_id"], item["bidder_id"], bid_amount))
+            positions.append(index)
+        
+        accepted = []
+        for index, outcome in zip(positions, bid_engine.place_bids(valid)):
+            if isinstance(outcome, BidRejected):
+                error, status = bid_rejection_error(outcome)
+                results[index] = {"success": False, "status": status, "error": error}
+            else:
+                accepted.append(outcome)
+                results[index] = {"success": True, "status": 200, "bid_details": bid_details(outcome)}
+        
+        for result in accepted:
+            notify_bid_placed(result)
+        
+        logger.info(f"Batch of {len(items)} bids: {len(accepted)} accepted")
         
         return jsonify({
             "success": True,
-            "message": f"Bid of ${bid_amount:.2f} placed successfully!",
-            "bid_details": {
-                "bid_id": new_bid["bid_id"],
-                "amount": bid_amount,
-                "product_name": product["name"],
-                "new_highest_bid": bid_amount,
-                "previous_highest_bid": previous_highest_bid,
-                "total_bids": product["total_bids"]
-            }
+            "results": results,
+            "accepted": len(accepted),
+            "rejected": len(items) - len(accepted)
         })
         
     except Exception as e:
-        logger.error(f"Error placing bid: {e}")
+        logger.error(f"Error placing batch bids: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/api/auctions:batch', methods=['GET'])
+def get_auctions_batch():
+    """Get details for up to BATCH_MAX_ITEMS products: ?ids=a,b,c; ?summary=true omits bidding histories"""
+    try:
+        product_ids = [product_id for product_id in request.args.get("ids", "").split(",") if product_id]
+        if not product_ids:
+            return jsonify({"success": False, "error": "Missing ids"}), 400
+        if len(product_ids) > BATCH_MAX_ITEMS:
+            return jsonify({"success": False, "error": f"At most {BATCH_MAX_ITEMS} ids per batch"}), 400
+        
+        current_time = datetime.now()
+        with_history = not summary_requested()
+        products, missing = {}, []
+        for product_id in dict.fromkeys(product_ids):
+            if repository.has_product(product_id):
+                products[product_id] = detail_product(product_id, current_time, with_history)
+            else:
+                missing.append(product_id)
+        
+        return jsonify({
+            "success": True,
+            "products": products,
+            "missing": missing
+        })
+    except Exception as e:
+        logger.error(f"Error getting auction batch: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/users', methods=['GET'])
 def get_all_users():
-    """Get all users and their bidding information"""
+    """Get all users and their bidding information; ?summary=true omits bidding histories"""
     try:
-        users_copy = {}
-        for user_id, user in auction_data["users"].items():
-            user_copy = user.copy()
-            # Convert datetime objects in bidding history
-            bidding_history_copy = []
-            for bid in user_copy["bidding_history"]:
-                bid_copy = bid.copy()
-                if isinstance(bid.get("timestamp"), datetime):
-                    bid_copy["timestamp"] = bid["timestamp"].isoformat()
-                bidding_history_copy.append(bid_copy)
-            user_copy["bidding_history"] = bidding_history_copy
-            users_copy[user_id] = user_copy
+        if summary_requested():
+            users = repository.list_users(with_history=False)
+            return jsonify({
+                "success": True,
+                "users": users,
+                "total_users": len(users)
+            })
         
+        # The JSON provider writes bid timestamps itself
+        users = repository.list_users()
         return jsonify({
             "success": True,
-            "users": users_copy,
-            "total_users": len(users_copy)
+            "users": users,
+            "total_users": len(users)
         })
     except Exception as e:
         logger.error(f"Error getting users: {e}")
@@ -926,22 +4630,93 @@ def get_all_users():
 def get_active_sessions():
     """Get all active voice sessions"""
     try:
-        sessions_copy = {}
-        for session_id, session in active_voice_sessions.items():
-            session_copy = session.copy()
-            session_copy["start_time"] = session["start_time"].isoformat()
-            session_copy["last_activity"] = session["last_activity"].isoformat()
-            sessions_copy[session_id] = session_copy
-        
+        # The JSON provider writes start_time and last_activity itself
+        sessions = repository.list_sessions()
         return jsonify({
             "success": True,
-            "active_sessions": sessions_copy,
-            "total_sessions": len(sessions_copy)
+            "active_sessions": sessions,
+            "total_sessions": len(sessions)
         })
     except Exception as e:
         logger.error(f"Error getting active sessions: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/sessions/stats', methods=['GET'])
+def get_session_stats():
+    """Get live, reaped and evicted voice session counts"""
+    return jsonify({"success": True, "sessions": repository.session_stats()})
+
+@app.route('/api/stream', methods=['GET'])
+def stream_events():
+    """Server-Sent Events stream of new_bid, outbid and auction_ended events.
+
+    ``?products=prod_1,prod_2`` limits the stream to those products. Clients
+    resume with the Last-Event-ID header (or ``?last_event_id=``); if the
+    requested events have left the replay buffer a ``resync`` event is sent
+    first so the client knows to refetch /api/auctions. Past SSE_MAX_STREAMS
+    open streams the worker answers 503 with Retry-After.
+    """
+    products_arg = request.args.get("products", "")
+    product_ids = {p for p in products_arg.split(",") if p} or None
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    try:
+        subscription, complete = event_bus.subscribe(product_ids, last_event_id)
+    except StreamLimitReached as e:
+        logger.warning(f"Refusing event stream: {e}")
+        response = jsonify({"success": False, "error": "Too many open event streams, retry shortly"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+    
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            if not complete:
+                yield "event: resync\ndata: {}\n\n"
+            while not subscription.overflowed:
+                try:
+                    yield subscription.queue.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    response = app.response_class(generate(), mimetype="text/event-stream")
+    # Also frees the slot when the stream is closed before its first frame was sent
+    response.call_on_close(lambda: event_bus.unsubscribe(subscription))
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.route('/api/stream/stats', methods=['GET'])
+def get_stream_stats():
+    """Get event stream subscriber and replay buffer counts"""
+    return jsonify({"success": True, "stream": event_bus.stats()})
+
+@app.route('/api/webhooks/stats', methods=['GET'])
+@require_api_key
+def get_webhook_stats():
+    """Get outbound webhook queue depth, drops, delivery latency and coalescing counts"""
+    return jsonify({"success": True, "webhooks": webhook_dispatcher.stats(),
+                    "coalescing": notification_outbox.stats()})
+
+@app.route('/api/webhooks/dead-letters/replay', methods=['POST'])
+@require_api_key
+def replay_dead_letter_webhooks():
+    """Re-queue every dead-lettered webhook message for delivery"""
+    try:
+        result = webhook_dispatcher.replay_dead_letters()
+        logger.info(f"Replayed dead-lettered webhooks: {result}")
+        return jsonify({"success": True, **result})
+    except Exception as e:
+        logger.error(f"Error replaying dead-lettered webhooks: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"success": False, "error": "Endpoint not found"}), 404
@@ -950,17 +4725,266 @@ def not_found(error):
 def internal_error(error):
     return jsonify({"success": False, "error": "Internal server error"}), 500
 
+# ===== STATIC ASSETS AND COMPRESSION =====
+
+# Relative to the app, like send_from_directory, rather than to wherever the process was started
+STATIC_ROOT = os.path.join(app.root_path, os.getenv('STATIC_ROOT', 'build'))
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+# Levels for API responses compressed per request; static assets are compressed once at the highest levels
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '1'))
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '2'))
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/javascript", "text/javascript", "text/html", "text/css",
+                          "text/plain", "image/svg+xml", "application/manifest+json"}
+# Build tools put a content hash in the names of files that may be cached forever
+HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.")
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+mimetypes.add_type("application/json", ".map")
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if best else COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if best else COMPRESS_GZIP_LEVEL, mtime=0)
+
+class StaticAssets:
+    """The React build held in memory, each file with its compressed variants prepared once.
+
+    Files are read when the process starts, so a new build is picked up on
+    the next deploy's restart. Every variant has its own strong ETag, and
+    content-hashed files are served as immutable for a year; anything else,
+    such as index.html, must be revalidated.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._assets: Dict[str, dict] = {}
+        if not os.path.isdir(root):
+            logger.warning(f"Static asset directory {root} not found; the React build will not be served")
+            return
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                with open(path, "rb") as f:
+                    self._add(os.path.relpath(path, root).replace(os.sep, "/"), f.read())
+        if self._assets:
+            logger.info(f"Loaded {len(self._assets)} static assets from {root}")
+
+    def _add(self, name: str, data: bytes):
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        variants = {"identity": (data, digest)}
+        if mimetype in COMPRESSIBLE_MIMETYPES and len(data) >= COMPRESS_MIN_BYTES:
+            for encoding in ENCODINGS:
+                compressed = compress(data, encoding, best=True)
+                if len(compressed) < len(data):
+                    variants[encoding] = (compressed, f"{digest}-{encoding}")
+        immutable = HASHED_ASSET_RE.search(name) is not None
+        self._assets[name] = {
+            "mimetype": mimetype,
+            "variants": variants,
+            "cache_control": "public, max-age=31536000, immutable" if immutable else "no-cache"
+        }
+
+    def response(self, name: str):
+        """Response for a build file in the best encoding the client accepts, or None if there is no such file"""
+        asset = self._assets.get(name)
+        if asset is None:
+            return None
+        variants = asset["variants"]
+        encoding = request.accept_encodings.best_match(
+            [encoding for encoding in ENCODINGS if encoding in variants] + ["identity"], default="identity")
+        data, etag = variants[encoding]
+        if request.if_none_match.contains_weak(etag):
+            response = make_response("", 304)
+        else:
+            response = make_response(data)
+        response.mimetype = asset["mimetype"]
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = asset["cache_control"]
+        if len(variants) > 1:
+            response.vary.add("Accept-Encoding")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        return response
+
+static_assets = StaticAssets(STATIC_ROOT)
+
+@app.after_request
+def compress_response(response):
+    """Compress bodies of compressible types above COMPRESS_MIN_BYTES with br or gzip, as the client accepts.
+
+    Streamed and file responses are left alone. ETags become weak, since the
+    compressed bytes differ from the representation they were derived from.
+    """
+    if (response.status_code < 200 or response.status_code in (204, 206, 304) or response.direct_passthrough
+            or response.is_streamed or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_react(path):
-    if path != "" and os.path.exists(os.path.join('build', path)):
-        return send_from_directory('build', path)
-    else:
-        return send_from_directory('build', 'index.html')
+    """Serve a file from the React build, or index.html for client-side routes"""
+    response = static_assets.response(path) if path else None
+    if response is None:
+        response = static_assets.response("index.html")
+    if response is None:
+        # No build present
+        return send_from_directory(STATIC_ROOT, 'index.html')
+    return response
+
+# ===== MULTI-PROCESS COORDINATION =====
+
+EVENT_RELAY_INTERVAL_MS = float(os.getenv('EVENT_RELAY_INTERVAL_MS', '50'))
+EVENT_RETENTION = int(os.getenv('EVENT_RETENTION', '100000'))
+EXPIRY_LOCK_PATH = os.getenv('EXPIRY_LOCK_PATH', SQLITE_PATH + '.expiry.lock')
+
+expiry_owner = threading.Event()
+_expiry_lock_file = None
+
+class SharedEventRelay:
+    """Shares product changes and auction events between worker processes.
+
+    Each gunicorn worker has its own snapshot cache, change tracker, event bus
+    and expiry scheduler. Changes are written to the shared database's events
+    table inside the transaction that made them, and auction events are
+    appended after the fact; a relay thread in every worker tails the table and
+    applies what it finds locally, using the row id as the shared version and
+    SSE event id.
+    """
+
+    def __init__(self, repository: SQLiteRepository, interval: float = EVENT_RELAY_INTERVAL_MS / 1000):
+        self.repository = repository
+        self.interval = interval
+        self.last_id = repository.last_event_id()
+        self._thread: Optional[threading.Thread] = None
+
+    def record_change(self, product_id: str):
+        """BidEngine transaction listener: the event commits with the change, the local version only after it"""
+        event_id = self.repository.append_event("product_changed", product_id, "{}")
+        self.repository.after_commit(functools.partial(change_tracker.record, product_id, event_id))
+
+    def publish(self, event: dict):
+        self.repository.append_event(event["type"], event.get("product_id"), json.dumps(event, default=str))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-relay", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        polls = 0
+        while True:
+            try:
+                self.poll()
+                polls += 1
+                if expiry_owner.is_set() and polls % 1200 == 0:
+                    self.repository.prune_events(EVENT_RETENTION)
+            except Exception as e:
+                logger.error(f"Error relaying shared events: {e}")
+            time.sleep(self.interval)
+
+    def poll(self) -> int:
+        rows = self.repository.events_after(self.last_id)
+        for event_id, event_type, product_id, payload in rows:
+            if event_type == "product_changed":
+                auction_snapshots.invalidate(product_id)
+                voice_summary.invalidate(product_id)
+                search_index.invalidate(product_id)
+                change_tracker.record(product_id, event_id)
+                if expiry_owner.is_set():
+                    product = self.repository.get_product(product_id, with_history=False)
+                    if product is not None and product["status"] == "active":
+                        expiry_scheduler.schedule(product_id, product["auction_end_time"])
+            else:
+                event_bus.publish(json.loads(payload), event_id=event_id)
+            self.last_id = event_id
+        return len(rows)
+
+def schedule_active_auctions():
+    for product_id in repository.find_products(status="active"):
+        product = repository.get_product(product_id, with_history=False)
+        expiry_scheduler.schedule(product_id, product["auction_end_time"])
+
+def elect_expiry_owner(lock_path: str, retry_seconds: float = 5.0):
+    """Run the expiry scheduler in whichever worker holds an exclusive lock on ``lock_path``.
+
+    The OS drops the lock when its holder exits, so a surviving worker takes
+    over within ``retry_seconds``.
+    """
+    global _expiry_lock_file
+    lock_file = open(lock_path, "a")
+    while True:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except OSError:
+            time.sleep(retry_seconds)
+    # Keep the handle referenced for the life of the process; closing it releases the lock
+    _expiry_lock_file = lock_file
+    expiry_owner.set()
+    schedule_active_auctions()
+    expiry_scheduler.start()
+    logger.info(f"Worker {os.getpid()} owns auction expiry")
+
+def gevent_patched() -> bool:
+    """True when a gevent worker has monkey-patched threading in this process"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+if gevent_patched() and (repository.backend == "sqlite" or bid_log is not None):
+    logger.warning("Running under a gevent worker with blocking storage: SQLite queries and bid log fsyncs "
+                   "stall the event loop, and each greenlet opens its own SQLite connection. "
+                   "Run gunicorn with -k gthread instead.")
+
+shared_events: Optional[SharedEventRelay] = None
+if repository.backend == "sqlite":
+    shared_events = SharedEventRelay(repository)
+    for product_id in repository.product_ids():
+        change_tracker.record(product_id, shared_events.last_id)
+    bid_engine.add_transaction_listener(shared_events.record_change)
+
+# Recover persisted state, then start background threads
+if bid_log is not None:
+    started = time.perf_counter()
+    replayed = recover_state(bid_log, bid_engine)
+    bid_log.start()
+    if replayed:
+        write_snapshot(bid_log, bid_engine)
+    bid_engine.journal = bid_log
+    threading.Thread(target=snapshot_loop, args=(bid_log, bid_engine, BIDLOG_SNAPSHOT_SECONDS),
+                     daemon=True).start()
+    logger.info(f"Recovered auction state from {AUCTION_DATA_DIR} ({replayed} log records) in {time.perf_counter() - started:.2f}s")
+
+if shared_events is not None:
+    shared_events.start()
+    threading.Thread(target=elect_expiry_owner, args=(EXPIRY_LOCK_PATH,), daemon=True).start()
+else:
+    expiry_owner.set()
+    schedule_active_auctions()
+    expiry_scheduler.start()
+webhook_dispatcher.start()
+notification_outbox.start()
+threading.Thread(target=session_reaper_loop, args=(SESSION_REAP_INTERVAL_SECONDS,), daemon=True).start()
 
 if __name__ == '__main__':
     logger.info("Starting Voice Auction Backend Server...")
-    logger.info(f"Total auction products loaded: {len(auction_data['products'])}")
+    logger.info(f"Total auction products loaded: {len(repository.product_ids())} ({repository.backend} storage)")
     logger.info(f"OmniDimension webhook URL: {'Configured' if OMNIDIMENSION_WEBHOOK_URL else 'Not configured'}")
     
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,143 @@
+"""GET /api/auctions latency: cached snapshots versus the original rebuild path.
+
+Loads a catalogue of N products with M bids each and measures p50/p99 latency
+of the endpoint, both for building the payload and end to end through the
+Flask test client. The legacy path below is the pre-cache implementation.
+
+Usage: python benchmarks/bench_auction_snapshots.py [--products 1000] [--bids 1000] [--runs 20]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import app  # noqa: E402
+from flask import jsonify  # noqa: E402
+
+
+def legacy_products(current_time):
+    products_with_time = {}
+    for product_id, product in app.auction_data["products"].items():
+        product_copy = product.copy()
+        product_copy["category"] = product["category"].title()
+        time_remaining = product["auction_end_time"] - current_time
+        if time_remaining.total_seconds() > 0 and product["status"] == "active":
+            minutes_remaining = max(0, int(time_remaining.total_seconds() / 60))
+            seconds_remaining = max(0, int(time_remaining.total_seconds() % 60))
+            product_copy["time_remaining_minutes"] = minutes_remaining
+            product_copy["time_remaining_seconds"] = seconds_remaining
+            product_copy["time_remaining_text"] = f"{minutes_remaining} minutes and {seconds_remaining} seconds"
+            if minutes_remaining < 5:
+                product_copy["urgency"] = "high"
+            elif minutes_remaining < 15:
+                product_copy["urgency"] = "medium"
+            else:
+                product_copy["urgency"] = "low"
+        else:
+            product_copy["time_remaining_minutes"] = 0
+            product_copy["time_remaining_seconds"] = 0
+            product_copy["time_remaining_text"] = "Auction ended"
+            product_copy["status"] = "ended"
+            product_copy["urgency"] = "none"
+        product_copy["auction_end_time"] = product["auction_end_time"].isoformat()
+        bidding_history_copy = []
+        for bid in product_copy["bidding_history"]:
+            bid_copy = bid.copy()
+            bid_copy["timestamp"] = bid["timestamp"].isoformat()
+            bidding_history_copy.append(bid_copy)
+        product_copy["bidding_history"] = bidding_history_copy
+        products_with_time[product_id] = product_copy
+    return products_with_time
+
+
+def cached_products(current_time):
+    products_with_time = {}
+    for product_id, product in app.auction_data["products"].items():
+        product_copy = dict(app.auction_snapshots.get(product_id))
+        product_copy["category"] = product["category"].title()
+        product_copy.update(app.time_remaining_fields(product, current_time))
+        products_with_time[product_id] = product_copy
+    return products_with_time
+
+
+def legacy_endpoint():
+    products_with_time = legacy_products(datetime.now())
+    return jsonify({
+        "success": True,
+        "products": products_with_time,
+        "total_products": len(products_with_time),
+        "active_products": len([p for p in products_with_time.values() if p["status"] == "active"])
+    })
+
+
+def load_catalogue(products, bids):
+    app.auction_data["products"].clear()
+    now = datetime.now()
+    for n in range(products):
+        history = [{
+            "bid_id": str(uuid.uuid4()),
+            "bidder_id": f"user_{i % 50}",
+            "amount": 100.0 + i * 50,
+            "timestamp": now - timedelta(seconds=bids - i)
+        } for i in range(bids)]
+        app.auction_data["products"][f"lot_{n}"] = {
+            "id": f"lot_{n}",
+            "name": f"Lot {n}",
+            "description": "Benchmark lot",
+            "starting_price": 100.0,
+            "current_highest_bid": history[-1]["amount"] if history else 100.0,
+            "highest_bidder": history[-1]["bidder_id"] if history else None,
+            "auction_end_time": now + timedelta(minutes=n % 60 + 1),
+            "bidding_history": history,
+            "total_bids": bids,
+            "status": "active",
+            "category": "bench",
+            "image_url": ""
+        }
+
+
+def measure(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--bids", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    app.logger.setLevel("WARNING")
+    load_catalogue(args.products, args.bids)
+    cached_products(datetime.now())  # warm the cache
+    client = app.app.test_client()
+
+    print(f"{args.products} products x {args.bids} bids, {args.runs} runs (ms)")
+    print(f"{'path':<28} {'p50':>10} {'p99':>10}")
+    for label, fn in [
+        ("legacy build", lambda: legacy_products(datetime.now())),
+        ("cached build", lambda: cached_products(datetime.now())),
+    ]:
+        p50, p99 = measure(fn, args.runs)
+        print(f"{label:<28} {p50:>10.1f} {p99:>10.1f}")
+
+    with app.app.test_request_context("/api/auctions"):
+        p50, p99 = measure(legacy_endpoint, args.runs)
+    print(f"{'legacy endpoint':<28} {p50:>10.1f} {p99:>10.1f}")
+    p50, p99 = measure(lambda: client.get("/api/auctions"), args.runs)
+    print(f"{'cached endpoint':<28} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
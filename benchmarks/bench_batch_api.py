@@ -0,0 +1,97 @@
+"""Batch endpoints versus single-item calls through the Flask test client.
+
+Places N bids round-robin over the seeded active lots, first one POST
+/api/auctions/<id>/bid per bid and then in POST /api/bids:batch requests of
+--batch-size items, and does the same for reads with GET /api/auctions/<id>
+versus GET /api/auctions:batch?ids=. Every bid is valid, so both paths do the
+same engine work and the difference is per-request overhead. With
+--backend sqlite the batch also shares one write transaction.
+
+Usage: python benchmarks/bench_batch_api.py [--bids 5000] [--batch-size 50] [--backend memory|sqlite]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def bid_stream(lots, count, start):
+    """``count`` valid bids round-robin over ``lots`` (id -> opening amount), each 100 above the lot's last one"""
+    ids = list(lots)
+    return [{"product_id": ids[i % len(ids)], "bidder_id": f"bidder_{i % 7}",
+             "amount": lots[ids[i % len(ids)]] + 100 * (start + i // len(ids) + 1)} for i in range(count)]
+
+
+def timed(label, operations, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24} {elapsed:>8.2f} s {operations / elapsed:>12.0f} ops/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bids", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["STORAGE_BACKEND"] = args.backend
+    os.environ["SQLITE_PATH"] = os.path.join(workdir.name, "bench.db")
+    os.environ["WEBHOOK_DEAD_LETTER_PATH"] = os.path.join(workdir.name, "dead_letters.jsonl")
+    import app
+
+    app.logger.setLevel("WARNING")
+    app.OMNIDIMENSION_WEBHOOK_URL = ""
+    client = app.app.test_client()
+
+    lots = {}
+    for product_id in app.repository.product_ids():
+        product = app.repository.get_product(product_id, with_history=False)
+        if product["status"] == "active":
+            lots[product_id] = product["current_highest_bid"]
+    per_lot = args.bids // len(lots)
+    single_bids = bid_stream(lots, per_lot * len(lots), 0)
+    batched_bids = bid_stream(lots, per_lot * len(lots), per_lot)
+    ids = list(lots)
+
+    def place_single():
+        for bid in single_bids:
+            response = client.post(f"/api/auctions/{bid['product_id']}/bid", json=bid)
+            assert response.status_code == 200, response.get_json()
+
+    def place_batched():
+        for start in range(0, len(batched_bids), args.batch_size):
+            response = client.post("/api/bids:batch", json={"bids": batched_bids[start:start + args.batch_size]})
+            assert response.get_json()["rejected"] == 0, response.get_json()
+
+    reads = len(single_bids)
+
+    def read_single():
+        for i in range(reads):
+            client.get(f"/api/auctions/{ids[i % len(ids)]}?summary=true")
+
+    def read_batched():
+        # Duplicate ids are collapsed, so each request reads every lot once
+        chunk = ",".join(ids[:args.batch_size])
+        for _ in range(0, reads, min(args.batch_size, len(ids))):
+            client.get(f"/api/auctions:batch?ids={chunk}&summary=true")
+
+    print(f"{args.backend} backend, {len(single_bids)} operations per path, batch size {args.batch_size}")
+    single = timed("single bids", len(single_bids), place_single)
+    batched = timed("batched bids", len(batched_bids), place_batched)
+    print(f"{'bid speedup':<24} {single / batched:>8.1f}x")
+    single = timed("single reads", reads, read_single)
+    batched = timed("batched reads", reads, read_batched)
+    print(f"{'read speedup':<24} {single / batched:>8.1f}x")
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Multithreaded stress benchmark for BidEngine.
+
+Hammers the engine from many threads across a configurable number of hot lots,
+then checks that every accepted bid is present exactly once in the product and
+user histories and that each lot's history is strictly increasing by at least
+the minimum increment. Reports accepted bids per second.
+
+Usage: python benchmarks/bench_bid_engine.py [--threads 16] [--bids 2000] [--lots 1 4 16]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import BidEngine, BidRejected, InMemoryRepository, MINIMUM_BID_INCREMENT  # noqa: E402
+
+
+def make_data(lots):
+    products = {}
+    for i in range(lots):
+        product_id = f"lot_{i}"
+        products[product_id] = {
+            "id": product_id,
+            "name": f"Lot {i}",
+            "description": "",
+            "starting_price": 100.0,
+            "current_highest_bid": 100.0,
+            "highest_bidder": None,
+            "auction_end_time": datetime.now() + timedelta(hours=1),
+            "bidding_history": [],
+            "total_bids": 0,
+            "status": "active",
+            "category": "bench",
+            "image_url": ""
+        }
+    return {"products": products, "users": {}}
+
+
+def run(threads, bids_per_thread, lots):
+    data = make_data(lots)
+    engine = BidEngine(InMemoryRepository(data, {}))
+    product_ids = list(data["products"])
+    accepted = [0] * threads
+    rejected = [0] * threads
+    start_barrier = threading.Barrier(threads + 1)
+
+    def worker(n):
+        bidder_id = f"bidder_{n}"
+        start_barrier.wait()
+        for i in range(bids_per_thread):
+            product_id = product_ids[(n + i) % len(product_ids)]
+            # Read without the lock on purpose: racing readers must not be able to
+            # sneak a stale bid through validation.
+            amount = data["products"][product_id]["current_highest_bid"] + MINIMUM_BID_INCREMENT
+            try:
+                engine.place_bid(product_id, bidder_id, amount)
+                accepted[n] += 1
+            except BidRejected:
+                rejected[n] += 1
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    total_accepted = sum(accepted)
+    product_bids = sum(p["total_bids"] for p in data["products"].values())
+    history_bids = sum(len(p["bidding_history"]) for p in data["products"].values())
+    user_bids = sum(len(u["bidding_history"]) for u in data["users"].values())
+    assert total_accepted == product_bids == history_bids == user_bids, (
+        total_accepted, product_bids, history_bids, user_bids)
+
+    for product in data["products"].values():
+        amounts = [bid["amount"] for bid in product["bidding_history"]]
+        for previous, current in zip(amounts, amounts[1:]):
+            assert current - previous >= MINIMUM_BID_INCREMENT, (product["id"], previous, current)
+        if amounts:
+            assert product["current_highest_bid"] == amounts[-1]
+            assert product["highest_bidder"] == product["bidding_history"][-1]["bidder_id"]
+
+    return total_accepted, sum(rejected), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--bids", type=int, default=2000, help="bid attempts per thread")
+    parser.add_argument("--lots", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    print(f"{'lots':>6} {'accepted':>10} {'rejected':>10} {'seconds':>9} {'accepted/s':>12}")
+    for lots in args.lots:
+        accepted, rejected, elapsed = run(args.threads, args.bids, lots)
+        print(f"{lots:>6} {accepted:>10} {rejected:>10} {elapsed:>9.3f} {accepted / elapsed:>12.0f}")
+    print("OK: no lost or out-of-order bids")
+
+
+if __name__ == "__main__":
+    main()
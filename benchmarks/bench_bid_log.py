@@ -0,0 +1,131 @@
+"""Durable bid log benchmark: group-commit throughput and recovery time.
+
+Part 1 runs the multithreaded bid workload against a BidEngine journaling to a
+BidLog in a temporary directory, once per group-commit interval, with callers
+waiting for durability. Part 2 writes a log of N bid records and times a cold
+recovery (snapshot-less replay) from it.
+
+Usage: python benchmarks/bench_bid_log.py [--threads 16] [--bids 500]
+                                           [--intervals 0 1 5 20] [--recovery-entries 10000000]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import BidEngine, BidLog, BidRejected, InMemoryRepository, MINIMUM_BID_INCREMENT, recover_state  # noqa: E402
+
+
+def make_data(lots):
+    products = {}
+    for i in range(lots):
+        product_id = f"lot_{i}"
+        products[product_id] = {
+            "id": product_id,
+            "name": f"Lot {i}",
+            "description": "",
+            "starting_price": 100.0,
+            "current_highest_bid": 100.0,
+            "highest_bidder": None,
+            "auction_end_time": datetime.now() + timedelta(days=1),
+            "bidding_history": [],
+            "total_bids": 0,
+            "status": "active",
+            "category": "bench",
+            "image_url": ""
+        }
+    return {"products": products, "users": {}}
+
+
+def throughput(directory, interval_ms, threads, bids_per_thread, lots):
+    data = make_data(lots)
+    engine = BidEngine(InMemoryRepository(data, {}))
+    log = BidLog(directory, commit_interval=interval_ms / 1000, sync_commit=True)
+    log.start()
+    engine.journal = log
+    product_ids = list(data["products"])
+    accepted = [0] * threads
+
+    def worker(n):
+        for i in range(bids_per_thread):
+            product_id = product_ids[(n + i) % len(product_ids)]
+            amount = data["products"][product_id]["current_highest_bid"] + MINIMUM_BID_INCREMENT
+            try:
+                engine.place_bid(product_id, f"bidder_{n}", amount)
+                accepted[n] += 1
+            except BidRejected:
+                pass
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return sum(accepted), elapsed, log.stats()["groups_committed"]
+
+
+def write_log(directory, entries, lots):
+    now = datetime.now().isoformat()
+    amounts = [100.0] * lots
+    with open(os.path.join(directory, "bids-000001.log"), "w", encoding="utf-8") as f:
+        chunk = []
+        for n in range(entries):
+            lot = n % lots
+            amounts[lot] += MINIMUM_BID_INCREMENT
+            chunk.append(json.dumps({
+                "type": "bid",
+                "product_id": f"lot_{lot}",
+                "bid_id": n,
+                "bidder_id": f"bidder_{n % 1000}",
+                "amount": amounts[lot],
+                "timestamp": now
+            }, separators=(",", ":")) + "\n")
+            if len(chunk) == 100000:
+                f.write("".join(chunk))
+                chunk = []
+        f.write("".join(chunk))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--bids", type=int, default=500, help="bid attempts per thread")
+    parser.add_argument("--lots", type=int, default=64)
+    parser.add_argument("--intervals", type=float, nargs="+", default=[0, 1, 5, 20], help="group commit intervals (ms)")
+    parser.add_argument("--recovery-entries", type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    print(f"{'interval ms':>12} {'accepted':>10} {'groups':>8} {'bids/group':>11} {'accepted/s':>12}")
+    for interval in args.intervals:
+        directory = tempfile.mkdtemp(prefix="bidlog-")
+        try:
+            accepted, elapsed, groups = throughput(directory, interval, args.threads, args.bids, args.lots)
+        finally:
+            shutil.rmtree(directory)
+        print(f"{interval:>12g} {accepted:>10} {groups:>8} {accepted / max(groups, 1):>11.1f} {accepted / elapsed:>12.0f}")
+
+    directory = tempfile.mkdtemp(prefix="bidlog-")
+    try:
+        write_log(directory, args.recovery_entries, args.lots)
+        size = os.path.getsize(os.path.join(directory, "bids-000001.log"))
+        data = make_data(args.lots)
+        started = time.perf_counter()
+        replayed = recover_state(BidLog(directory), BidEngine(InMemoryRepository(data, {})))
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(directory)
+    print(f"recovery: {replayed} records ({size / 1e6:.0f} MB) in {elapsed:.1f} s, {replayed / elapsed:.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
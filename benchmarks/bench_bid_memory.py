@@ -0,0 +1,140 @@
+"""Memory per stored bid: the original dict histories versus the columnar BidStore.
+
+Each variant runs in a fresh subprocess that creates the lots and bidders,
+records N bids across them and reports the growth in resident set size per
+bid. "legacy" builds the original representation: a dict per bid in the
+product's bidding_history (uuid4 string id, datetime) plus a copy in the
+bidder's history (product name, ISO timestamp string) and its active_bids
+list entry. "compact" records the same bids through
+InMemoryRepository.record_bid, so both sides include the active-bid index.
+Reads RSS from /proc, so it needs Linux.
+
+Usage: python benchmarks/bench_bid_memory.py [--bids 1000000 10000000] [--lots 1000] [--bidders 100000]
+"""
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def make_data(lots):
+    products = {}
+    for i in range(lots):
+        product_id = f"lot_{i}"
+        products[product_id] = {
+            "id": product_id,
+            "name": f"Lot {i}",
+            "description": "",
+            "starting_price": 100.0,
+            "current_highest_bid": 100.0,
+            "highest_bidder": None,
+            "auction_end_time": datetime.now() + timedelta(days=1),
+            "bidding_history": [],
+            "total_bids": 0,
+            "status": "active",
+            "category": "bench",
+            "image_url": ""
+        }
+    return {"products": products, "users": {}}
+
+
+def fill_legacy(bids, lots, bidders):
+    data = make_data(lots)
+    products = list(data["products"].values())
+    for n in range(bidders):
+        data["users"][f"bidder_{n}"] = {"id": f"bidder_{n}", "bidding_history": [], "active_bids": []}
+    users = list(data["users"].values())
+    gc.collect()
+    before = rss_bytes()
+    base = datetime.now()
+    for i in range(bids):
+        product = products[i % lots]
+        user = users[i % bidders]
+        timestamp = base + timedelta(microseconds=i)
+        product["bidding_history"].append({
+            "bid_id": str(uuid.uuid4()),
+            "bidder_id": user["id"],
+            "amount": 100.0 + i,
+            "timestamp": timestamp
+        })
+        user["bidding_history"].append({
+            "product_id": product["id"],
+            "product_name": product["name"],
+            "amount": 100.0 + i,
+            "timestamp": timestamp.isoformat(),
+            "status": "winning"
+        })
+        user["active_bids"] = [bid for bid in user["active_bids"] if bid["product_id"] != product["id"]]
+        user["active_bids"].append({
+            "product_id": product["id"],
+            "product_name": product["name"],
+            "amount": 100.0 + i,
+            "status": "winning"
+        })
+    gc.collect()
+    return rss_bytes() - before
+
+
+def fill_compact(bids, lots, bidders):
+    from app import InMemoryRepository
+
+    repository = InMemoryRepository(make_data(lots), {})
+    products = [repository.get_product(product_id) for product_id in repository.product_ids()]
+    bidder_ids = [f"bidder_{n}" for n in range(bidders)]
+    for bidder_id in bidder_ids:
+        repository.ensure_user(bidder_id)
+    gc.collect()
+    before = rss_bytes()
+    base = datetime.now()
+    for i in range(bids):
+        repository.record_bid(products[i % lots], {
+            "bid_id": None,
+            "bidder_id": bidder_ids[i % bidders],
+            "amount": 100.0 + i,
+            "timestamp": base + timedelta(microseconds=i)
+        })
+    gc.collect()
+    return rss_bytes() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bids", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--lots", type=int, default=1000)
+    parser.add_argument("--bidders", type=int, default=100_000)
+    parser.add_argument("--child", choices=["legacy", "compact"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        fill = fill_legacy if args.child == "legacy" else fill_compact
+        print(fill(args.bids[0], args.lots, args.bidders))
+        return
+
+    print(f"{'bids':>12} {'legacy B/bid':>14} {'compact B/bid':>14} {'ratio':>7}")
+    for bids in args.bids:
+        per_bid = {}
+        for variant in ("legacy", "compact"):
+            child = subprocess.run(
+                [sys.executable, __file__, "--child", variant, "--bids", str(bids),
+                 "--lots", str(args.lots), "--bidders", str(args.bidders)],
+                capture_output=True, text=True)
+            per_bid[variant] = int(child.stdout) / bids if child.returncode == 0 else None
+        legacy, compact = per_bid["legacy"], per_bid["compact"]
+        print(f"{bids:>12} {legacy if legacy is not None else float('nan'):>14.1f} "
+              f"{compact if compact is not None else float('nan'):>14.1f} "
+              f"{legacy / compact if legacy and compact else float('nan'):>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
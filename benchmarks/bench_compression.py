@@ -0,0 +1,120 @@
+"""Bytes sent and time per request for static assets and compressed API responses.
+
+Static: serves the largest JavaScript file of the React build (or a
+generated 300 KB bundle when there is no build) the old way, with
+os.path.exists and send_from_directory on every request, and through
+StaticAssets with its precomputed variants. API: loads N lots with B bids each and fetches
+/api/auctions in full and as a summary through the Flask test client with
+Accept-Encoding identity, gzip and, if the brotli module is installed, br.
+
+Usage: python benchmarks/bench_compression.py [--lots 2000] [--bids-per-lot 20] [--runs 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def p50_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def static_root(workdir):
+    """The React build if present, else a directory holding a synthetic hashed bundle"""
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "build")
+    if os.path.isdir(root):
+        return root
+    root = os.path.join(workdir, "build")
+    os.makedirs(os.path.join(root, "static", "js"))
+    with open(os.path.join(root, "index.html"), "w") as f:
+        f.write("<!doctype html><div id=root></div>")
+    with open(os.path.join(root, "static", "js", "main.0123abcd.js"), "w") as f:
+        f.write("".join(f"function component{n}(props){{return props.value*{n}+'{n}';}}\n" for n in range(5000)))
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lots", type=int, default=2000)
+    parser.add_argument("--bids-per-lot", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.TemporaryDirectory()
+    os.environ["STATIC_ROOT"] = static_root(workdir.name)
+    os.environ["STORAGE_BACKEND"] = "memory"
+    import app
+    from flask import send_from_directory
+
+    app.logger.setLevel("WARNING")
+    root = app.STATIC_ROOT
+    largest = max(((os.path.relpath(os.path.join(d, name), root).replace(os.sep, "/"),
+                    os.path.getsize(os.path.join(d, name)))
+                   for d, _, names in os.walk(root) for name in names
+                   if name.endswith(".js")), key=lambda item: item[1])[0]
+    encodings = ["identity", "gzip"] + (["br"] if app.brotli is not None else [])
+
+    print(f"static asset {largest}")
+    print(f"{'path':<28} {'encoding':<10} {'bytes':>10} {'p50 ms':>10}")
+
+    def legacy():
+        if os.path.exists(os.path.join(root, largest)):
+            response = send_from_directory(root, largest)
+        else:
+            response = send_from_directory(root, "index.html")
+        response.direct_passthrough = False
+        return response.get_data()
+
+    with app.app.test_request_context(f"/{largest}"):
+        size = len(legacy())
+        print(f"{'send_from_directory':<28} {'identity':<10} {size:>10} {p50_ms(legacy, args.runs):>10.3f}")
+    for encoding in encodings:
+        with app.app.test_request_context(f"/{largest}", headers={"Accept-Encoding": encoding}):
+            size = len(app.static_assets.response(largest).get_data())
+            ms = p50_ms(lambda: app.static_assets.response(largest).get_data(), args.runs)
+            print(f"{'StaticAssets':<28} {encoding:<10} {size:>10} {ms:>10.3f}")
+
+    now = datetime.now()
+    for n in range(args.lots):
+        app.repository.put_product({
+            "id": f"lot_{n}",
+            "name": f"Lot {n}",
+            "description": f"Benchmark lot number {n} with a short description",
+            "starting_price": 100.0,
+            "current_highest_bid": 100.0 + 10 * args.bids_per_lot,
+            "highest_bidder": f"bidder_{n % 500}",
+            "auction_end_time": now + timedelta(minutes=5 + n % 600),
+            "bidding_history": [{
+                "bid_id": f"bid_{n}_{i}",
+                "bidder_id": f"bidder_{(n + i) % 500}",
+                "amount": 110.0 + 10 * i,
+                "timestamp": now - timedelta(seconds=args.bids_per_lot - i)
+            } for i in range(args.bids_per_lot)],
+            "total_bids": args.bids_per_lot,
+            "status": "active",
+            "category": "bench",
+            "image_url": ""
+        })
+    client = app.app.test_client()
+    for path in ("/api/auctions?summary=true", "/api/auctions"):
+        for encoding in encodings:
+            headers = {"Accept-Encoding": encoding}
+            size = len(client.get(path, headers=headers).get_data())
+            ms = p50_ms(lambda: client.get(path, headers=headers), max(5, args.runs // 20))
+            print(f"{path:<28} {encoding:<10} {size:>10} {ms:>10.3f}")
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Expiry scheduler benchmark with 100k scheduled auctions.
+
+Schedules N deadlines spread over a short window, lets the scheduler fire them
+all and reports insert cost, scheduler CPU per wakeup and lateness percentiles
+(actual fire time minus deadline). For comparison it also times one pass of the
+old full-catalogue scan that ran every 30 seconds.
+
+Usage: python benchmarks/bench_expiry_scheduler.py [--auctions 100000] [--window 5]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import ExpiryScheduler  # noqa: E402
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--auctions", type=int, default=100000)
+    parser.add_argument("--window", type=float, default=5.0, help="seconds over which deadlines are spread")
+    args = parser.parse_args()
+
+    deadlines = {}
+    lateness = []
+    done = threading.Event()
+    cpu = {}
+
+    def on_expire(product_id):
+        lateness.append(time.time() - deadlines[product_id])
+        if len(lateness) == args.auctions:
+            cpu["scheduler"] = time.thread_time()
+            done.set()
+
+    scheduler = ExpiryScheduler(on_expire)
+    base = datetime.now() + timedelta(seconds=1)
+    end_times = {f"lot_{n}": base + timedelta(seconds=random.uniform(0, args.window)) for n in range(args.auctions)}
+
+    started = time.perf_counter()
+    for product_id, end_time in end_times.items():
+        deadlines[product_id] = end_time.timestamp()
+        scheduler.schedule(product_id, end_time)
+    insert_elapsed = time.perf_counter() - started
+
+    # Move a tenth of the deadlines, as soft-close extensions would
+    moved = list(end_times)[:: 10]
+    started = time.perf_counter()
+    for product_id in moved:
+        end_time = end_times[product_id] + timedelta(seconds=0.5)
+        deadlines[product_id] = end_time.timestamp()
+        scheduler.schedule(product_id, end_time)
+    reschedule_elapsed = time.perf_counter() - started
+
+    scheduler.start()
+    done.wait(args.window + 60)
+
+    lateness.sort()
+    print(f"auctions:              {args.auctions}")
+    print(f"schedule insert:       {insert_elapsed / args.auctions * 1e6:.2f} us/op")
+    print(f"reschedule:            {reschedule_elapsed / len(moved) * 1e6:.2f} us/op")
+    print(f"scheduler CPU/wakeup:  {cpu['scheduler'] / args.auctions * 1e6:.2f} us")
+    print(f"lateness p50:          {percentile(lateness, 0.50) * 1000:.3f} ms")
+    print(f"lateness p99:          {percentile(lateness, 0.99) * 1000:.3f} ms")
+    print(f"lateness p99.9:        {percentile(lateness, 0.999) * 1000:.3f} ms")
+    print(f"lateness max:          {lateness[-1] * 1000:.3f} ms")
+
+    catalogue = {product_id: {"status": "active", "auction_end_time": end_time}
+                 for product_id, end_time in end_times.items()}
+    started = time.perf_counter()
+    now = datetime.now()
+    for product in catalogue.values():
+        if product["status"] == "active" and now >= product["auction_end_time"]:
+            pass
+    print(f"legacy scan (1 pass):  {(time.perf_counter() - started) * 1000:.1f} ms, up to 30000 ms late")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Response encoding time per endpoint: stdlib json versus orjson, with and without cached fragments.
+
+Loads a large catalogue into the in-memory backend (N lots with B bids each,
+spread over U bidders, plus S voice sessions) and times GET requests through
+the Flask test client for each encoder. "cold" clears the auction snapshot
+cache before every request, so each lot's bidding history is encoded again;
+"cached" reuses the pre-encoded history fragments. Skips orjson if it is
+not installed.
+
+Usage: python benchmarks/bench_json_encoding.py [--lots 2000] [--bids-per-lot 50] [--users 5000] [--sessions 5000] [--runs 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def load_catalogue(app, lots, bids_per_lot, users, sessions):
+    now = datetime.now()
+    bidder_ids = [f"bidder_{n}" for n in range(users)]
+    for bidder_id in bidder_ids:
+        app.repository.ensure_user(bidder_id)
+    for n in range(lots):
+        app.repository.put_product({
+            "id": f"lot_{n}",
+            "name": f"Lot {n}",
+            "description": f"Benchmark lot number {n} with a short description",
+            "starting_price": 100.0,
+            "current_highest_bid": 100.0 + 10 * bids_per_lot,
+            "highest_bidder": bidder_ids[(n * bids_per_lot + bids_per_lot - 1) % users],
+            "auction_end_time": now + timedelta(minutes=5 + n % 600),
+            "bidding_history": [{
+                "bid_id": f"bid_{n}_{i}",
+                "bidder_id": bidder_ids[(n * bids_per_lot + i) % users],
+                "amount": 110.0 + 10 * i,
+                "timestamp": now - timedelta(seconds=bids_per_lot - i)
+            } for i in range(bids_per_lot)],
+            "total_bids": bids_per_lot,
+            "status": "active",
+            "category": "bench",
+            "image_url": ""
+        })
+    for n in range(sessions):
+        app.repository.put_session(f"session_{n}", {
+            "user_id": bidder_ids[n % users],
+            "phone_number": f"+1555{n:07d}",
+            "start_time": now,
+            "last_activity": now
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lots", type=int, default=2000)
+    parser.add_argument("--bids-per-lot", type=int, default=50)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["STORAGE_BACKEND"] = "memory"
+    os.environ.setdefault("SESSION_CAPACITY", str(max(10000, args.sessions)))
+    import app
+
+    app.logger.setLevel("WARNING")
+    load_catalogue(app, args.lots, args.bids_per_lot, args.users, args.sessions)
+    client = app.app.test_client()
+    endpoints = ["/api/auctions", "/api/auctions?summary=true", "/api/auctions/lot_0", "/api/users",
+                 "/api/users?summary=true", "/api/sessions"]
+    encoders = [("stdlib", False)] + ([("orjson", True)] if app.orjson is not None else [])
+    print(f"{args.lots} lots x {args.bids_per_lot} bids, {args.users} users, {args.sessions} sessions; p50 ms")
+    print(f"{'endpoint':<28} {'bytes':>10}" + "".join(f" {f'{name} {mode}':>15}"
+                                                  for name, _ in encoders for mode in ("cold", "cached")))
+
+    for endpoint in endpoints:
+        timings, size = [], 0
+        for _, use_orjson in encoders:
+            app.app.json = app.FastJSONProvider(app.app, use_orjson=use_orjson)
+            for cold in (True, False):
+                samples = []
+                for _ in range(args.runs + 1):
+                    if cold:
+                        app.auction_snapshots._entries.clear()
+                        app.auction_snapshots._summaries.clear()
+                    started = time.perf_counter()
+                    response = client.get(endpoint)
+                    samples.append(time.perf_counter() - started)
+                    assert response.status_code == 200, endpoint
+                    size = len(response.get_data())
+                # The first cached request fills the cache
+                samples = sorted(samples[1:])
+                timings.append(samples[len(samples) // 2] * 1000)
+        print(f"{endpoint:<28} {size:>10}" + "".join(f" {ms:>15.1f}" for ms in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Filtered product listings: secondary indexes versus a scan of the catalogue.
+
+Loads N lots spread over categories, statuses and end times into each
+storage backend and times find_products for status, category and
+ending-soon filters against the scan the read handlers used to do: load
+every product and test it. Reports p50 latency and the number of matches.
+
+Usage: python benchmarks/bench_listing_filters.py [--lots 50000] [--runs 50] [--backend memory sqlite]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import InMemoryRepository, SQLiteRepository  # noqa: E402
+
+CATEGORIES = ["watches", "vehicles", "art", "music", "cameras", "jewelry", "books", "furniture", "coins", "wine"]
+
+
+def make_data(lots, now, rng):
+    products = {}
+    for n in range(lots):
+        product_id = f"lot_{n}"
+        products[product_id] = {
+            "id": product_id,
+            "name": f"Lot {n}",
+            "description": "",
+            "starting_price": 100.0,
+            "current_highest_bid": 100.0,
+            "highest_bidder": None,
+            "auction_end_time": now + timedelta(seconds=rng.randint(-3600, 86400)),
+            "bidding_history": [],
+            "total_bids": 0,
+            "status": "active" if rng.random() < 0.7 else "ended",
+            "category": CATEGORIES[n % len(CATEGORIES)],
+            "image_url": ""
+        }
+    return {"products": products, "users": {}}
+
+
+def scan(repository, status=None, category=None, ends_after=None, ends_before=None):
+    matches = []
+    for product_id in repository.product_ids():
+        product = repository.get_product(product_id, with_history=False)
+        if ((status is None or product["status"] == status)
+                and (category is None or product["category"] == category)
+                and (ends_after is None or product["auction_end_time"] >= ends_after)
+                and (ends_before is None or product["auction_end_time"] <= ends_before)):
+            matches.append((product["auction_end_time"], product_id))
+    matches.sort()
+    return [product_id for _, product_id in matches]
+
+
+def p50(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lots", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--backend", nargs="+", choices=["memory", "sqlite"], default=["memory", "sqlite"])
+    args = parser.parse_args()
+
+    now = datetime.now()
+    cases = [
+        ("status=active", {"status": "active"}),
+        ("category=watches", {"category": "watches"}),
+        ("active, ending in 300 s", {"status": "active", "ends_after": now, "ends_before": now + timedelta(seconds=300)}),
+        ("watches, active, 1 h", {"status": "active", "category": "watches", "ends_after": now,
+                                  "ends_before": now + timedelta(hours=1)}),
+    ]
+    workdir = tempfile.TemporaryDirectory()
+    for backend in args.backend:
+        data = make_data(args.lots, now, random.Random(11))
+        if backend == "memory":
+            repository = InMemoryRepository(data, {})
+        else:
+            repository = SQLiteRepository(os.path.join(workdir.name, "bench.db"), seed=data)
+        print(f"{backend} backend, {args.lots} lots")
+        print(f"{'filter':<26} {'scan ms':>10} {'index ms':>10} {'speedup':>8} {'matches':>8}")
+        for label, filters in cases:
+            scan_ms, expected = p50(lambda: scan(repository, **filters), max(1, args.runs // 10))
+            index_ms, found = p50(lambda: repository.find_products(**filters), args.runs)
+            assert found == expected, label
+            print(f"{label:<26} {scan_ms:>10.2f} {index_ms:>10.3f} {scan_ms / index_ms:>7.0f}x {len(found):>8}")
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
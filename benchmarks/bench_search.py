@@ -0,0 +1,150 @@
+"""Search index latency over a synthetic catalogue.
+
+Builds a catalogue of N lots whose names and descriptions are drawn from
+word lists, indexes it with SearchIndex and reports the build time and the
+p50/p99 latency of exact, prefix, typo, multi-word, filtered and facet-only
+queries. The headline figures are cold: distinct queries with the index's
+query caches disabled, so every one scores, filters and counts facets from
+the postings. The cached figures repeat the same queries with the caches on.
+Last come the cost of re-indexing a burst of bids and of a burst of lots
+ending, and of the next query.
+
+Usage: python benchmarks/bench_search.py [--lots 100000] [--runs 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import InMemoryRepository, SearchIndex  # noqa: E402
+
+BRANDS = ["Rolex", "Omega", "Patek", "Cartier", "Ford", "Porsche", "Ferrari", "Gibson", "Fender", "Leica",
+          "Hermes", "Tiffany", "Steinway", "Eames", "Chanel", "Breitling", "Jaguar", "Nikon", "Martin", "Bugatti"]
+ADJECTIVES = ["Vintage", "Rare", "Restored", "Original", "Limited", "Antique", "Signed", "Classic", "Mint",
+              "Custom", "Handmade", "Gold", "Silver", "Early", "Prototype"]
+NOUNS = {
+    "watches": ["Submariner", "Speedmaster", "Chronograph", "Diver", "Pocket Watch", "Tank"],
+    "vehicles": ["Fastback", "Roadster", "Coupe", "Convertible", "Motorcycle", "Sedan"],
+    "art": ["Sketch", "Painting", "Lithograph", "Sculpture", "Etching", "Portrait"],
+    "music": ["Guitar", "Piano", "Amplifier", "Violin", "Synthesizer", "Drum Kit"],
+    "cameras": ["Rangefinder", "Lens", "Camera", "Projector", "Viewfinder", "Tripod"],
+    "jewelry": ["Necklace", "Bracelet", "Ring", "Brooch", "Earrings", "Tiara"],
+}
+DESCRIPTIONS = ["in excellent condition", "with original box and papers", "fully serviced", "with provenance",
+                "from a private collection", "museum quality", "numbered edition", "single owner"]
+
+CATEGORY_STATUS = [(category, status) for category in NOUNS for status in (None, "active", "ended")]
+
+
+def make_queries(rng):
+    """Distinct queries of each kind, drawn from the catalogue's own vocabulary"""
+    nouns = {noun.lower() for names in NOUNS.values() for name in names for noun in name.split()}
+    words = sorted({word.lower() for word in BRANDS + ADJECTIVES} | nouns)
+    typos = set()
+    for word in words:
+        if len(word) >= 5:
+            for i in range(1, len(word) - 1):
+                typos.add(word[:i] + word[i + 1:])
+    multi_word = {f"{rng.choice(ADJECTIVES)} {rng.choice(BRANDS)} {rng.choice(NOUNS[category])}".lower()
+                  for category in NOUNS for _ in range(40)}
+    return {
+        "exact": [(word, {}) for word in words],
+        "prefix": [(prefix, {}) for prefix in sorted({word[:n] for word in words for n in (3, 4, 5)
+                                                      if n < len(word)} - set(words))],
+        "typo": [(typo, {}) for typo in sorted(typos - set(words))],
+        "multi-word": [(query, {}) for query in sorted(multi_word)],
+        "filtered": [(brand.lower(), {"category": category, "status": status})
+                     for brand in BRANDS for category, status in CATEGORY_STATUS],
+        "facets only": [("", {"category": category, "status": status}) for category, status in CATEGORY_STATUS]
+    }
+
+
+def make_data(lots, rng):
+    products = {}
+    categories = list(NOUNS)
+    for n in range(lots):
+        category = categories[n % len(categories)]
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(BRANDS)} {rng.choice(NOUNS[category])} {1900 + n % 120}"
+        products[f"lot_{n}"] = {
+            "id": f"lot_{n}",
+            "name": name,
+            "description": f"{name} {rng.choice(DESCRIPTIONS)}, lot {n}",
+            "starting_price": 100.0,
+            "current_highest_bid": 100.0,
+            "highest_bidder": None,
+            "auction_end_time": datetime.now() + timedelta(hours=1),
+            "bidding_history": [],
+            "total_bids": 0,
+            "status": "active" if n % 10 else "ended",
+            "category": category,
+            "image_url": ""
+        }
+    return {"products": products, "users": {}}
+
+
+def percentiles(samples):
+    samples.sort()
+    return samples[len(samples) // 2] * 1000, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lots", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    repository = InMemoryRepository(make_data(args.lots, rng), {})
+    started = time.perf_counter()
+    index = SearchIndex(repository)
+    print(f"indexed {args.lots} lots in {time.perf_counter() - started:.2f} s")
+
+    print(f"{'query kind':<16} {'queries':>8} {'cold p50':>10} {'cold p99':>10} "
+          f"{'cached p50':>11} {'cached p99':>11} {'mean matches':>13}   (ms)")
+    for kind, queries in make_queries(rng).items():
+        # Cold: the query caches hold nothing, so every query is answered from the postings
+        index.CACHED_QUERIES = 0
+        cold, matches = [], []
+        for i in range(max(args.runs, len(queries))):
+            query, filters = queries[i % len(queries)]
+            started = time.perf_counter()
+            matches.append(index.search(query, limit=10, **filters)["total"])
+            cold.append(time.perf_counter() - started)
+        del index.CACHED_QUERIES
+
+        # Cached: as many of the same queries as the caches hold, run once to fill them, then timed
+        repeated = queries[:SearchIndex.CACHED_QUERIES]
+        cached = []
+        for i in range(len(repeated) + args.runs):
+            query, filters = repeated[i % len(repeated)]
+            started = time.perf_counter()
+            index.search(query, limit=10, **filters)
+            if i >= len(repeated):
+                cached.append(time.perf_counter() - started)
+        cold_p50, cold_p99 = percentiles(cold)
+        cached_p50, cached_p99 = percentiles(cached)
+        print(f"{kind:<16} {len(queries):>8} {cold_p50:>10.3f} {cold_p99:>10.3f} "
+              f"{cached_p50:>11.3f} {cached_p99:>11.3f} {sum(matches) / len(matches):>13.0f}")
+
+    product_ids = repository.product_ids()
+    for label, status in (("1000 bids", None), ("1000 lots ending", "ended")):
+        changed = rng.sample(product_ids, 1000)
+        started = time.perf_counter()
+        for product_id in changed:
+            product = repository.get_product(product_id, with_history=False)
+            product["current_highest_bid"] += 10.0
+            product["status"] = status or product["status"]
+            repository.put_product(product)
+            index.invalidate(product_id)
+        per_change = (time.perf_counter() - started) / len(changed) * 1000
+        started = time.perf_counter()
+        index.search("rolex")
+        print(f"{label:<24} {per_change:>10.3f} ms each, next query {(time.perf_counter() - started) * 1000:.3f} ms")
+
+if __name__ == "__main__":
+    main()
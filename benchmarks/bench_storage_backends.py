@@ -0,0 +1,111 @@
+"""Compare the in-memory and SQLite storage backends.
+
+Runs the same multithreaded bid workload through a BidEngine on each backend,
+then measures read latency for a product with its bid history, a product
+without it, and a user record.
+
+Usage: python benchmarks/bench_storage_backends.py [--threads 8] [--bids 500] [--lots 64] [--reads 2000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app import (BidEngine, BidRejected, InMemoryRepository, MINIMUM_BID_INCREMENT,  # noqa: E402
+                 SQLiteRepository)
+
+
+def make_data(lots):
+    products = {}
+    for i in range(lots):
+        product_id = f"lot_{i}"
+        products[product_id] = {
+            "id": product_id,
+            "name": f"Lot {i}",
+            "description": "",
+            "starting_price": 100.0,
+            "current_highest_bid": 100.0,
+            "highest_bidder": None,
+            "auction_end_time": datetime.now() + timedelta(days=1),
+            "bidding_history": [],
+            "total_bids": 0,
+            "status": "active",
+            "category": "bench",
+            "image_url": ""
+        }
+    return {"products": products, "users": {}}
+
+
+def bid_throughput(engine, product_ids, threads, bids_per_thread):
+    accepted = [0] * threads
+
+    def worker(n):
+        for i in range(bids_per_thread):
+            product_id = product_ids[(n + i) % len(product_ids)]
+            amount = engine.repository.get_product(product_id, with_history=False)["current_highest_bid"]
+            try:
+                engine.place_bid(product_id, f"bidder_{n}", amount + MINIMUM_BID_INCREMENT)
+                accepted[n] += 1
+            except BidRejected:
+                pass
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return sum(accepted), time.perf_counter() - started
+
+
+def latency(fn, keys, reads):
+    samples = []
+    for _ in range(reads):
+        key = random.choice(keys)
+        started = time.perf_counter()
+        fn(key)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2] * 1e6, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--bids", type=int, default=500, help="bid attempts per thread")
+    parser.add_argument("--lots", type=int, default=64)
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="storage-bench-")
+    try:
+        backends = [
+            ("memory", InMemoryRepository(make_data(args.lots), {})),
+            ("sqlite", SQLiteRepository(os.path.join(directory, "bench.db"), seed=make_data(args.lots))),
+        ]
+        print(f"{'backend':<8} {'accepted/s':>11} {'product+history p50/p99 us':>28} "
+              f"{'product p50/p99 us':>20} {'user p50/p99 us':>18}")
+        for name, repository in backends:
+            engine = BidEngine(repository)
+            product_ids = repository.product_ids()
+            accepted, elapsed = bid_throughput(engine, product_ids, args.threads, args.bids)
+            user_ids = [f"bidder_{n}" for n in range(args.threads)]
+            full = latency(lambda key: repository.get_product(key), product_ids, args.reads)
+            row = latency(lambda key: repository.get_product(key, with_history=False), product_ids, args.reads)
+            user = latency(repository.get_user, user_ids, args.reads)
+            print(f"{name:<8} {accepted / elapsed:>11.0f} {full[0]:>13.0f} / {full[1]:<12.0f} "
+                  f"{row[0]:>9.0f} / {row[1]:<8.0f} {user[0]:>8.0f} / {user[1]:<8.0f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Webhook dispatcher benchmark against a local stub HTTP server.
+
+Starts a threaded stub endpoint on localhost, registers N voice sessions
+watching one lot and fires a bidding war of bid notifications for it through
+notify_voice_sessions. Reports how long the producer side took (what a bid
+request now waits for), how long the backlog took to drain, how many messages
+survived per-session coalescing and rate limiting, how many HTTP requests
+were sent (one per message, or one per endpoint batch with --envelope), and
+the dispatcher's own latency stats.
+
+With --failure-rate the stub answers that fraction of requests with a 503,
+which exercises retries, backoff and the circuit breaker; anything still
+undelivered ends up in a temporary dead-letter spool, which is then replayed
+against a healthy stub.
+
+Usage: python benchmarks/bench_webhook_dispatch.py [--sessions 500] [--events 20] [--delay-ms 5] [--failure-rate 0.3] [--envelope]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import app  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    received = 0
+    requests = 0
+    lock = threading.Lock()
+    failed = 0
+    delay = 0.0
+    failure_rate = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        count = len(body["messages"]) if "messages" in body else 1
+        time.sleep(self.delay)
+        if random.random() < self.failure_rate:
+            with StubHandler.lock:
+                StubHandler.failed += 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        with StubHandler.lock:
+            StubHandler.received += count
+            StubHandler.requests += 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="stub server latency per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests the stub fails with 503")
+    parser.add_argument("--envelope", action="store_true", help='post batches as {"messages": [...]}')
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay_ms / 1000
+    StubHandler.failure_rate = args.failure_rate
+    spool_dir = tempfile.TemporaryDirectory()
+    app.webhook_dispatcher.dead_letters.path = os.path.join(spool_dir.name, "dead_letters.jsonl")
+    app.webhook_dispatcher.backoff_base = 0.05
+    app.webhook_dispatcher.backoff_max = 1.0
+    app.webhook_dispatcher.breaker_cooldown = 1.0
+    app.webhook_dispatcher.envelope = args.envelope
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app.logger.setLevel("WARNING")
+    app.OMNIDIMENSION_WEBHOOK_URL = f"http://127.0.0.1:{server.server_port}/webhook"
+
+    for n in range(args.sessions):
+        app.repository.put_session(f"bench_{n}", {
+            "user_id": f"bench_user_{n}",
+            "phone_number": "",
+            "start_time": datetime.now(),
+            "last_activity": datetime.now()
+        })
+        app.repository.subscribe_session(f"bench_{n}", "prod_1")
+
+    started = time.perf_counter()
+    for n in range(args.events):
+        app.notify_voice_sessions({
+            "type": "new_bid",
+            "product_id": "prod_1",
+            "product_name": "Vintage Rolex Submariner",
+            "amount": 60000.0 + n * 50,
+            "bidder_id": "bench",
+            "previous_amount": 60000.0 + (n - 1) * 50
+        })
+    produced = time.perf_counter() - started
+    app.notification_outbox.flush(timeout=300)
+    drained = time.perf_counter() - started
+
+    expected = args.sessions * args.events
+    print(f"notifications:     {expected}")
+    print(f"enqueue time:      {produced * 1000:.1f} ms total, {produced / args.events * 1000:.2f} ms per event")
+    print(f"drain time:        {drained:.2f} s")
+    print(f"stub received:     {StubHandler.received} messages in {StubHandler.requests} requests"
+          f" ({StubHandler.failed} requests failed)")
+    print(f"outbox stats:      {json.dumps(app.notification_outbox.stats())}")
+    print(f"dispatcher stats:  {json.dumps(app.webhook_dispatcher.stats())}")
+
+    if app.webhook_dispatcher.dead_letters.count():
+        StubHandler.failure_rate = 0.0
+        for breaker in app.webhook_dispatcher._breakers.values():
+            breaker.record_success()
+        replayed = app.webhook_dispatcher.replay_dead_letters()
+        app.webhook_dispatcher.flush(timeout=300)
+        print(f"dead-letter replay: {json.dumps(replayed)}, stub now has {StubHandler.received} messages")
+    server.shutdown()
+    spool_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+os.environ.setdefault("OMNIDIMENSION_API_KEY", "test")
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.pop("AUCTION_DATA_DIR", None)
+os.environ.pop("OMNIDIMENSION_WEBHOOK_URL", None)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import app  # noqa: E402
+
+
+def make_catalogue(now=None):
+    """A small catalogue in the shape of app.auction_data, with fresh objects on every call"""
+    now = now or datetime.now()
+    return {
+        "products": {
+            "lot_1": {
+                "id": "lot_1",
+                "name": "Vintage Rolex Submariner",
+                "description": "Rare 1965 watch with original box",
+                "starting_price": 1000.0,
+                "current_highest_bid": 1000.0,
+                "highest_bidder": None,
+                "auction_end_time": now + timedelta(minutes=30),
+                "bidding_history": [],
+                "total_bids": 0,
+                "status": "active",
+                "category": "watches",
+                "image_url": ""
+            },
+            "lot_2": {
+                "id": "lot_2",
+                "name": "1967 Ford Mustang Fastback",
+                "description": "Fully restored classic car",
+                "starting_price": 20000.0,
+                "current_highest_bid": 21000.0,
+                "highest_bidder": "user_a",
+                "auction_end_time": now + timedelta(minutes=45),
+                "bidding_history": [{
+                    "bid_id": "bid_001",
+                    "bidder_id": "user_a",
+                    "amount": 21000.0,
+                    "timestamp": now - timedelta(minutes=5)
+                }],
+                "total_bids": 1,
+                "status": "active",
+                "category": "vehicles",
+                "image_url": ""
+            }
+        },
+        "users": {
+            "user_a": {
+                "id": "user_a",
+                "name": "User A",
+                "phone": "",
+                "bidding_history": [],
+                "total_spent": 0.0,
+                "active_bids": []
+            }
+        }
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    if request.param == "memory":
+        return app.InMemoryRepository(make_catalogue(), {})
+    return app.SQLiteRepository(str(tmp_path / "auction.db"), seed=make_catalogue())
+
+
+@pytest.fixture
+def engine(repository):
+    return app.BidEngine(repository)
+
+
+@pytest.fixture
+def client(repository, engine, monkeypatch):
+    """Flask test client whose bid, detail and listing endpoints use the parametrized repository and engine"""
+    snapshots = app.AuctionSnapshotCache(engine)
+    engine.add_change_listener(snapshots.invalidate)
+    tracker = app.ChangeTracker(repository.epoch)
+    for product_id in repository.product_ids():
+        tracker.bump(product_id)
+    engine.add_change_listener(tracker.bump)
+    monkeypatch.setattr(app, "repository", repository)
+    monkeypatch.setattr(app, "bid_engine", engine)
+    monkeypatch.setattr(app, "auction_snapshots", snapshots)
+    monkeypatch.setattr(app, "change_tracker", tracker)
+    return app.app.test_client()
+
+
+class StubEndpoint:
+    """Local HTTP endpoint recording every JSON body posted to it; ``respond`` picks the status"""
+
+    def __init__(self):
+        self.bodies = []
+        self.lock = threading.Lock()
+        self.respond = lambda body: 200
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with endpoint.lock:
+                    endpoint.bodies.append(body)
+                self.send_response(endpoint.respond(body))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/webhook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def stub_endpoint():
+    endpoint = StubEndpoint()
+    yield endpoint
+    endpoint.server.shutdown()
+    endpoint.server.server_close()
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import app
+
+
+def test_listing_etag_is_weak_and_carries_the_epoch(client, repository):
+    response = client.get("/api/auctions")
+    version = response.get_json()["version"]
+    assert version == f"{repository.epoch}-2"
+    etag, weak = response.get_etag()
+    assert (etag, weak) == (f"v{version}", True)
+    assert client.get("/api/auctions", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_tokens_from_another_epoch_get_the_full_listing(client, repository):
+    for since in ("00000000-1", "1", "garbage"):
+        body = client.get(f"/api/auctions?since={since}").get_json()
+        assert body["full"] is True
+        assert sorted(body["products"]) == ["lot_1", "lot_2"]
+
+    # An ETag from before a restart does not match the same version number now
+    stale = 'W/"v00000000-2"'
+    assert client.get("/api/auctions", headers={"If-None-Match": stale}).status_code == 200
+
+
+def test_sqlite_epoch_is_shared_by_every_worker_on_the_database(tmp_path):
+    path = str(tmp_path / "auction.db")
+    first = app.SQLiteRepository(path)
+    assert app.SQLiteRepository(path).epoch == first.epoch
+    assert app.SQLiteRepository(str(tmp_path / "other.db")).epoch != first.epoch
+
+
+def test_bid_moves_the_etag_on(client):
+    first = client.get("/api/auctions")
+    client.post("/api/auctions/lot_1/bid", json={"bidder_id": "user_b", "amount": 1100.0})
+
+    response = client.get("/api/auctions", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
+    assert response.get_json()["products"]["lot_1"]["current_highest_bid"] == 1100.0
+    assert client.get("/api/auctions", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_since_returns_only_products_changed_after_it(client):
+    since = client.get("/api/auctions").get_json()["version"]
+    client.post("/api/auctions/lot_1/bid", json={"bidder_id": "user_b", "amount": 1100.0})
+
+    delta = client.get(f"/api/auctions?since={since}")
+    body = delta.get_json()
+    assert body["full"] is False
+    assert body["since"] == since
+    assert list(body["products"]) == ["lot_1"]
+    assert body["changed_products"] == 1
+    assert body["version"] != since
+    assert "removed" not in body
+    assert client.get(f"/api/auctions?since={since}", headers={"If-None-Match": delta.headers["ETag"]}).status_code == 304
+
+    caught_up = client.get(f"/api/auctions?since={body['version']}").get_json()
+    assert (caught_up["full"], caught_up["products"]) == (False, {})
+
+
+def test_since_ahead_of_the_server_gets_the_full_listing(client, repository):
+    body = client.get(f"/api/auctions?since={repository.epoch}-999").get_json()
+    assert body["full"] is True
+    assert sorted(body["products"]) == ["lot_1", "lot_2"]
+
+
+def test_filtered_since_reports_products_that_left_the_filter_as_removed(client, engine):
+    since = client.get("/api/auctions?status=active").get_json()["version"]
+    assert engine.end_auction("lot_1", datetime.now() + timedelta(hours=1))
+    client.post("/api/auctions/lot_2/bid", json={"bidder_id": "user_b", "amount": 21100.0})
+
+    body = client.get(f"/api/auctions?status=active&since={since}").get_json()
+    assert list(body["products"]) == ["lot_2"]
+    assert body["removed"] == ["lot_1"]
+    ended = client.get(f"/api/auctions?status=ended&since={since}").get_json()
+    assert (list(ended["products"]), ended["removed"]) == (["lot_1"], ["lot_2"])
+
+
+def test_listing_variants_have_their_own_etags(client):
+    full = client.get("/api/auctions")
+    summary = client.get("/api/auctions?summary=true")
+    filtered = client.get("/api/auctions?category=watches")
+    assert len({full.headers["ETag"], summary.headers["ETag"], filtered.headers["ETag"]}) == 3
+    assert "bidding_history" not in summary.get_json()["products"]["lot_2"]
+    assert client.get("/api/auctions?summary=true", headers={"If-None-Match": full.headers["ETag"]}).status_code == 200
+
+    # A window that moves with the clock is never revalidated
+    moving = client.get("/api/auctions?ending_within=3600")
+    assert "ETag" not in moving.headers
+    assert sorted(moving.get_json()["products"]) == ["lot_1", "lot_2"]
@@ -0,0 +1,121 @@
+import threading
+
+import app
+
+
+def test_batch_applies_bids_in_order_with_a_result_per_item(client, repository):
+    response = client.post("/api/bids:batch", json={"bids": [
+        {"product_id": "lot_1", "bidder_id": "user_b", "amount": 1100},
+        {"product_id": "lot_1", "bidder_id": "user_c", "amount": 1120},
+        {"product_id": "lot_1", "bidder_id": "user_c", "amount": 1150},
+        {"product_id": "lot_9", "bidder_id": "user_c", "amount": 10},
+        {"product_id": "lot_2", "bidder_id": "user_b", "amount": "lots"},
+        {"product_id": "lot_2", "amount": 22000}
+    ]})
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [result["status"] for result in body["results"]] == [200, 400, 200, 404, 400, 400]
+    assert (body["accepted"], body["rejected"]) == (2, 4)
+    assert body["results"][2]["bid_details"]["previous_highest_bid"] == 1100.0
+    product = repository.get_product("lot_1", with_history=False)
+    assert (product["current_highest_bid"], product["highest_bidder"], product["total_bids"]) == (1150.0, "user_c", 2)
+
+
+def test_batch_rejects_an_empty_or_oversized_list(client, monkeypatch):
+    monkeypatch.setattr(app, "BATCH_MAX_ITEMS", 2)
+    bid = {"product_id": "lot_1", "bidder_id": "user_b", "amount": 1100}
+
+    assert client.post("/api/bids:batch", json={"bids": []}).status_code == 400
+    assert client.post("/api/bids:batch", json={"bids": [bid] * 3}).status_code == 400
+    assert client.post("/api/bids:batch", json={"bids": [bid] * 2}).status_code == 200
+
+
+def test_batch_read_reports_missing_lots(client):
+    body = client.get("/api/auctions:batch?ids=lot_2,lot_9,lot_2&summary=true").get_json()
+
+    assert list(body["products"]) == ["lot_2"]
+    assert body["missing"] == ["lot_9"]
+
+
+def test_repeated_key_replays_the_stored_response_without_bidding_again(client, repository):
+    bid = {"bidder_id": "user_b", "amount": 1100}
+    first = client.post("/api/auctions/lot_1/bid", json=bid, headers={"Idempotency-Key": "k1"})
+    again = client.post("/api/auctions/lot_1/bid", json=bid, headers={"Idempotency-Key": "k1"})
+
+    assert first.status_code == again.status_code == 200
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.get_data() == first.get_data()
+    assert repository.get_product("lot_1", with_history=False)["total_bids"] == 1
+
+
+def test_rejections_are_replayed_too(client):
+    bid = {"bidder_id": "user_b", "amount": 1010, "idempotency_key": "k2"}
+    first = client.post("/api/auctions/lot_1/bid", json=bid)
+    again = client.post("/api/auctions/lot_1/bid", json=bid)
+
+    assert first.status_code == again.status_code == 400
+    assert again.headers["Idempotent-Replayed"] == "true"
+
+
+def test_reused_key_with_different_parameters_is_refused(client, repository):
+    headers = {"Idempotency-Key": "k3"}
+    assert client.post("/api/auctions/lot_1/bid", json={"bidder_id": "user_b", "amount": 1100},
+                       headers=headers).status_code == 200
+    response = client.post("/api/auctions/lot_1/bid", json={"bidder_id": "user_b", "amount": 1200}, headers=headers)
+
+    assert response.status_code == 422
+    assert repository.get_product("lot_1", with_history=False)["current_highest_bid"] == 1100.0
+
+
+def test_keys_are_scoped_to_the_path(client, repository):
+    headers = {"Idempotency-Key": "k4"}
+    bid = {"bidder_id": "user_b", "amount": 1100}
+    client.post("/api/auctions/lot_1/bid", json=bid, headers=headers)
+    response = client.post("/api/auctions/lot_2/bid", json={"bidder_id": "user_b", "amount": 22000}, headers=headers)
+
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_batch_is_replayed_as_a_whole(client, repository):
+    body = {"idempotency_key": "k5", "bids": [
+        {"product_id": "lot_1", "bidder_id": "user_b", "amount": 1100},
+        {"product_id": "lot_2", "bidder_id": "user_b", "amount": 22000}
+    ]}
+    first = client.post("/api/bids:batch", json=body)
+    again = client.post("/api/bids:batch", json=body)
+
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.get_json() == first.get_json()
+    assert repository.get_product("lot_2", with_history=False)["total_bids"] == 2
+
+
+def test_concurrent_repeats_place_one_bid(client, repository):
+    bid = {"bidder_id": "user_b", "amount": 1100}
+    statuses = []
+
+    def post():
+        response = app.app.test_client().post("/api/auctions/lot_1/bid", json=bid, headers={"Idempotency-Key": "k6"})
+        statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=post) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 8
+    assert repository.get_product("lot_1", with_history=False)["total_bids"] == 1
+
+
+def test_server_error_frees_the_key_for_a_retry(client, repository, monkeypatch):
+    real_place_bid = app.bid_engine.place_bid
+    monkeypatch.setattr(app.bid_engine, "place_bid", lambda *args: 1 / 0)
+    bid = {"bidder_id": "user_b", "amount": 1100}
+    assert client.post("/api/auctions/lot_1/bid", json=bid, headers={"Idempotency-Key": "k7"}).status_code == 500
+
+    monkeypatch.setattr(app.bid_engine, "place_bid", real_place_bid)
+    response = client.post("/api/auctions/lot_1/bid", json=bid, headers={"Idempotency-Key": "k7"})
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
@@ -0,0 +1,180 @@
+import errno
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import app
+from conftest import make_catalogue
+
+
+def test_failed_commit_keeps_its_records_and_fails_their_waiters(tmp_path, monkeypatch):
+    real_fsync = os.fsync
+    calls = []
+
+    def fsync(fd):
+        calls.append(fd)
+        if len(calls) == 1:
+            raise OSError(errno.EIO, "injected fsync failure")
+        real_fsync(fd)
+
+    monkeypatch.setattr(app.os, "fsync", fsync)
+    log = app.BidLog(str(tmp_path), commit_interval=0, sync_commit=True)
+    first = log.append({"type": "test", "n": 1})
+    log.start()
+    with pytest.raises(app.BidLogError):
+        log.wait_durable(first)
+    assert log.stats()["durable_lsn"] == 0
+
+    second = log.append({"type": "test", "n": 2})
+    log.wait_durable(second)
+    # The failed group was cut off the segment and written again, once
+    assert [record["n"] for record in log.read_records()] == [1, 2]
+    assert log.stats()["durable_lsn"] == second
+    assert log.stats()["error"] is None
+
+
+def journaled_engine(tmp_path, now):
+    repository = app.InMemoryRepository(make_catalogue(now), {})
+    engine = app.BidEngine(repository)
+    log = app.BidLog(str(tmp_path), commit_interval=0, sync_commit=True)
+    log.start()
+    engine.journal = log
+    return engine, log
+
+
+def recovered(tmp_path, now):
+    """A freshly seeded store with the journal in ``tmp_path`` replayed into it, as at startup"""
+    engine = app.BidEngine(app.InMemoryRepository(make_catalogue(now), {}))
+    replayed = app.recover_state(app.BidLog(str(tmp_path)), engine)
+    return engine.repository, replayed
+
+
+def state(repository):
+    products = {}
+    for product_id in repository.product_ids():
+        product = repository.get_product(product_id)
+        products[product_id] = (product["current_highest_bid"], product["highest_bidder"], product["total_bids"],
+                                product["status"], product["auction_end_time"],
+                                [(bid["bid_id"], bid["bidder_id"], bid["amount"]) for bid in product["bidding_history"]],
+                                repository.proxy_bids(product_id))
+    users = {user_id: [(bid["product_id"], bid["amount"], bid["status"]) for bid in user["active_bids"]]
+             for user_id in ("user_a", "user_b", "user_c")
+             if (user := repository.get_user(user_id, with_history=False)) is not None}
+    return products, users
+
+
+def trade(engine, now):
+    engine.place_bid("lot_1", "user_b", 1100.0)
+    engine.set_proxy_bid("lot_2", "user_c", 23000.0)
+    engine.place_bid("lot_2", "user_b", 21500.0)
+    assert engine.end_auction("lot_1", now + timedelta(hours=3))
+
+
+def test_log_replay_rebuilds_bids_proxies_extensions_and_endings(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 3600)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 7200)
+    now = datetime.now()
+    engine, log = journaled_engine(tmp_path, now)
+    trade(engine, now)
+    log.wait_durable(log.stats()["last_lsn"])
+
+    repository, replayed = recovered(tmp_path, now)
+    assert replayed == log.stats()["last_lsn"]
+    assert state(repository) == state(engine.repository)
+    assert repository.get_product("lot_1")["status"] == "ended"
+
+
+def test_snapshot_retires_old_segments_and_recovery_replays_only_what_follows(tmp_path):
+    now = datetime.now()
+    engine, log = journaled_engine(tmp_path, now)
+    engine.place_bid("lot_1", "user_b", 1100.0)
+    engine.set_proxy_bid("lot_2", "user_c", 23000.0)
+    app.write_snapshot(log, engine)
+    assert log.segments() == [log.segment]
+
+    engine.place_bid("lot_2", "user_b", 21500.0)
+    engine.place_bid("lot_1", "user_c", 1200.0)
+    log.wait_durable(log.stats()["last_lsn"])
+
+    repository, replayed = recovered(tmp_path, now)
+    # user_b's bid on lot_2, the answer from user_c's proxy, and user_c's bid on lot_1
+    assert replayed == 3
+    assert state(repository) == state(engine.repository)
+
+
+def test_recovery_stops_at_a_torn_record(tmp_path):
+    now = datetime.now()
+    engine, log = journaled_engine(tmp_path, now)
+    engine.place_bid("lot_1", "user_b", 1100.0)
+    expected = state(engine.repository)
+    engine.place_bid("lot_1", "user_c", 1200.0)
+    log.wait_durable(log.stats()["last_lsn"])
+
+    path = log.segment_path(log.segment)
+    with open(path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(path, "wb") as f:
+        f.write(lines[0] + lines[1][:len(lines[1]) // 2])
+
+    repository, replayed = recovered(tmp_path, now)
+    assert replayed == 1
+    assert state(repository) == expected
+
+
+def test_caches_built_before_recovery_see_the_recovered_state(tmp_path):
+    now = datetime.now()
+    engine, log = journaled_engine(tmp_path, now)
+    engine.place_bid("lot_2", "user_b", 21500.0)
+    assert engine.end_auction("lot_1", now + timedelta(hours=3))
+    app.write_snapshot(log, engine)
+
+    # Built from the seed catalogue, as at import time, before recover_state runs
+    engine = app.BidEngine(app.InMemoryRepository(make_catalogue(now), {}))
+    search = app.SearchIndex(engine.repository)
+    voice = app.VoiceSummaryCache(engine.repository)
+    snapshots = app.AuctionSnapshotCache(engine)
+    for cache in (search, voice, snapshots):
+        engine.add_change_listener(cache.invalidate)
+    assert snapshots.get("lot_1")["status"] == "active"
+    assert [auction["id"] for auction in voice.active(now)] == ["lot_1", "lot_2"]
+
+    app.recover_state(app.BidLog(str(tmp_path)), engine)
+    assert search.search("rolex", status="active")["total"] == 0
+    assert search.search("rolex")["facets"]["status"] == {"ended": 1}
+    assert [(auction["id"], auction["current_bid"]) for auction in voice.active(now)] == [("lot_2", 21500.0)]
+    assert snapshots.get("lot_1")["status"] == "ended"
+    assert snapshots.get("lot_2")["current_highest_bid"] == 21500.0
+
+
+def test_bid_whose_commit_fails_stands_and_is_announced(tmp_path, monkeypatch, client, engine):
+    failures = [OSError(errno.EIO, "injected fsync failure")]
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        if failures:
+            raise failures.pop()
+        real_fsync(fd)
+
+    monkeypatch.setattr(app.os, "fsync", fsync)
+    announced = []
+    monkeypatch.setattr(app, "notify_bid_placed", announced.append)
+    log = app.BidLog(str(tmp_path), commit_interval=0, sync_commit=True)
+    log.start()
+    engine.journal = log
+
+    bid = {"bidder_id": "user_b", "amount": 1100.0, "idempotency_key": "k1"}
+    response = client.post("/api/auctions/lot_1/bid", json=bid)
+    assert response.status_code == 200
+    assert response.get_json()["bid_details"]["durable"] is False
+    assert [result["highest_bidder"] for result in announced] == ["user_b"]
+
+    # The retry gets the stored answer rather than bidding again
+    retry = client.post("/api/auctions/lot_1/bid", json=bid)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert engine.repository.get_product("lot_1")["total_bids"] == 1
+
+    response = client.post("/api/auctions/lot_1/bid", json={"bidder_id": "user_c", "amount": 1200.0})
+    assert response.get_json()["bid_details"]["durable"] is True
+    assert [(record["bidder_id"], record["amount"]) for record in log.read_records()] == [
+        ("user_b", 1100.0), ("user_c", 1200.0)]
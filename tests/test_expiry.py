@@ -0,0 +1,126 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import app
+
+
+class Recorder:
+    """on_expire callback recording which products fired and when"""
+
+    def __init__(self, expected):
+        self.fired = []
+        self.expected = expected
+        self.done = threading.Event()
+
+    def __call__(self, product_id):
+        self.fired.append((product_id, time.time()))
+        if len(self.fired) >= self.expected:
+            self.done.set()
+
+
+def soon(seconds):
+    return datetime.now() + timedelta(seconds=seconds)
+
+
+def test_deadlines_fire_in_order_and_not_before_they_are_due():
+    recorder = Recorder(3)
+    scheduler = app.ExpiryScheduler(recorder)
+    deadlines = {"lot_a": soon(0.3), "lot_b": soon(0.1), "lot_c": soon(0.2)}
+    for product_id, end_time in deadlines.items():
+        scheduler.schedule(product_id, end_time)
+    scheduler.start()
+
+    assert recorder.done.wait(5)
+    assert [product_id for product_id, _ in recorder.fired] == ["lot_b", "lot_c", "lot_a"]
+    assert all(fired_at >= deadlines[product_id].timestamp() for product_id, fired_at in recorder.fired)
+    assert len(scheduler) == 0
+
+
+def test_earlier_deadline_wakes_the_sleeping_scheduler():
+    recorder = Recorder(1)
+    scheduler = app.ExpiryScheduler(recorder)
+    scheduler.schedule("lot_a", soon(60))
+    scheduler.start()
+    time.sleep(0.05)
+
+    scheduler.schedule("lot_b", soon(0.05))
+    assert recorder.done.wait(2)
+    assert recorder.fired[0][0] == "lot_b"
+
+
+def test_moved_deadline_fires_once_at_its_new_time():
+    recorder = Recorder(2)
+    scheduler = app.ExpiryScheduler(recorder)
+    scheduler.schedule("lot_a", soon(0.05))
+    moved_to = soon(0.3)
+    scheduler.schedule("lot_a", moved_to)
+    scheduler.schedule("lot_b", soon(0.5))
+    scheduler.start()
+
+    assert recorder.done.wait(5)
+    assert [product_id for product_id, _ in recorder.fired] == ["lot_a", "lot_b"]
+    assert recorder.fired[0][1] >= moved_to.timestamp()
+
+
+def test_cancelled_deadline_never_fires():
+    recorder = Recorder(1)
+    scheduler = app.ExpiryScheduler(recorder)
+    scheduler.schedule("lot_a", soon(0.05))
+    scheduler.schedule("lot_b", soon(0.2))
+    scheduler.cancel("lot_a")
+    scheduler.start()
+
+    assert recorder.done.wait(5)
+    time.sleep(0.1)
+    assert [product_id for product_id, _ in recorder.fired] == ["lot_b"]
+
+
+def test_stale_entries_are_compacted_away():
+    scheduler = app.ExpiryScheduler(Recorder(1))
+    for n in range(500):
+        scheduler.schedule("lot_a", soon(60 + n))
+    scheduler.schedule("lot_b", soon(30))
+
+    assert len(scheduler) == 2
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 65
+
+
+def test_soft_close_extension_moves_the_scheduled_end(client, engine, repository, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 3600)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 1)
+    scheduler = app.ExpiryScheduler(app.expire_auction)
+    monkeypatch.setattr(app, "expiry_scheduler", scheduler)
+    engine.add_deadline_listener(scheduler.schedule)
+    ended = []
+    engine.add_change_listener(lambda product_id: ended.append(product_id)
+                               if repository.get_product(product_id, with_history=False)["status"] == "ended" else None)
+    with repository.transaction("lot_1") as product:
+        repository.set_auction_end_time(product, soon(0.3))
+    scheduler.schedule("lot_1", repository.get_product("lot_1", with_history=False)["auction_end_time"])
+    scheduler.start()
+
+    assert engine.place_bid("lot_1", "user_b", 1100.0)["extended"]
+    extended_to = repository.get_product("lot_1", with_history=False)["auction_end_time"]
+    time.sleep(0.5)
+    assert repository.get_product("lot_1", with_history=False)["status"] == "active"
+
+    deadline = time.time() + 5
+    while not ended and time.time() < deadline:
+        time.sleep(0.02)
+    assert ended == ["lot_1"]
+    assert datetime.now() >= extended_to
+
+
+def test_expiry_woken_early_reschedules_instead_of_ending(client, repository, monkeypatch):
+    scheduler = app.ExpiryScheduler(app.expire_auction)
+    monkeypatch.setattr(app, "expiry_scheduler", scheduler)
+
+    app.expire_auction("lot_1")
+    assert repository.get_product("lot_1", with_history=False)["status"] == "active"
+    assert len(scheduler) == 1
+
+    with repository.transaction("lot_1") as product:
+        repository.set_auction_end_time(product, soon(-1))
+    app.expire_auction("lot_1")
+    assert repository.get_product("lot_1", with_history=False)["status"] == "ended"
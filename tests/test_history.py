@@ -0,0 +1,73 @@
+import pytest
+
+import app
+
+
+def place(engine, bids):
+    for product_id, bidder_id, amount in bids:
+        engine.place_bid(product_id, bidder_id, amount)
+
+
+def walk(client, url):
+    """Follow next_cursor from ``url`` to the end; returns each page's amounts"""
+    pages, cursor = [], None
+    while True:
+        body = client.get(url + (f"&cursor={cursor}" if cursor else "")).get_json()
+        key = "bids" if "bids" in body else "bidding_history"
+        pages.append([bid["amount"] for bid in body[key]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages, body
+
+
+def test_product_bids_page_newest_first_to_the_end(client, engine):
+    place(engine, [("lot_1", "user_b" if n % 2 else "user_c", 1100.0 + 100 * n) for n in range(5)])
+
+    pages, last = walk(client, "/api/auctions/lot_1/bids?limit=2")
+    assert pages == [[1500.0, 1400.0], [1300.0, 1200.0], [1100.0]]
+    assert last["total_bids"] == 5
+    assert isinstance(client.get("/api/auctions/lot_1/bids?limit=2").get_json()["next_cursor"], str)
+
+
+def test_bids_placed_between_pages_do_not_shift_the_next_page(client, engine):
+    place(engine, [("lot_1", "user_b", 1100.0), ("lot_1", "user_c", 1200.0), ("lot_1", "user_b", 1300.0)])
+    first = client.get("/api/auctions/lot_1/bids?limit=2").get_json()
+    place(engine, [("lot_1", "user_c", 1400.0)])
+
+    second = client.get(f"/api/auctions/lot_1/bids?limit=2&cursor={first['next_cursor']}").get_json()
+    assert [bid["amount"] for bid in first["bids"]] == [1300.0, 1200.0]
+    assert [bid["amount"] for bid in second["bids"]] == [1100.0]
+    assert second["next_cursor"] is None
+
+
+def test_user_bids_page_across_products(client, engine):
+    place(engine, [("lot_1", "user_b", 1100.0), ("lot_2", "user_b", 21100.0), ("lot_1", "user_c", 1200.0),
+                   ("lot_1", "user_b", 1300.0)])
+
+    pages, last = walk(client, "/api/user/user_b/bids?limit=2")
+    assert pages == [[1300.0, 21100.0], [1100.0]]
+    assert last["total_bids"] == 3
+    # Without paging arguments the whole history comes back, as before
+    assert len(client.get("/api/user/user_b/bids").get_json()["bidding_history"]) == 3
+
+
+def test_default_page_size_applies_without_a_limit(client, engine, monkeypatch):
+    monkeypatch.setattr(app, "HISTORY_PAGE_SIZE", 2)
+    place(engine, [("lot_1", "user_b", 1100.0), ("lot_1", "user_c", 1200.0), ("lot_1", "user_b", 1300.0)])
+    body = client.get("/api/auctions/lot_1/bids").get_json()
+    assert len(body["bids"]) == 2
+    assert body["next_cursor"] is not None
+
+
+@pytest.mark.parametrize("query", ["limit=0", f"limit={app.HISTORY_PAGE_MAX + 1}", "limit=ten", "cursor=abc",
+                                   "cursor=-1", "limit=2&cursor=1.5"])
+def test_bad_paging_arguments_are_rejected(client, query):
+    for url in ("/api/auctions/lot_2/bids", "/api/user/user_a/bids"):
+        response = client.get(f"{url}?{query}")
+        assert response.status_code == 400
+        assert response.get_json()["success"] is False
+
+
+def test_paging_unknown_products_and_users_is_not_found(client):
+    assert client.get("/api/auctions/lot_9/bids?limit=2").status_code == 404
+    assert client.get("/api/user/nobody/bids?limit=2").status_code == 404
@@ -0,0 +1,43 @@
+import json
+from datetime import datetime
+
+import pytest
+
+import app
+
+
+@pytest.fixture(params=[False, True], ids=["stdlib", "orjson"])
+def provider(request):
+    if request.param and app.orjson is None:
+        pytest.skip("orjson is not installed")
+    return app.FastJSONProvider(app.app, use_orjson=request.param)
+
+
+def test_non_ascii_text_is_written_as_utf8_by_both_encoders(provider):
+    data = provider.encode({"name": "Montre Lépine à clé ☃", "bidder": "Zoë", "at": datetime(2024, 5, 1, 12, 0)})
+
+    assert data == '{"at":"2024-05-01T12:00:00","bidder":"Zoë","name":"Montre Lépine à clé ☃"}'.encode()
+    assert b"\\u" not in data
+
+
+def test_both_encoders_agree_on_a_catalogue_record():
+    record = {"id": "lot_7", "name": "Café chair № 14", "current_highest_bid": 1250.5, "total_bids": 3,
+              "history": app.EncodedJSON(app.FastJSONProvider(app.app, use_orjson=False).encode([{"amount": 10.25}]))}
+    stdlib = app.FastJSONProvider(app.app, use_orjson=False).encode(record)
+    if app.orjson is not None:
+        assert app.FastJSONProvider(app.app, use_orjson=True).encode(record) == stdlib
+    assert json.loads(stdlib)["history"] == [{"amount": 10.25}]
+
+
+def test_string_that_looks_like_a_placeholder_is_left_alone(provider):
+    name = f"{provider._placeholder}0\x00"
+    data = provider.encode({"name": name, "history": app.EncodedJSON(b'[{"amount":5}]'), "alias": name})
+
+    assert json.loads(data) == {"name": name, "history": [{"amount": 5}], "alias": name}
+
+
+def test_placeholder_with_an_unknown_index_is_left_alone(provider):
+    name = f"{provider._placeholder}7\x00"
+    data = provider.encode([name, app.EncodedJSON(b"[1]")])
+
+    assert json.loads(data) == [name, [1]]
@@ -0,0 +1,80 @@
+import time
+
+import app
+from test_webhooks import make_dispatcher
+
+
+def outbox_for(tmp_path, **kwargs):
+    options = dict(window=0.05, session_rate=100, session_burst=100, host_rate=1000, host_burst=1000)
+    options.update(kwargs)
+    dispatcher = make_dispatcher(tmp_path)
+    dispatcher.start()
+    outbox = app.NotificationOutbox(dispatcher, **options)
+    outbox.start()
+    return outbox
+
+
+def message(label):
+    return {"session_id": "session_1", "message": label, "timestamp": "", "data": {}}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_newer_event_replaces_the_buffered_one_for_its_key(tmp_path, stub_endpoint):
+    outbox = outbox_for(tmp_path)
+    for label in ("bid 1100", "bid 1200", "bid 1300"):
+        outbox.offer("session_1", stub_endpoint.url, message(label), ("new_bid", "lot_1"))
+    outbox.offer("session_1", stub_endpoint.url, message("bid on lot_2"), ("new_bid", "lot_2"))
+    outbox.offer("session_1", stub_endpoint.url, message("auction ended"))
+    assert outbox.flush(timeout=10)
+
+    assert [body["message"] for body in stub_endpoint.bodies] == ["bid 1300", "bid on lot_2", "auction ended"]
+    stats = outbox.stats()
+    assert (stats["offered"], stats["coalesced"], stats["released"]) == (5, 2, 3)
+
+
+def test_messages_past_the_session_bucket_are_held_back_then_released(tmp_path, stub_endpoint):
+    arrivals = []
+    stub_endpoint.respond = lambda body: arrivals.append(time.monotonic()) or 200
+    outbox = outbox_for(tmp_path, session_rate=10, session_burst=1)
+    for n in range(3):
+        outbox.offer("session_1", stub_endpoint.url, message(f"note {n}"))
+    assert outbox.flush(timeout=10)
+
+    assert [body["message"] for body in stub_endpoint.bodies] == ["note 0", "note 1", "note 2"]
+    # One token up front, then one every 100 ms
+    assert arrivals[2] - arrivals[0] >= 0.18
+    assert outbox.stats()["deferred"] >= 2
+
+
+def test_host_bucket_holds_back_every_session_on_that_host(tmp_path, stub_endpoint):
+    outbox = outbox_for(tmp_path, host_rate=10, host_burst=1)
+    outbox.offer("session_1", stub_endpoint.url, message("first"))
+    outbox.offer("session_2", stub_endpoint.url, {**message("second"), "session_id": "session_2"})
+    started = time.monotonic()
+    assert outbox.flush(timeout=10)
+
+    assert sorted(body["message"] for body in stub_endpoint.bodies) == ["first", "second"]
+    assert time.monotonic() - started >= 0.09
+
+
+def test_held_back_events_keep_coalescing_and_only_superseded_ones_are_dropped(tmp_path, stub_endpoint):
+    outbox = outbox_for(tmp_path, session_rate=4, session_burst=1)
+    outbox.offer("session_1", stub_endpoint.url, message("lot_1 at 1100"), ("new_bid", "lot_1"))
+    outbox.offer("session_1", stub_endpoint.url, message("lot_2 at 21100"), ("new_bid", "lot_2"))
+    outbox.offer("session_1", stub_endpoint.url, message("note"))
+    wait_for(lambda: stub_endpoint.bodies)
+
+    # lot_2's bid is still held back, so the newer one takes its place
+    outbox.offer("session_1", stub_endpoint.url, message("lot_2 at 21200"), ("new_bid", "lot_2"))
+    outbox.offer("session_1", stub_endpoint.url, message("lot_1 at 1200"), ("new_bid", "lot_1"))
+    assert outbox.flush(timeout=10)
+
+    assert [body["message"] for body in stub_endpoint.bodies] == [
+        "lot_1 at 1100", "note", "lot_2 at 21200", "lot_1 at 1200"]
+    assert outbox.stats()["coalesced"] == 1
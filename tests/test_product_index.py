@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app
+from conftest import make_catalogue
+
+
+def add_lot(catalogue, product_id, category, end_time, status="active"):
+    catalogue["products"][product_id] = dict(
+        catalogue["products"]["lot_1"], id=product_id, name=f"Lot {product_id}", category=category,
+        auction_end_time=end_time, status=status, bidding_history=[])
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def repository(request, tmp_path):
+    """The shared catalogue plus a second watch lot ending after lot_1 and an ended one ending before it"""
+    catalogue = make_catalogue()
+    lot_1_end = catalogue["products"]["lot_1"]["auction_end_time"]
+    add_lot(catalogue, "lot_3", "Watches", lot_1_end + timedelta(minutes=5))
+    add_lot(catalogue, "lot_4", "watches", lot_1_end - timedelta(minutes=5), status="ended")
+    if request.param == "memory":
+        return app.InMemoryRepository(catalogue, {})
+    return app.SQLiteRepository(str(tmp_path / "auction.db"), seed=catalogue)
+
+
+def end_times(repository, product_ids):
+    return [repository.get_product(product_id, with_history=False)["auction_end_time"] for product_id in product_ids]
+
+
+def test_find_products_filters_and_orders_by_end_time(repository):
+    assert repository.find_products() == ["lot_4", "lot_1", "lot_3", "lot_2"]
+    assert repository.find_products(status="active") == ["lot_1", "lot_3", "lot_2"]
+    assert repository.find_products(category="WATCHES") == ["lot_4", "lot_1", "lot_3"]
+    assert repository.find_products(status="active", category="watches") == ["lot_1", "lot_3"]
+    assert repository.find_products(status="sold") == []
+    assert repository.find_products(category="paintings") == []
+
+
+def test_find_products_end_bounds_are_inclusive(repository):
+    lot_1_end, lot_2_end = end_times(repository, ["lot_1", "lot_2"])
+
+    assert repository.find_products(ends_after=lot_1_end) == ["lot_1", "lot_3", "lot_2"]
+    assert repository.find_products(ends_after=lot_1_end + timedelta(seconds=1)) == ["lot_3", "lot_2"]
+    assert repository.find_products(ends_before=lot_2_end) == ["lot_4", "lot_1", "lot_3", "lot_2"]
+    assert repository.find_products(ends_before=lot_2_end - timedelta(seconds=1)) == ["lot_4", "lot_1", "lot_3"]
+    assert repository.find_products(ends_after=lot_1_end, ends_before=lot_1_end) == ["lot_1"]
+    assert repository.find_products(category="vehicles", ends_before=lot_1_end) == []
+
+
+def test_find_products_follows_status_changes(engine, repository):
+    lot_1_end, = end_times(repository, ["lot_1"])
+    assert engine.end_auction("lot_1", lot_1_end)
+    assert repository.find_products(status="active") == ["lot_3", "lot_2"]
+    assert repository.find_products(status="ended") == ["lot_4", "lot_1"]
+    assert repository.find_products(status="ended", category="watches") == ["lot_4", "lot_1"]
+    assert repository.find_products() == ["lot_4", "lot_1", "lot_3", "lot_2"]
+
+    product = repository.get_product("lot_2", with_history=False)
+    repository.set_product_status(product, "sold")
+    assert repository.find_products(status="active") == ["lot_3"]
+    assert repository.find_products(status="sold", category="vehicles") == ["lot_2"]
+
+
+def test_find_products_follows_end_time_changes(repository):
+    lot_1_end, lot_2_end = end_times(repository, ["lot_1", "lot_2"])
+    later = lot_2_end + timedelta(minutes=10)
+
+    product = repository.get_product("lot_1", with_history=False)
+    repository.set_auction_end_time(product, later)
+    assert repository.find_products() == ["lot_4", "lot_3", "lot_2", "lot_1"]
+    assert repository.find_products(ends_before=lot_1_end) == ["lot_4"]
+    assert repository.find_products(ends_after=later) == ["lot_1"]
+    assert repository.find_products(status="active", ends_after=lot_2_end + timedelta(seconds=1)) == ["lot_1"]
+
+
+def test_find_products_follows_soft_close_extensions(engine, repository, monkeypatch):
+    lot_2_end, = end_times(repository, ["lot_2"])
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 7200)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 7200)
+
+    assert engine.place_bid("lot_1", "user_b", 1100.0)["extended"] is True
+    extended, = end_times(repository, ["lot_1"])
+    assert extended > lot_2_end
+    assert repository.find_products(category="watches", ends_after=lot_2_end) == ["lot_1"]
+    assert repository.find_products(status="active") == ["lot_3", "lot_2", "lot_1"]
+
+
+def test_product_index_reindexes_only_changed_entries():
+    index = app.ProductIndex()
+    now = datetime(2026, 1, 1, 12, 0)
+    first = {"id": "a", "status": "active", "category": "Art", "auction_end_time": now}
+    second = {"id": "b", "status": "active", "category": "art", "auction_end_time": now}
+    index.put(first)
+    index.put(second)
+    index.put(dict(first))
+    assert index.find() == ["a", "b"]
+    assert index.find(category="ART", ends_after=now, ends_before=now) == ["a", "b"]
+
+    index.put(dict(first, category="Books", auction_end_time=now + timedelta(minutes=1)))
+    assert index.find(category="art") == ["b"]
+    assert index.find(category="books") == ["a"]
+    assert index.find() == ["b", "a"]
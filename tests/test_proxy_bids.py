@@ -0,0 +1,79 @@
+import pytest
+
+import app
+
+
+def amounts(repository, product_id):
+    return [(bid["bidder_id"], bid["amount"]) for bid in repository.get_product(product_id)["bidding_history"]]
+
+
+def test_lone_proxy_bids_one_increment_over_the_price(engine, repository):
+    result = engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+
+    assert result["bid"]["amount"] == 1050.0
+    assert (result["highest_bidder"], result["current_highest_bid"], result["max_amount"]) == ("user_b", 1050.0, 1500.0)
+    assert amounts(repository, "lot_1") == [("user_b", 1050.0)]
+
+
+def test_stronger_proxy_wins_one_increment_over_the_runner_up(engine, repository):
+    engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+    result = engine.set_proxy_bid("lot_1", "user_c", 1300.0)
+
+    # Only the runner-up's last legal bid and the winner's answer are recorded
+    assert amounts(repository, "lot_1") == [("user_b", 1050.0), ("user_c", 1300.0), ("user_b", 1350.0)]
+    assert result["bid"]["amount"] == 1300.0
+    assert (result["highest_bidder"], result["current_highest_bid"]) == ("user_b", 1350.0)
+    assert result["outbid_bidders"] == ["user_c"]
+
+
+def test_winner_never_bids_past_its_own_maximum(engine, repository):
+    engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+    engine.set_proxy_bid("lot_1", "user_c", 1480.0)
+
+    assert amounts(repository, "lot_1")[1:] == [("user_c", 1450.0), ("user_b", 1500.0)]
+
+
+def test_equal_maximums_go_to_the_proxy_that_leads(engine, repository):
+    engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+    result = engine.set_proxy_bid("lot_1", "user_c", 1500.0)
+
+    assert (result["highest_bidder"], result["current_highest_bid"]) == ("user_b", 1500.0)
+    assert amounts(repository, "lot_1")[1:] == [("user_c", 1450.0), ("user_b", 1500.0)]
+
+
+def test_manual_bid_is_answered_by_a_proxy(engine, repository):
+    engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+    result = engine.place_bid("lot_1", "user_c", 1200.0)
+
+    assert result["bid"]["bidder_id"] == "user_c"
+    assert [(bid["bidder_id"], bid["amount"]) for bid in result["automatic_bids"]] == [("user_b", 1250.0)]
+    assert (result["highest_bidder"], result["current_highest_bid"]) == ("user_b", 1250.0)
+    # The bidder learns it from this result; the proxy holder kept the lead, so nobody else is told
+    assert result["outbid_bidders"] == []
+
+
+def test_manual_bid_past_the_proxy_maximum_stands(engine, repository):
+    engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+    result = engine.place_bid("lot_1", "user_c", 1600.0)
+
+    assert result["automatic_bids"] == []
+    assert (result["highest_bidder"], result["current_highest_bid"]) == ("user_c", 1600.0)
+    assert result["outbid_bidders"] == ["user_b"]
+
+
+def test_leader_raising_its_maximum_does_not_bid_against_itself(engine, repository):
+    engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+    result = engine.set_proxy_bid("lot_1", "user_b", 2000.0)
+
+    assert result["bid"] is None
+    assert result["current_highest_bid"] == 1050.0
+    assert repository.proxy_bids("lot_1")["user_b"][0] == 2000.0
+
+
+def test_proxy_maximum_cannot_be_lowered(engine, repository):
+    engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+    with pytest.raises(app.BidRejected) as rejected:
+        engine.set_proxy_bid("lot_1", "user_b", 1400.0)
+
+    assert (rejected.value.reason, rejected.value.minimum_bid) == ("proxy_lowered", 1500.0)
+    assert repository.proxy_bids("lot_1")["user_b"][0] == 1500.0
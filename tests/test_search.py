@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+import app
+from conftest import make_catalogue
+
+
+def test_bids_and_endings_reach_the_index_when_they_commit(engine, repository):
+    index = app.SearchIndex(repository)
+    engine.add_change_listener(index.invalidate)
+    found = index.search("rolex")
+    assert found["results"] == [("lot_1", 3.0)]
+    assert found["facets"] == {"category": {"watches": 1}, "status": {"active": 1}}
+
+    engine.place_bid("lot_1", "user_a", 1500.0)
+    assert index.search("rolex") == found
+
+    assert engine.end_auction("lot_1", datetime.now() + timedelta(hours=1))
+    found = index.search("rolex")
+    assert found["facets"]["status"] == {"ended": 1}
+    assert index.search("rolex", status="active")["total"] == 0
+    assert index.search("", status="ended")["results"] == [("lot_1", 0.0)]
+    assert index.search("", status="active")["results"] == [("lot_2", 0.0)]
+
+
+def test_status_change_only_adjusts_the_cached_matches_holding_the_product():
+    repository = app.InMemoryRepository(make_catalogue(), {})
+    index = app.SearchIndex(repository)
+    watches = index.search("watch")
+    cars = index.search("mustang")
+
+    repository.set_product_status(repository.get_product("lot_2"), "ended")
+    index.invalidate("lot_2")
+    assert index.search("watch") == watches
+    assert index.search("mustang")["facets"]["status"] == {"ended": 1}
+    assert cars["facets"]["status"] == {"active": 1}
+
+
+def test_renamed_product_is_found_by_its_new_name_at_once():
+    repository = app.InMemoryRepository(make_catalogue(), {})
+    index = app.SearchIndex(repository)
+    assert index.search("mustang")["total"] == 1
+
+    product = repository.get_product("lot_2")
+    product["name"] = "1965 Shelby Cobra Roadster"
+    repository.put_product(product)
+    index.invalidate("lot_2")
+    assert index.search("mustang")["total"] == 0
+    assert index.search("shel")["results"] == [("lot_2", 1.8)]
+    assert index.search("roadstr")["results"] == [("lot_2", 1.2)]
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app
+from conftest import make_catalogue
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def session(user_id, minutes):
+    """A session for ``user_id`` last active ``minutes`` after START"""
+    return {"user_id": user_id, "phone_number": "", "start_time": START,
+            "last_activity": START + timedelta(minutes=minutes)}
+
+
+def test_reap_drops_only_sessions_idle_past_the_ttl():
+    store = app.SessionStore({}, idle_ttl=600, capacity=10)
+    store.put("old", session("user_a", 0))
+    store.put("recent", session("user_b", 8))
+    store.put("touched", session("user_c", 0))
+    store.touch("touched", START + timedelta(minutes=9))
+
+    assert store.reap(START + timedelta(minutes=15)) == ["old"]
+    assert sorted(sid for sid, _ in store.items()) == ["recent", "touched"]
+    assert store.reap(START + timedelta(minutes=20)) == ["recent", "touched"]
+    assert len(store) == 0
+    assert store.stats()["reaped"] == 3
+
+
+def test_put_past_capacity_evicts_the_least_recently_active():
+    store = app.SessionStore({}, idle_ttl=600, capacity=2)
+    store.put("a", session("user_a", 0))
+    store.put("b", session("user_b", 1))
+    store.touch("a", START + timedelta(minutes=2))
+
+    assert store.put("c", session("user_c", 3)) == ["b"]
+    assert sorted(sid for sid, _ in store.items()) == ["a", "c"]
+    # Replacing a live session does not count against the others
+    assert store.put("a", session("user_a", 4)) == []
+    assert store.stats()["evicted"] == 1
+
+
+def test_reaped_and_evicted_sessions_leave_the_user_and_product_indexes():
+    store = app.SessionStore({}, idle_ttl=600, capacity=2)
+    store.put("reaped", session("user_a", 0))
+    store.subscribe("reaped", "lot_1")
+    store.put("evicted", session("user_b", 5))
+    store.subscribe("evicted", "lot_1")
+    store.subscribe("evicted", "lot_2")
+    assert store.reap(START + timedelta(minutes=12)) == ["reaped"]
+    store.put("kept", session("user_b", 7))
+    store.subscribe("kept", "lot_2")
+
+    assert store.put("newest", session("user_c", 8)) == ["evicted"]
+    assert store.for_product("lot_1") == []
+    assert store.for_product("lot_2") == ["kept"]
+    assert store.for_user("user_a") == []
+    assert store.for_user("user_b") == ["kept"]
+    # Nothing is left behind for products or users without sessions
+    assert set(store._by_product) == {"lot_2"}
+    assert set(store._by_user) == {"user_b", "user_c"}
+    # Subscribing a session that is gone does not resurrect its entries
+    store.subscribe("evicted", "lot_1")
+    assert store.for_product("lot_1") == []
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def bounded_repository(request, tmp_path):
+    if request.param == "memory":
+        return app.InMemoryRepository(make_catalogue(), app.SessionStore({}, idle_ttl=600, capacity=2))
+    return app.SQLiteRepository(str(tmp_path / "auction.db"), seed=make_catalogue(), idle_ttl=600, capacity=2)
+
+
+def test_repositories_reap_and_evict_sessions_with_their_subscriptions(bounded_repository):
+    repository = bounded_repository
+    repository.put_session("reaped", session("user_a", 0))
+    repository.subscribe_session("reaped", "lot_1")
+    repository.put_session("evicted", session("user_b", 5))
+    repository.subscribe_session("evicted", "lot_2")
+    assert repository.reap_sessions(START + timedelta(minutes=12)) == ["reaped"]
+
+    repository.put_session("kept", session("user_b", 7))
+    assert repository.put_session("newest", session("user_c", 8)) == ["evicted"]
+    assert repository.sessions_for_product("lot_1") == []
+    assert repository.sessions_for_product("lot_2") == []
+    assert repository.sessions_for_user("user_b") == ["kept"]
+    stats = repository.session_stats()
+    assert (stats["live"], stats["reaped"], stats["evicted"]) == (2, 1, 1)
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app
+from conftest import make_catalogue
+
+
+def end_time(repository, product_id):
+    return repository.get_product(product_id, with_history=False)["auction_end_time"]
+
+
+def test_bid_outside_the_window_leaves_the_deadline_alone(engine, repository):
+    before = end_time(repository, "lot_1")
+    result = engine.place_bid("lot_1", "user_b", 1100.0)
+
+    assert result["extended"] is False
+    assert end_time(repository, "lot_1") == before
+
+
+def test_bid_in_the_window_pushes_the_deadline_to_a_whole_second(engine, repository, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 3600)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 7200)
+    moved = []
+    engine.add_deadline_listener(lambda product_id, deadline: moved.append((product_id, deadline)))
+
+    started = datetime.now()
+    result = engine.place_bid("lot_1", "user_b", 1100.0)
+
+    deadline = end_time(repository, "lot_1")
+    assert result["extended"] is True
+    assert result["auction_end_time"] == deadline
+    assert deadline.microsecond == 0
+    assert started + timedelta(seconds=7200) <= deadline <= datetime.now() + timedelta(seconds=7201)
+    assert moved == [("lot_1", deadline)]
+
+
+def test_deadline_moves_once_for_bids_in_the_same_second(engine, repository, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 3600)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 3600)
+    first = datetime.now().replace(microsecond=100000)
+
+    with repository.transaction("lot_1") as product:
+        assert engine._soft_close(product, first)
+        assert not engine._soft_close(product, first + timedelta(milliseconds=500))
+        assert engine._soft_close(product, first + timedelta(seconds=1))
+
+    assert end_time(repository, "lot_1") == first.replace(microsecond=0) + timedelta(seconds=3602)
+
+
+def test_deadline_never_moves_earlier(engine, repository, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 3600)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 60)
+    before = end_time(repository, "lot_1")
+
+    result = engine.place_bid("lot_1", "user_b", 1100.0)
+    assert result["extended"] is False
+    assert end_time(repository, "lot_1") == before
+
+
+def test_zero_window_turns_soft_close_off(engine, repository, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 0)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 7200)
+    before = end_time(repository, "lot_1")
+
+    assert engine.place_bid("lot_1", "user_b", 1100.0)["extended"] is False
+    assert end_time(repository, "lot_1") == before
+
+
+def test_automatic_bids_from_a_proxy_extend_the_deadline(engine, repository, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 3600)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 7200)
+    changed = []
+    engine.add_change_listener(changed.append)
+
+    result = engine.set_proxy_bid("lot_1", "user_b", 1500.0)
+    assert result["extended"] is True
+    assert result["auction_end_time"] == end_time(repository, "lot_1") > datetime.now() + timedelta(hours=1)
+    assert "lot_1" in changed
+
+    # A maximum that needs no automatic bid leaves the deadline where it is
+    assert engine.set_proxy_bid("lot_1", "user_b", 2000.0)["extended"] is False
+
+
+def test_deadline_listeners_see_the_committed_extension(engine, repository, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 3600)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 7200)
+    seen = []
+
+    def listener(product_id, deadline):
+        # Another thread, which on SQLite means another connection
+        thread = app.threading.Thread(target=lambda: seen.append((deadline, end_time(repository, product_id))))
+        thread.start()
+        thread.join()
+
+    engine.add_deadline_listener(listener)
+    engine.place_bid("lot_1", "user_b", 1100.0)
+    assert seen == [(end_time(repository, "lot_1"),) * 2]
+
+
+def test_rolled_back_extension_schedules_no_deadline(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "SOFT_CLOSE_WINDOW_SECONDS", 3600)
+    monkeypatch.setattr(app, "SOFT_CLOSE_EXTENSION_SECONDS", 7200)
+    repository = app.SQLiteRepository(str(tmp_path / "auction.db"), seed=make_catalogue())
+    engine = app.BidEngine(repository)
+    scheduler = app.ExpiryScheduler(lambda product_id: None)
+    engine.add_deadline_listener(scheduler.schedule)
+    before = end_time(repository, "lot_1")
+
+    def fail(product_id):
+        raise app.sqlite3.OperationalError("disk I/O error")
+
+    engine.add_transaction_listener(fail)
+    with pytest.raises(app.sqlite3.OperationalError):
+        engine.place_bid("lot_1", "user_b", 1100.0)
+    with pytest.raises(app.sqlite3.OperationalError):
+        engine.place_bids([("lot_1", "user_b", 1100.0)])
+
+    assert end_time(repository, "lot_1") == before
+    assert len(scheduler) == 0
@@ -0,0 +1,116 @@
+import gzip
+import logging
+import os
+
+import brotli
+from flask import Response
+
+import app
+
+SCRIPT = b"console.log('auction');\n" * 200
+
+
+def make_assets(tmp_path):
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / "static" / "js" / "main.1a2b3c4d.js").write_bytes(SCRIPT)
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><div id=root></div>")
+    return app.StaticAssets(str(tmp_path))
+
+
+def serve(assets, name, **headers):
+    with app.app.test_request_context(headers=headers):
+        return assets.response(name)
+
+
+def test_static_root_resolves_against_the_app_not_the_working_directory():
+    assert app.STATIC_ROOT == os.path.join(app.app.root_path, os.getenv("STATIC_ROOT", "build"))
+
+
+def test_missing_static_root_is_logged(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING, logger="app"):
+        assets = app.StaticAssets(str(tmp_path / "missing"))
+    assert "not found" in caplog.text
+    assert serve(assets, "index.html") is None
+
+
+def test_static_assets_serve_the_best_accepted_variant(tmp_path):
+    assets = make_assets(tmp_path)
+    name = "static/js/main.1a2b3c4d.js"
+
+    response = serve(assets, name, **{"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()) == SCRIPT
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert "Accept-Encoding" in response.vary
+
+    response = serve(assets, name, **{"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()) == SCRIPT
+
+    response = serve(assets, name)
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == SCRIPT
+
+    etags = {serve(assets, name, **{"Accept-Encoding": encoding}).get_etag() for encoding in ("br", "gzip", "")}
+    assert len(etags) == 3 and not any(weak for _, weak in etags)
+
+
+def test_small_and_unhashed_files_are_served_as_is_and_revalidated(tmp_path):
+    assets = make_assets(tmp_path)
+    response = serve(assets, "index.html", **{"Accept-Encoding": "br, gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert serve(assets, "missing.js") is None
+
+
+def test_static_assets_answer_a_matching_etag_with_304(tmp_path):
+    assets = make_assets(tmp_path)
+    name = "static/js/main.1a2b3c4d.js"
+    etag, _ = serve(assets, name, **{"Accept-Encoding": "br"}).get_etag()
+
+    response = serve(assets, name, **{"Accept-Encoding": "br", "If-None-Match": f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert response.get_etag() == (etag, False)
+
+    # Another variant's tag does not match
+    response = serve(assets, name, **{"Accept-Encoding": "gzip", "If-None-Match": f'"{etag}"'})
+    assert response.status_code == 200
+
+
+def compress(response, **headers):
+    with app.app.test_request_context(headers=headers):
+        return app.compress_response(response)
+
+
+def test_compress_response_compresses_large_json_and_weakens_its_etag():
+    body = b'{"lots": [' + b",".join(b'{"id": "lot"}' for _ in range(200)) + b"]}"
+    response = Response(body, mimetype="application/json")
+    response.set_etag("v1")
+
+    response = compress(response, **{"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()) == body
+    assert response.get_etag() == ("v1", True)
+    assert "Accept-Encoding" in response.vary
+
+
+def test_compress_response_leaves_small_unaccepted_and_binary_bodies_alone():
+    large = b"x" * (app.COMPRESS_MIN_BYTES * 2)
+    small = compress(Response(b"{}", mimetype="application/json"), **{"Accept-Encoding": "gzip"})
+    unaccepted = compress(Response(large, mimetype="text/plain"))
+    binary = compress(Response(large, mimetype="image/png"), **{"Accept-Encoding": "gzip"})
+    for response in (small, unaccepted, binary):
+        assert "Content-Encoding" not in response.headers
+    assert unaccepted.get_data() == large
+    assert "Accept-Encoding" in unaccepted.vary
+
+
+def test_compress_response_skips_streamed_responses():
+    chunks = [b"data: " + b"x" * app.COMPRESS_MIN_BYTES + b"\n\n"] * 3
+    response = Response(iter(chunks), mimetype="text/plain")
+
+    response = compress(response, **{"Accept-Encoding": "br, gzip"})
+    assert response.is_streamed
+    assert "Content-Encoding" not in response.headers
+    assert list(response.response) == chunks
@@ -0,0 +1,70 @@
+import pytest
+
+import app
+
+
+def test_bid_ids_are_strings_on_every_backend(engine, repository):
+    result = engine.place_bid("lot_1", "user_b", 1100.0)
+    assert isinstance(result["bid"]["bid_id"], str)
+
+    history = repository.get_product("lot_1")["bidding_history"]
+    assert [bid["bid_id"] for bid in history] == [result["bid"]["bid_id"]]
+    bids, _ = repository.product_bids("lot_2", limit=10)
+    assert [bid["bid_id"] for bid in bids] == ["bid_001"]
+
+
+def test_bid_store_reads_integer_ids_from_older_logs_as_strings():
+    store = app.BidStore()
+    now = app.datetime.now()
+    first = store.append("lot_1", "user_a", 100.0, now, bid_id=0)
+    second = store.append("lot_1", "user_b", 150.0, now, bid_id=7)
+    third = store.append("lot_1", "user_a", 200.0, now)
+    assert [store.bid_id(row) for row in (first, second, third)] == ["0", "7", "2"]
+
+    restored = app.BidStore()
+    restored.load(store.export())
+    assert [bid["bid_id"] for bid in restored.product_history("lot_1")] == ["0", "7", "2"]
+
+
+def read_elsewhere(repository, product_id):
+    """Read a product from another thread, which on SQLite means another connection"""
+    result = {}
+    thread = app.threading.Thread(target=lambda: result.update(repository.get_product(product_id, with_history=False)))
+    thread.start()
+    thread.join()
+    return result
+
+
+def test_change_listeners_run_after_the_change_commits(engine, repository):
+    seen = []
+    engine.add_change_listener(lambda product_id: seen.append(
+        (product_id, read_elsewhere(repository, product_id)["current_highest_bid"])))
+
+    engine.place_bid("lot_1", "user_b", 1100.0)
+    assert seen == [("lot_1", 1100.0)]
+
+    seen.clear()
+    engine.place_bids([("lot_1", "user_c", 1200.0), ("lot_2", "user_c", 21100.0), ("lot_1", "user_b", 1200.0)])
+    assert sorted(seen) == [("lot_1", 1200.0), ("lot_2", 21100.0)]
+
+
+def test_rejected_bid_notifies_nobody(engine):
+    seen = []
+    engine.add_change_listener(seen.append)
+    engine.add_transaction_listener(seen.append)
+    with pytest.raises(app.BidRejected):
+        engine.place_bid("lot_1", "user_b", 1000.0)
+    assert seen == []
+
+
+def test_sqlite_schema_drops_the_redundant_product_index(tmp_path):
+    path = str(tmp_path / "auction.db")
+    conn = app.sqlite3.connect(path)
+    conn.executescript(app.SQLiteRepository.SCHEMA.replace(
+        "DROP INDEX IF EXISTS bids_product;", "CREATE INDEX IF NOT EXISTS bids_product ON bids (product_id);"))
+    conn.close()
+
+    repository = app.SQLiteRepository(path)
+    indexes = {row[0] for row in repository._conn().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "bids_product" not in indexes
+    assert "bids_product_time" in indexes
@@ -0,0 +1,36 @@
+import pytest
+
+import app
+
+
+def test_event_bus_refuses_streams_past_its_limit():
+    bus = app.EventBus(max_subscribers=2)
+    first, _ = bus.subscribe()
+    bus.subscribe({"lot_1"})
+    with pytest.raises(app.StreamLimitReached):
+        bus.subscribe()
+
+    # Unsubscribing twice frees one slot, not two
+    bus.unsubscribe(first)
+    bus.unsubscribe(first)
+    bus.subscribe()
+    with pytest.raises(app.StreamLimitReached):
+        bus.subscribe()
+    assert bus.stats()["subscribers"] == 2
+    assert bus.stats()["refused"] == 2
+
+
+def test_stream_endpoint_answers_503_when_full_and_frees_slots_on_close(monkeypatch):
+    monkeypatch.setattr(app, "event_bus", app.EventBus(max_subscribers=1))
+    client = app.app.test_client()
+
+    stream = client.get("/api/stream")
+    assert stream.status_code == 200
+    refused = client.get("/api/stream")
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == "5"
+
+    # Closing the stream gives its slot back
+    stream.close()
+    assert app.event_bus.stats()["subscribers"] == 0
+    assert client.get("/api/stream").status_code == 200
@@ -0,0 +1,142 @@
+import app
+
+
+def make_dispatcher(tmp_path, **kwargs):
+    options = dict(workers=1, batch_size=50, timeout=2, max_attempts=3, backoff_base=0.01, backoff_max=0.05,
+                   breaker_threshold=5, breaker_cooldown=0.2, dead_letter_path=str(tmp_path / "dead.jsonl"))
+    options.update(kwargs)
+    return app.WebhookDispatcher("test", **options)
+
+
+def payload(n):
+    return {"session_id": f"session_{n}", "message": f"message {n}", "timestamp": "", "data": {"n": n}}
+
+
+def test_messages_keep_their_own_payload_shape(tmp_path, stub_endpoint):
+    dispatcher = make_dispatcher(tmp_path)
+    for n in range(5):
+        dispatcher.submit(stub_endpoint.url, payload(n))
+    dispatcher.start()
+    assert dispatcher.flush(timeout=10)
+
+    assert sorted(body["session_id"] for body in stub_endpoint.bodies) == [f"session_{n}" for n in range(5)]
+    assert all("messages" not in body for body in stub_endpoint.bodies)
+    assert dispatcher.stats()["delivered"] == 5
+
+
+def test_rejected_message_is_dead_lettered_alone(tmp_path, stub_endpoint):
+    stub_endpoint.respond = lambda body: 400 if body.get("session_id") == "session_2" else 200
+    dispatcher = make_dispatcher(tmp_path)
+    for n in range(5):
+        dispatcher.submit(stub_endpoint.url, payload(n))
+    dispatcher.start()
+    assert dispatcher.flush(timeout=10)
+
+    spooled = dispatcher.dead_letters.drain()
+    assert [record["payload"]["session_id"] for record in spooled] == ["session_2"]
+    assert dispatcher.stats()["delivered"] == 4
+    assert dispatcher.breaker(stub_endpoint.url).state == "closed"
+
+
+def test_rejected_envelope_is_resent_message_by_message(tmp_path, stub_endpoint):
+    def respond(body):
+        if "messages" in body:
+            return 400
+        return 400 if body["session_id"] == "session_3" else 200
+
+    stub_endpoint.respond = respond
+    dispatcher = make_dispatcher(tmp_path, envelope=True)
+    for n in range(5):
+        dispatcher.submit(stub_endpoint.url, payload(n))
+    dispatcher.start()
+    assert dispatcher.flush(timeout=10)
+
+    assert len(stub_endpoint.bodies[0]["messages"]) == 5
+    assert [record["payload"]["session_id"] for record in dispatcher.dead_letters.drain()] == ["session_3"]
+    assert dispatcher.stats()["delivered"] == 4
+
+
+def test_open_breaker_does_not_use_up_attempts(tmp_path, stub_endpoint):
+    def respond(body):
+        app.time.sleep(0.05)
+        return 500
+
+    stub_endpoint.respond = respond
+    dispatcher = make_dispatcher(tmp_path, workers=2, max_attempts=2, breaker_threshold=1, breaker_cooldown=0.05)
+    for n in range(4):
+        dispatcher.submit(stub_endpoint.url, payload(n))
+    dispatcher.start()
+    assert dispatcher.flush(timeout=30)
+
+    stats = dispatcher.stats()
+    assert stats["short_circuited"] > 0
+    spooled = dispatcher.dead_letters.drain()
+    assert len(spooled) == 4
+    # Every message was dead-lettered only after max_attempts real requests
+    sent = [body["session_id"] for body in stub_endpoint.bodies]
+    for record in spooled:
+        assert record["attempts"] == 2
+        assert sent.count(record["payload"]["session_id"]) == 2
+    assert stats["requests_sent"] == 8
+
+
+def test_messages_held_by_an_open_breaker_are_delivered_once_it_closes(tmp_path, stub_endpoint):
+    failures = iter([500, 500, 500])
+
+    def respond(body):
+        app.time.sleep(0.05)
+        return next(failures, 200)
+
+    stub_endpoint.respond = respond
+    dispatcher = make_dispatcher(tmp_path, workers=2, max_attempts=4, breaker_threshold=1, breaker_cooldown=0.1)
+    for n in range(10):
+        dispatcher.submit(stub_endpoint.url, payload(n))
+    dispatcher.start()
+    assert dispatcher.flush(timeout=30)
+
+    stats = dispatcher.stats()
+    assert stats["short_circuited"] > 0
+    assert stats["dead_lettered"] == 0
+    assert stats["delivered"] == 10
+    assert stats["parked"] == 0
+    assert dispatcher.breaker(stub_endpoint.url).state == "closed"
+
+
+def test_endpoint_secrets_stay_out_of_stats_and_dead_letters(tmp_path, stub_endpoint):
+    url = stub_endpoint.url + "?secret_key=SUPERSECRET"
+    stub_endpoint.respond = lambda body: 400
+    dispatcher = make_dispatcher(tmp_path)
+    dispatcher.submit(url, payload(1))
+    dispatcher.start()
+    assert dispatcher.flush(timeout=10)
+
+    assert list(dispatcher.stats()["breakers"]) == [stub_endpoint.url]
+    assert "SUPERSECRET" not in app.json.dumps(dispatcher.stats())
+    assert "SUPERSECRET" not in (tmp_path / "dead.jsonl").read_text()
+
+    # Replay finds the full URL again from the redacted one
+    stub_endpoint.respond = lambda body: 200
+    assert dispatcher.replay_dead_letters() == {"replayed": 1, "respooled": 0}
+    assert dispatcher.flush(timeout=10)
+    assert dispatcher.stats()["delivered"] == 1
+
+
+def test_dead_letters_for_an_unknown_endpoint_stay_spooled(tmp_path):
+    dispatcher = make_dispatcher(tmp_path)
+    dispatcher.dead_letters.append("http://127.0.0.1:9/hook", payload(1), 3, "status 500")
+
+    assert dispatcher.replay_dead_letters() == {"replayed": 0, "respooled": 1}
+    assert dispatcher.dead_letters.drain()[0]["error"] == "unknown endpoint on replay"
+
+
+def test_webhook_admin_endpoints_require_the_api_key(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "webhook_dispatcher", make_dispatcher(tmp_path))
+    client = app.app.test_client()
+
+    assert client.get("/api/webhooks/stats").status_code == 401
+    assert client.get("/api/webhooks/stats", headers={"X-API-Key": "wrong"}).status_code == 401
+    assert client.post("/api/webhooks/dead-letters/replay").status_code == 401
+    bearer = {"Authorization": f"Bearer {app.OMNIDIMENSION_API_KEY}"}
+    assert client.get("/api/webhooks/stats", headers=bearer).status_code == 200
+    assert client.get("/api/webhooks/stats", headers={"X-API-Key": app.OMNIDIMENSION_API_KEY}).status_code == 200
+    assert client.post("/api/webhooks/dead-letters/replay", headers=bearer).get_json()["replayed"] == 0